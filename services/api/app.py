@@ -1,13 +1,38 @@
 from __future__ import annotations
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from services.pathway_services.utils.config import settings
+from services.api.routers.admin import router as admin_router
 from services.api.routers.health import router as health_router
 from services.api.routers.news import router as news_router
+from services.api.routers.stories import router as stories_router
 from services.api.websocket import router as ws_router
+from services.api.deps import db_pool, redis_client
+from services.api.hot_store import HotNewsWindow, keep_hot_window
+from services.api.metrics import MetricsMiddleware
 
-app = FastAPI(title=settings.APP_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    hot_task = None
+    if settings.HOT_STORE_ENABLED:
+        # Connects in the background: the API boots (and falls back to Postgres) without Redis or Postgres.
+        hot_task = asyncio.create_task(keep_hot_window(
+            lambda: HotNewsWindow(capacity=settings.HOT_STORE_CAPACITY, window_seconds=settings.HOT_STORE_WINDOW_SECONDS),
+            redis_client, db_pool, settings.WS_REDIS_CHANNEL, settings.HOT_STORE_CHANGED_CHANNEL,
+        ))
+    try:
+        yield
+    finally:
+        if hot_task:
+            hot_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await hot_task
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,7 +41,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(health_router, tags=["health"])
 app.include_router(news_router, tags=["news"])
+app.include_router(stories_router, tags=["stories"])
 app.include_router(ws_router, tags=["ws"])
+app.include_router(admin_router, tags=["admin"])
@@ -5,6 +5,11 @@ import asyncpg
 from services.pathway_services.database.postgres import get_pool
 from services.pathway_services.database.redis import get_redis
 from redis.asyncio import Redis
+from typing import Optional
+import asyncio
+from services.api.hot_store import HotNewsWindow, get_hot_window
+from services.api.similar_index import get_similar_reader
+from services.pathway_services.news.analytics.hnsw import HNSWReader
 
 async def api_key_auth(x_api_key: str | None = Header(default=None)) -> None:
     if settings.API_KEY and x_api_key != settings.API_KEY:
@@ -15,3 +20,9 @@ async def db_pool() -> asyncpg.Pool:
 
 async def redis_client() -> Redis:
     return await get_redis(settings.REDIS_URL)
+
+async def hot_window() -> Optional[HotNewsWindow]:
+    return get_hot_window()
+
+async def similar_reader() -> Optional[HNSWReader]:
+    return await asyncio.to_thread(get_similar_reader, settings.SIMILAR_INDEX_DIR)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import math
+import time
+
+import numpy as np
+import orjson
+from loguru import logger
+from redis.asyncio import Redis
+import asyncpg
+
+from services.pathway_services.utils.timeutil import to_epoch
+
+NEWS_FIELDS = (
+    "id", "source", "title", "url", "published_at", "summary", "content",
+    "categories", "sentiment", "sentiment_confidence", "relevance",
+    "market_impact", "entities", "numbers", "story_id",
+)
+MAX_CATEGORY_BITS = 64
+RESUBSCRIBE_SECONDS = 5.0
+
+_window: Optional["HotNewsWindow"] = None
+
+class HotNewsWindow:
+    """
+    Columnar ring buffer of recently published news held in each API process.
+
+    Filter columns live in NumPy arrays so a query is a handful of vectorized masks;
+    payloads are stored pre-encoded and joined straight into the response body.
+    ``coverage_start`` is the oldest ``published_at`` for which the window is known to
+    hold every item; anything older must be answered by Postgres.
+    """
+
+    def __init__(self, capacity: int = 200_000, window_seconds: float = 24 * 3600) -> None:
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.published = np.full(capacity, -np.inf, dtype=np.float64)
+        self.relevance = np.zeros(capacity, dtype=np.int16)
+        self.source = np.full(capacity, -1, dtype=np.int16)
+        self.categories = np.zeros(capacity, dtype=np.uint64)
+        self.payloads: List[Optional[bytes]] = [None] * capacity
+        self._covered_from = math.inf
+        self._evicted_through = -math.inf
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._slots: Dict[str, int] = {}
+        self._next = 0
+        self._source_codes: Dict[str, int] = {}
+        self._category_bits: Dict[str, int] = {}
+        self._category_overflow = False
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def coverage_start(self) -> float:
+        return max(self._covered_from, self._evicted_through)
+
+    def mark_covered(self, since: float) -> None:
+        self._covered_from = min(self._covered_from, since)
+
+    def mark_stale(self, through: float) -> None:
+        """Stop answering for anything published at or before ``through`` (rows changed that could not be reloaded)."""
+        self._evicted_through = max(self._evicted_through, float(np.nextafter(through, np.inf)))
+
+    def add(self, record: dict) -> None:
+        item_id = record["id"]
+        slot = self._slots.get(item_id)
+        if slot is None:
+            slot = self._next
+            self._next = (self._next + 1) % self.capacity
+            evicted = self._ids[slot]
+            if evicted is not None:
+                del self._slots[evicted]
+                # The window no longer holds everything at or before the evicted item.
+                self._evicted_through = max(self._evicted_through, float(np.nextafter(self.published[slot], np.inf)))
+            self._ids[slot] = item_id
+            self._slots[item_id] = slot
+
+        self.published[slot] = to_epoch(record.get("published_at"))
+        self.relevance[slot] = record.get("relevance") or 0
+        self.source[slot] = self._source_code(record.get("source", ""))
+        self.categories[slot] = self._category_mask(record.get("categories") or [])
+        self.payloads[slot] = orjson.dumps({f: record.get(f) for f in NEWS_FIELDS})
+
+    def query(
+        self,
+        category: Optional[str],
+        source: Optional[str],
+        min_relevance: Optional[int],
+        since: Optional[float],
+        limit: int,
+    ) -> Optional[bytes]:
+        """
+        Return a JSON array of the newest ``limit`` matching items, or None when the
+        window cannot answer completely and the caller must query Postgres.
+        """
+        coverage = max(self.coverage_start, time.time() - self.window_seconds)
+        if since is not None and since < coverage:
+            return None
+        mask = self.published >= (coverage if since is None else since)
+        if category:
+            bit = self._category_bits.get(category)
+            if bit is None:
+                # Nothing in the window carries this category (unless we ran out of bits).
+                return b"[]" if since is not None and not self._category_overflow else None
+            mask &= (self.categories & np.uint64(bit)) != 0
+        if source:
+            code = self._source_codes.get(source)
+            if code is None:
+                return b"[]" if since is not None else None
+            mask &= self.source == code
+        if min_relevance is not None:
+            mask &= self.relevance >= min_relevance
+
+        idx = np.flatnonzero(mask)
+        # Without a lower bound the newest matches may be older than the window.
+        if since is None and len(idx) < limit:
+            return None
+        if len(idx) > limit:
+            idx = idx[np.argpartition(self.published[idx], len(idx) - limit)[-limit:]]
+        idx = idx[np.argsort(self.published[idx])[::-1]]
+        return b"[" + b",".join(self.payloads[i] for i in idx) + b"]"
+
+    def _source_code(self, source: str) -> int:
+        code = self._source_codes.get(source)
+        if code is None:
+            code = self._source_codes[source] = len(self._source_codes)
+        return code
+
+    def _category_mask(self, categories: List[str]) -> np.uint64:
+        mask = 0
+        for category in categories:
+            bit = self._category_bits.get(category)
+            if bit is None:
+                if len(self._category_bits) >= MAX_CATEGORY_BITS:
+                    self._category_overflow = True
+                    continue
+                bit = self._category_bits[category] = 1 << len(self._category_bits)
+            mask |= bit
+        return np.uint64(mask)
+
+def get_hot_window() -> Optional[HotNewsWindow]:
+    return _window
+
+def set_hot_window(window: Optional[HotNewsWindow]) -> None:
+    global _window
+    _window = window
+
+async def _fetch_rows(pool: asyncpg.Pool, where: str, arg: object) -> List[dict]:
+    async with pool.acquire() as conn:
+        rows = await conn.fetch("SELECT %s FROM news WHERE %s" % (", ".join(NEWS_FIELDS), where), arg)
+    return [dict(r) for r in rows]
+
+async def reload_changed(window: HotNewsWindow, pool: asyncpg.Pool, ids: List[str]) -> None:
+    """Re-read rows that a backfill or re-enrichment rewrote; the window stops covering them if that fails."""
+    try:
+        rows = await _fetch_rows(pool, "id = ANY($1)", ids)
+    except Exception as exc:
+        window.mark_stale(time.time())
+        logger.warning("Hot window could not reload {} changed rows, serving older queries from Postgres: {}",
+                       len(ids), exc)
+        return
+    for r in rows:
+        window.add(r)
+
+async def run_hot_window(window: HotNewsWindow, redis: Redis, pool: asyncpg.Pool, channel: str,
+                         changed_channel: str) -> None:
+    """
+    Fill the window from the worker's publish stream. Subscribes before warming from
+    Postgres so nothing published during warm-up is missed. Ids published on
+    ``changed_channel`` (rows rewritten outside the stream) are reloaded from Postgres.
+    """
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(channel, changed_channel)
+    try:
+        since = time.time() - window.window_seconds
+        try:
+            since_iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(since))
+            rows = await _fetch_rows(pool, "published_at >= $1 ORDER BY published_at", since_iso)
+            for r in rows:
+                window.add(r)
+            window.mark_covered(since)
+            logger.info("🔥 Hot window warmed with {} items", len(rows))
+        except Exception as exc:
+            # Without warm-up the window only covers what arrives from now on.
+            window.mark_covered(time.time())
+            logger.warning("Hot window warm-up failed: {}", exc)
+
+        async for msg in pubsub.listen():
+            if msg is None or msg.get("type") != "message":
+                continue
+            try:
+                data = orjson.loads(msg["data"])
+                if msg["channel"] == changed_channel:
+                    await reload_changed(window, pool, data["ids"])
+                else:
+                    window.add(data)
+            except (orjson.JSONDecodeError, KeyError, TypeError) as exc:
+                logger.warning("Skipping malformed stream message: {}", exc)
+    finally:
+        await pubsub.unsubscribe(channel, changed_channel)
+        await pubsub.close()
+
+async def keep_hot_window(make_window: Callable[[], HotNewsWindow], redis_ready: Callable[[], Awaitable[Redis]],
+                          pool_ready: Callable[[], Awaitable[asyncpg.Pool]], channel: str,
+                          changed_channel: str) -> None:
+    """
+    Run a hot window for the life of the API. A window is registered only while its
+    stream is live: when the subscription drops (or Redis/Postgres cannot be reached)
+    it is unregistered, so ``/news`` falls back to Postgres, and a fresh window is
+    subscribed and warmed after ``RESUBSCRIBE_SECONDS``.
+    """
+    while True:
+        try:
+            redis, pool = await redis_ready(), await pool_ready()
+            window = make_window()
+            set_hot_window(window)
+            await run_hot_window(window, redis, pool, channel, changed_channel)
+            logger.warning("Hot window stream ended; serving /news from Postgres until it resubscribes")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Hot window stream failed, serving /news from Postgres until it resubscribes: {}", exc)
+        finally:
+            set_hot_window(None)
+        await asyncio.sleep(RESUBSCRIBE_SECONDS)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import os
+import time
+
+import asyncpg
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+from services.pathway_services.utils import profiling
+
+# With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR (empty on start); every
+# process then writes its samples to mmap files and /metrics aggregates them.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+
+REQUEST_SECONDS = Histogram("api_request_seconds", "Request latency", ["method", "route", "status"],
+                            buckets=LATENCY_BUCKETS)
+REQUESTS_IN_FLIGHT = Gauge("api_requests_in_flight", "Requests being handled", multiprocess_mode="livesum")
+RESPONSE_BYTES = Histogram("api_response_bytes", "Response body size", ["route"], buckets=SIZE_BUCKETS)
+DB_ACQUIRE_SECONDS = Histogram("api_db_pool_acquire_seconds", "Wait for a Postgres connection",
+                               buckets=LATENCY_BUCKETS)
+WS_CLIENTS = Gauge("api_ws_clients", "Connected WebSocket clients", multiprocess_mode="livesum")
+WS_SEND_QUEUE_DEPTH = Histogram("api_ws_send_queue_depth", "Per-client send queue depth at enqueue",
+                                buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250))
+FRESHNESS_SECONDS = Histogram("api_freshness_seconds", "Item age at delivery checkpoints", ["segment"],
+                              buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+
+def render_metrics() -> tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+@asynccontextmanager
+async def acquire(pool: asyncpg.Pool) -> AsyncIterator[asyncpg.Connection]:
+    """``pool.acquire()`` that records how long the request waited for a connection."""
+    t0 = time.perf_counter()
+    async with pool.acquire() as conn:
+        DB_ACQUIRE_SECONDS.observe(time.perf_counter() - t0)
+        yield conn
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware buffering) recording latency, status,
+    response size and in-flight requests per route template.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.labels(method=scope["method"], route=template, status=str(status)).observe(elapsed)
+            RESPONSE_BYTES.labels(route=template).observe(size)
+            rec = profiling.recorder
+            if rec is not None:
+                rec.add(f"{scope['method']} {template}", elapsed)
@@ -17,3 +17,19 @@ class NewsOut(BaseModel):
     market_impact: str
     entities: Dict[str, list]
     numbers: Dict[str, list]
+    story_id: Optional[str] = None
+
+class SimilarNewsOut(NewsOut):
+    similarity: float
+
+class FeedEntryOut(BaseModel):
+    score: float
+    item: NewsOut
+
+class StoryOut(BaseModel):
+    story_id: str
+    headline: str
+    size: int
+    first_published_at: str
+    last_published_at: str
+    item_ids: List[str]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from services.pathway_services.utils.config import settings
+from services.pathway_services.utils.profiling import SamplingProfiler
+from services.api.deps import api_key_auth
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(api_key_auth)])
+
+# One profiler per API process; with several uvicorn workers the request profiles
+# whichever process served it (the pid is part of the output name).
+_profiler = SamplingProfiler(settings.PROFILE_DIR, "api", interval=settings.PROFILE_INTERVAL_SECONDS)
+
+@router.post("/profile", status_code=status.HTTP_202_ACCEPTED)
+async def start_profile(
+    seconds: float = Query(default=settings.PROFILE_SECONDS, gt=0, le=600),
+    tracemalloc: bool = Query(default=False),
+) -> dict:
+    prefix = _profiler.start(seconds, trace_allocations=tracemalloc)
+    if prefix is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    return {
+        "seconds": seconds,
+        "outputs": [prefix + ".collapsed", prefix + ".stages.json"] + ([prefix + ".tracemalloc.txt"] if tracemalloc else []),
+    }
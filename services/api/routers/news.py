@@ -1,22 +1,36 @@
 from __future__ import annotations
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Query
+import asyncio
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from redis.asyncio import Redis
 import asyncpg
+import orjson
 
-from services.api.deps import api_key_auth, db_pool
-from services.api.models import NewsOut
+from services.api.deps import api_key_auth, db_pool, redis_client, hot_window, similar_reader
+from services.api.metrics import acquire
+from services.api.hot_store import HotNewsWindow
+from services.api.models import NewsOut, FeedEntryOut, SimilarNewsOut
+from services.pathway_services.news.analytics.hnsw import HNSWReader
+from services.pathway_services.news.analytics.ranking import decayed, feed_key, items_key
+from services.pathway_services.utils.config import settings
+from services.pathway_services.utils.timeutil import to_epoch
 
 router = APIRouter(dependencies=[Depends(api_key_auth)])
 
 BASE_SQL = """
 SELECT id, source, title, url, published_at, summary, content,
        categories, sentiment, sentiment_confidence, relevance,
-       market_impact, entities, numbers
+       market_impact, entities, numbers, story_id
 FROM news
 WHERE 1=1
 """
+PAGE_SIZE = 200
 
-def _append_filters(sql: str, params: list, category: Optional[str], source: Optional[str], min_relevance: Optional[int]) -> tuple[str, list]:
+def _append_filters(
+    sql: str, params: list, category: Optional[str], source: Optional[str], min_relevance: Optional[int],
+    since: Optional[str] = None,
+) -> tuple[str, list]:
     if category:
         sql += " AND $%d = ANY(categories)" % (len(params)+1)
         params.append(category)
@@ -26,7 +40,10 @@ def _append_filters(sql: str, params: list, category: Optional[str], source: Opt
     if min_relevance is not None:
         sql += " AND relevance >= $%d" % (len(params)+1)
         params.append(min_relevance)
-    sql += " ORDER BY published_at DESC LIMIT 200"
+    if since:
+        sql += " AND published_at >= $%d" % (len(params)+1)
+        params.append(since)
+    sql += " ORDER BY published_at DESC LIMIT %d" % PAGE_SIZE
     return sql, params
 
 @router.get("/news", response_model=List[NewsOut])
@@ -34,18 +51,65 @@ async def list_news(
     category: Optional[str] = Query(default=None),
     source: Optional[str] = Query(default=None),
     min_relevance: Optional[int] = Query(default=None, ge=0, le=100),
+    since: Optional[str] = Query(default=None, description="ISO8601 lower bound on published_at"),
     pool: asyncpg.Pool = Depends(db_pool),
-) -> list[NewsOut]:
-    sql, params = _append_filters(BASE_SQL, [], category, source, min_relevance)
+    window: Optional[HotNewsWindow] = Depends(hot_window),
+):
+    if window is not None:
+        body = window.query(category, source, min_relevance, to_epoch(since) if since else None, PAGE_SIZE)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+    sql, params = _append_filters(BASE_SQL, [], category, source, min_relevance, since)
     rows = []
-    async with pool.acquire() as conn:
+    async with acquire(pool) as conn:
         rows = await conn.fetch(sql, *params)
-    return [
-        NewsOut(
-            id=r["id"], source=r["source"], title=r["title"], url=r["url"], published_at=r["published_at"],
-            summary=r["summary"], content=r["content"], categories=r["categories"], sentiment=r["sentiment"],
-            sentiment_confidence=r["sentiment_confidence"], relevance=r["relevance"], market_impact=r["market_impact"],
-            entities=r["entities"], numbers=r["numbers"],
-        )
-        for r in rows
+    return [NewsOut(**_news_fields(r)) for r in rows]
+
+def _news_fields(r: asyncpg.Record) -> dict:
+    return dict(
+        id=r["id"], source=r["source"], title=r["title"], url=r["url"], published_at=r["published_at"],
+        summary=r["summary"], content=r["content"], categories=r["categories"], sentiment=r["sentiment"],
+        sentiment_confidence=r["sentiment_confidence"], relevance=r["relevance"], market_impact=r["market_impact"],
+        entities=r["entities"], numbers=r["numbers"], story_id=r["story_id"],
+    )
+
+# Served as pre-encoded JSON; the model documents the shape without re-validating it.
+@router.get("/news/feed", responses={200: {"model": List[FeedEntryOut]}})
+async def news_feed(
+    category: str = Query(default="all"),
+    limit: int = Query(default=50, ge=1, le=500),
+    redis: Redis = Depends(redis_client),
+) -> Response:
+    # The worker keeps each category ranked by a static key: one ZREVRANGE and one HMGET.
+    prefix = settings.FEED_REDIS_PREFIX
+    ranked = await redis.zrevrange(feed_key(prefix, category), 0, limit - 1, withscores=True)
+    payloads = await redis.hmget(items_key(prefix), [item_id for item_id, _ in ranked]) if ranked else []
+    now = time.time()
+    entries = [
+        '{"score":' + orjson.dumps(round(decayed(key, now, settings.FEED_HALF_LIFE_SECONDS), 4)).decode()
+        + ',"item":' + payload + "}"
+        # An item trimmed between the two reads has no payload left.
+        for (_, key), payload in zip(ranked, payloads) if payload is not None
     ]
+    return Response(content="[" + ",".join(entries) + "]", media_type="application/json")
+
+@router.get("/news/{news_id}/similar", response_model=List[SimilarNewsOut])
+async def similar_news(
+    news_id: str,
+    k: int = Query(default=10, ge=1, le=100),
+    pool: asyncpg.Pool = Depends(db_pool),
+    index: Optional[HNSWReader] = Depends(similar_reader),
+) -> list[SimilarNewsOut]:
+    hits = None
+    if index is not None:
+        # Graph search is pure Python over memory-mapped pages: keep it off the event loop.
+        hits = await asyncio.to_thread(index.similar_to, news_id, k, settings.SIMILAR_EF_SEARCH)
+    if hits is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="News item not indexed")
+    if not hits:
+        return []
+    scores = dict(hits)
+    async with acquire(pool) as conn:
+        rows = await conn.fetch(BASE_SQL + " AND id = ANY($1)", list(scores))
+    out = [SimilarNewsOut(**_news_fields(r), similarity=scores[r["id"]]) for r in rows]
+    return sorted(out, key=lambda n: n.similarity, reverse=True)
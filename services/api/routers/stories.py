@@ -0,0 +1,45 @@
+from __future__ import annotations
+from typing import Optional, List
+import time
+from fastapi import APIRouter, Depends, Query
+import asyncpg
+
+from services.api.deps import api_key_auth, db_pool
+from services.api.metrics import acquire
+from services.api.models import StoryOut
+
+router = APIRouter(dependencies=[Depends(api_key_auth)])
+
+STORIES_SQL = """
+SELECT story_id,
+       (ARRAY_AGG(title ORDER BY published_at))[1] AS headline,
+       COUNT(*) AS size,
+       MIN(published_at) AS first_published_at,
+       MAX(published_at) AS last_published_at,
+       ARRAY_AGG(id ORDER BY published_at DESC) AS item_ids
+FROM news
+WHERE story_id IS NOT NULL AND published_at >= $1
+GROUP BY story_id
+HAVING COUNT(*) >= $2
+ORDER BY MAX(published_at) DESC
+LIMIT $3
+"""
+
+@router.get("/stories", response_model=List[StoryOut])
+async def list_stories(
+    since: Optional[str] = Query(default=None, description="ISO8601 lower bound on published_at (default: last 24h)"),
+    min_size: int = Query(default=2, ge=1),
+    limit: int = Query(default=50, ge=1, le=200),
+    pool: asyncpg.Pool = Depends(db_pool),
+) -> list[StoryOut]:
+    since = since or time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - 24 * 3600))
+    async with acquire(pool) as conn:
+        rows = await conn.fetch(STORIES_SQL, since, min_size, limit)
+    return [
+        StoryOut(
+            story_id=r["story_id"], headline=r["headline"], size=r["size"],
+            first_published_at=r["first_published_at"], last_published_at=r["last_published_at"],
+            item_ids=r["item_ids"],
+        )
+        for r in rows
+    ]
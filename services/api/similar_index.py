@@ -0,0 +1,34 @@
+from __future__ import annotations
+from typing import Optional
+import threading
+import time
+from loguru import logger
+
+from services.pathway_services.news.analytics.hnsw import HNSWReader, current_version
+
+_reader: Optional[HNSWReader] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+CHECK_INTERVAL_SECONDS = 1.0
+
+def get_similar_reader(path: str) -> Optional[HNSWReader]:
+    """
+    Memory-mapped view of the worker's latest index version. The CURRENT pointer is
+    re-read at most once per second; switching versions remaps files and indexes the
+    ids of the new rows, so call it off the event loop.
+    """
+    global _reader, _checked_at
+    with _lock:
+        now = time.monotonic()
+        if now - _checked_at < CHECK_INTERVAL_SECONDS and _reader is not None:
+            return _reader
+        _checked_at = now
+        version = current_version(path)
+        if version and (_reader is None or _reader.version != version):
+            try:
+                _reader = HNSWReader(path, version)
+                logger.info("🧭 Loaded similarity index {} ({} items)", version, _reader.count)
+            except FileNotFoundError:
+                # The worker pruned this version between reading CURRENT and opening it.
+                pass
+        return _reader
@@ -1,26 +1,88 @@
 from __future__ import annotations
+import asyncio
+import random
+import time
+from contextlib import suppress
+import orjson
+from loguru import logger
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from redis.asyncio import Redis
 
 from services.api.deps import redis_client, api_key_auth
+from services.api.metrics import FRESHNESS_SECONDS, WS_CLIENTS, WS_SEND_QUEUE_DEPTH
 from services.pathway_services.utils.config import settings
+from services.pathway_services.utils.tracing import PUBLISH, stage_deltas
 
 router = APIRouter()
 
+_publish_client = FRESHNESS_SECONDS.labels(segment="publish_client")
+
+def _record_delivery(data: str, delivered: float) -> None:
+    """Publish-to-client latency from the worker's trace stamps (parsed only for sampled messages)."""
+    try:
+        trace = orjson.loads(data).get("trace") or {}
+    except orjson.JSONDecodeError:
+        return
+    published = trace.get(PUBLISH)
+    if published is None:
+        return
+    _publish_client.observe(max(0.0, delivered - published))
+    logger.debug("🧵 Delivered trace {}", stage_deltas({**trace, "client": delivered}))
+
+async def _sender(websocket: WebSocket, queue: asyncio.Queue) -> None:
+    rate = settings.TRACE_SAMPLE_RATE
+    while True:
+        data = await queue.get()
+        await websocket.send_text(data)
+        if rate and random.random() < rate:
+            _record_delivery(data, time.time())
+
+async def _reader(pubsub, queue: asyncio.Queue) -> None:
+    async for msg in pubsub.listen():
+        if msg is None or msg.get("type") != "message":
+            continue
+        queue.put_nowait(msg.get("data"))
+        WS_SEND_QUEUE_DEPTH.observe(queue.qsize())
+
+async def _until_disconnect(websocket: WebSocket) -> None:
+    # Clients never send anything meaningful; receiving only surfaces a close.
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+async def _release(pubsub, tasks) -> None:
+    await asyncio.wait(tasks)
+    await pubsub.unsubscribe(settings.WS_REDIS_CHANNEL)
+    await pubsub.close()
+
 @router.websocket("/ws/news")
 async def ws_news(websocket: WebSocket, redis: Redis = Depends(redis_client)):
     await websocket.accept()
+    WS_CLIENTS.inc()
     pubsub = redis.pubsub()
     await pubsub.subscribe(settings.WS_REDIS_CHANNEL)
+    # The per-client queue decouples Redis reads from slow sockets; its depth and the
+    # publish-to-client latency show a client falling behind. Whichever of the reader,
+    # the sender or the disconnect watcher finishes first ends the subscription.
+    queue: asyncio.Queue = asyncio.Queue()
+    tasks = [
+        asyncio.create_task(_reader(pubsub, queue)),
+        asyncio.create_task(_sender(websocket, queue)),
+        asyncio.create_task(_until_disconnect(websocket)),
+    ]
     try:
-        async for msg in pubsub.listen():
-            if msg is None or msg.get("type") != "message":
-                continue
-            data = msg.get("data")
-            await websocket.send_text(data)
-    except WebSocketDisconnect:
-        pass
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                logger.warning("WebSocket client dropped: {}", exc)
     finally:
-        await pubsub.unsubscribe(settings.WS_REDIS_CHANNEL)
-        await pubsub.close()
-        await websocket.close()
+        WS_CLIENTS.dec()
+        for task in tasks:
+            task.cancel()
+        # Shielded so the subscription is released even when the handler is cancelled.
+        await asyncio.shield(_release(pubsub, tasks))
+        with suppress(RuntimeError):
+            await websocket.close()
@@ -0,0 +1,233 @@
+"""
+Columnar Parquet archive of enriched news, for analytics that should not scan Postgres.
+
+Layout is hive-partitioned by publication date and hour::
+
+    <root>/date=2024-05-01/hour=09/part-<ns>.parquet
+
+Files are zstd-compressed with row-group statistics. ``entities`` and ``numbers`` are
+flattened into typed list columns (``companies``, ``percentages``...). Queries open the
+dataset through memory-mapped files and read only the requested columns and partitions.
+Writers hold a shared lock on ``<root>/.lock`` and compaction an exclusive one, so a
+compaction never merges a partition the live sink or an export is writing into.
+
+    python -m services.pathway_services.archive export --root data/archive --since 2024-05-01T00:00:00Z
+    python -m services.pathway_services.archive query --root data/archive --start 2024-05-01 --columns id,title,relevance
+    python -m services.pathway_services.archive compact --root data/archive
+"""
+from __future__ import annotations
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import argparse
+import asyncio
+import datetime as dt
+import fcntl
+import glob
+import json
+import os
+import re
+import time
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.timeutil import to_epoch
+
+ENTITY_COLUMNS = ("companies", "indices", "regulators")
+NUMBER_COLUMNS = ("percentages", "amounts", "points", "bps")
+
+SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("source", pa.string()),
+    ("title", pa.string()),
+    ("url", pa.string()),
+    ("published_at", pa.timestamp("us", tz="UTC")),
+    ("summary", pa.string()),
+    ("content", pa.string()),
+    ("categories", pa.list_(pa.string())),
+    ("sentiment", pa.string()),
+    ("sentiment_confidence", pa.float32()),
+    ("relevance", pa.int16()),
+    ("market_impact", pa.string()),
+    ("story_id", pa.string()),
+    ("dict_version", pa.string()),
+    *[(c, pa.list_(pa.string())) for c in ENTITY_COLUMNS],
+    *[(c, pa.list_(pa.float64())) for c in NUMBER_COLUMNS],
+    ("currencies", pa.list_(pa.string())),  # ISO code (or null) for each entry of ``amounts``
+])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("hour", pa.int8())]), flavor="hive")
+
+_NUMERIC = re.compile(r"-?\d+(?:\.\d+)?")
+
+def parse_number(text: str) -> Optional[float]:
+    """``"₹1,234.5"`` / ``"2.5%"`` / ``"120 points"`` -> float; None if there is no number."""
+    m = _NUMERIC.search(text.replace(",", ""))
+    return float(m.group()) if m else None
+
+def _as_float(value: Any) -> Optional[float]:
+    # EntityExtractor emits floats; rows enriched before that still carry raw strings.
+    if isinstance(value, (int, float)):
+        return float(value)
+    return parse_number(str(value))
+
+def to_record(item: NewsItem) -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        "id": item.id,
+        "source": item.source,
+        "title": item.title,
+        "url": item.url,
+        "published_at": dt.datetime.fromtimestamp(to_epoch(item.published_at), tz=dt.timezone.utc),
+        "summary": item.summary,
+        "content": item.content,
+        "categories": list(item.categories),
+        "sentiment": item.sentiment,
+        "sentiment_confidence": item.sentiment_confidence,
+        "relevance": item.relevance,
+        "market_impact": item.market_impact,
+        "story_id": item.story_id,
+        "dict_version": item.dict_version,
+    }
+    for c in ENTITY_COLUMNS:
+        record[c] = list(item.entities.get(c) or [])
+    for c in NUMBER_COLUMNS:
+        if c != "amounts":
+            values = (_as_float(v) for v in item.numbers.get(c) or [])
+            record[c] = [v for v in values if v is not None]
+    # One pass so that an amount that does not parse drops its currency with it.
+    currencies = item.numbers.get("currencies") or []
+    record["amounts"], record["currencies"] = [], []
+    for i, value in enumerate(item.numbers.get("amounts") or []):
+        amount = _as_float(value)
+        if amount is not None:
+            record["amounts"].append(amount)
+            record["currencies"].append(currencies[i] if i < len(currencies) else None)
+    return record
+
+@contextmanager
+def _locked(root: str, exclusive: bool) -> Iterator[None]:
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def write_partitioned(root: str, records: Sequence[Dict[str, Any]], row_group_size: int = 64 * 1024) -> List[str]:
+    """Write records into their date/hour partitions; returns the files written."""
+    groups: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+    for r in records:
+        ts = r["published_at"]
+        groups[(ts.strftime("%Y-%m-%d"), ts.hour)].append(r)
+    written = []
+    with _locked(root, exclusive=False):
+        for (date, hour), rows in sorted(groups.items()):
+            rows.sort(key=lambda r: r["published_at"])  # tighter min/max statistics per row group
+            directory = os.path.join(root, f"date={date}", f"hour={hour:02d}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{time.time_ns()}.parquet")
+            tmp = path + ".tmp"
+            pq.write_table(pa.Table.from_pylist(rows, schema=SCHEMA), tmp, compression="zstd",
+                           row_group_size=row_group_size, write_statistics=True)
+            os.replace(tmp, path)
+            written.append(path)
+    return written
+
+def open_archive(root: str) -> ds.Dataset:
+    return ds.dataset(root, schema=SCHEMA.append(pa.field("date", pa.string())).append(pa.field("hour", pa.int8())),
+                      format="parquet", partitioning=PARTITIONING,
+                      filesystem=pafs.LocalFileSystem(use_mmap=True), exclude_invalid_files=True)
+
+def query_archive(root: str, columns: Optional[Sequence[str]] = None, start: Optional[str] = None,
+                  end: Optional[str] = None, where: Optional[ds.Expression] = None) -> pa.Table:
+    """
+    Read ``columns`` for items published in [start, end). Partition pruning uses the
+    date directories; published_at row-group statistics skip the rest.
+    """
+    expr = where
+    for bound, op in ((start, "ge"), (end, "lt")):
+        if bound is None:
+            continue
+        ts = dt.datetime.fromtimestamp(to_epoch(bound), tz=dt.timezone.utc)
+        date_expr = ds.field("date") >= ts.strftime("%Y-%m-%d") if op == "ge" else ds.field("date") <= ts.strftime("%Y-%m-%d")
+        time_expr = ds.field("published_at") >= ts if op == "ge" else ds.field("published_at") < ts
+        expr = date_expr & time_expr if expr is None else expr & date_expr & time_expr
+    return open_archive(root).to_table(columns=list(columns) if columns else None, filter=expr)
+
+def compact(root: str) -> int:
+    """
+    Merge each hour partition's part files into one; returns the partitions rewritten.
+    Writers wait while a partition is being merged (and a merge waits for running writes).
+    """
+    merged = 0
+    for directory in sorted(glob.glob(os.path.join(root, "date=*", "hour=*"))):
+        with _locked(root, exclusive=True):
+            parts = sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+            if len(parts) < 2:
+                continue
+            table = pq.read_table(parts, schema=SCHEMA, memory_map=True).sort_by("published_at")
+            path = os.path.join(directory, f"part-{time.time_ns()}.parquet")
+            pq.write_table(table, path + ".tmp", compression="zstd", write_statistics=True)
+            os.replace(path + ".tmp", path)
+            for p in parts:
+                os.remove(p)
+        merged += 1
+    return merged
+
+# ---------------------------------------------------------------- CLI
+
+async def _export(root: str, since: Optional[str], page_size: int) -> int:
+    from services.pathway_services.reenrich import PostgresStore, row_to_item
+    from services.pathway_services.utils.config import settings
+
+    store = PostgresStore(settings.POSTGRES_URL)
+    # published_at is stored as ISO text, so the bound is compared in that form.
+    floor = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(to_epoch(since))) if since else None
+    last_id, total = "", 0
+    try:
+        while True:
+            rows = await store.page(last_id, page_size, published_since=floor)
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            items: Iterable[NewsItem] = (row_to_item(r) for r in rows)
+            await asyncio.to_thread(write_partitioned, root, [to_record(i) for i in items])
+            total += len(rows)
+    finally:
+        await store.close()
+    return total
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Copy rows from Postgres into the archive")
+    export.add_argument("--root", default="data/archive")
+    export.add_argument("--since", help="Only items published at or after this ISO timestamp")
+    export.add_argument("--page-size", type=int, default=20_000)
+    query = sub.add_parser("query", help="Read columns for a time range and print a JSON summary")
+    query.add_argument("--root", default="data/archive")
+    query.add_argument("--columns", default="id,published_at,source,title,relevance,market_impact")
+    query.add_argument("--start")
+    query.add_argument("--end")
+    query.add_argument("--limit", type=int, default=10)
+    comp = sub.add_parser("compact", help="Merge small part files per hour partition")
+    comp.add_argument("--root", default="data/archive")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(json.dumps({"exported": asyncio.run(_export(args.root, args.since, args.page_size))}))
+    elif args.command == "query":
+        t0 = time.perf_counter()
+        table = query_archive(args.root, args.columns.split(","), args.start, args.end)
+        elapsed = time.perf_counter() - t0
+        preview = table.slice(0, args.limit).to_pylist()
+        print(json.dumps({"rows": table.num_rows, "elapsed_s": round(elapsed, 4), "preview": preview}, default=str))
+    else:
+        print(json.dumps({"partitions_compacted": compact(args.root)}))
+
+if __name__ == "__main__":
+    main()
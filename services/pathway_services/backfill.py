@@ -0,0 +1,267 @@
+"""
+Reprocess a bounded range of the news topic after dictionary or scoring changes.
+
+Partitions are seeked to a start timestamp (``offsets_for_times``) or offset and read up
+to an end timestamp/offset (default: the end offsets when the run starts). Stateless
+transforms run in a process pool on whole batches; stateful ones (story clustering)
+run in order in this process. Rows are written with COPY + upsert; no WebSocket,
+burst or feed output is produced, but the ids of rewritten rows inside the API's hot
+window are published so the API reloads them.
+
+    python -m services.pathway_services.backfill --start 2024-05-01T00:00:00Z --end 2024-05-15T00:00:00Z
+    python -m services.pathway_services.backfill --start-offset 0 --workers 8 --batch-size 2000
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+
+import orjson
+from aiokafka import AIOKafkaConsumer, TopicPartition
+
+from services.pathway_services.connectors.kafka_input import to_news_item
+from services.pathway_services.connectors.memory import InMemoryBroker, MemoryPostgresSink
+from services.pathway_services.connectors.postgres_sink import BulkPostgresWriter
+from services.pathway_services.database.redis import get_redis, publish_changed
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.config import settings
+from services.pathway_services.utils.logger import logger
+from services.pathway_services.utils.timeutil import to_epoch
+
+@dataclass
+class Range:
+    start: Dict[int, int]
+    end: Dict[int, int]
+
+    @property
+    def total(self) -> int:
+        return sum(max(0, self.end[p] - self.start[p]) for p in self.start)
+
+# ---------------------------------------------------------------- sources
+
+async def kafka_batches(brokers: str, topic: str, start_ts: Optional[float], end_ts: Optional[float],
+                        start_offset: Optional[int], end_offset: Optional[int], batch_size: int,
+                        ready: asyncio.Future) -> AsyncIterator[List[bytes]]:
+    """Raw message values in batches; sets ``ready`` to the resolved Range before the first batch."""
+    consumer = AIOKafkaConsumer(
+        bootstrap_servers=brokers.split(","),
+        group_id=None,
+        enable_auto_commit=False,
+        max_poll_records=batch_size,
+        fetch_max_bytes=64 * 1024 * 1024,
+        max_partition_fetch_bytes=16 * 1024 * 1024,
+    )
+    await consumer.start()
+    try:
+        tps = [TopicPartition(topic, p) for p in sorted(consumer.partitions_for_topic(topic) or ())]
+        consumer.assign(tps)
+        latest = await consumer.end_offsets(tps)
+        earliest = await consumer.beginning_offsets(tps)
+
+        async def resolve(ts: Optional[float], offset: Optional[int], default: Dict[TopicPartition, int]):
+            if ts is not None:
+                found = await consumer.offsets_for_times({tp: int(ts * 1000) for tp in tps})
+                return {tp: found[tp].offset if found[tp] is not None else latest[tp] for tp in tps}
+            if offset is not None:
+                return {tp: min(max(offset, earliest[tp]), latest[tp]) for tp in tps}
+            return dict(default)
+
+        start = await resolve(start_ts, start_offset, earliest)
+        end = await resolve(end_ts, end_offset, latest)
+        ready.set_result(Range({tp.partition: start[tp] for tp in tps}, {tp.partition: end[tp] for tp in tps}))
+
+        remaining = set()
+        for tp in tps:
+            if start[tp] < end[tp]:
+                consumer.seek(tp, start[tp])
+                remaining.add(tp)
+        while remaining:
+            fetched = await consumer.getmany(*remaining, timeout_ms=1000, max_records=batch_size)
+            batch: List[bytes] = []
+            for tp, messages in fetched.items():
+                for msg in messages:
+                    if msg.offset >= end[tp]:
+                        break
+                    batch.append(msg.value)
+            # By fetch position, not the last message: compacted-away offsets and
+            # transaction markers just before the end never arrive as messages.
+            for tp in list(remaining):
+                if await consumer.position(tp) >= end[tp]:
+                    remaining.discard(tp)
+                    consumer.pause(tp)
+            if batch:
+                yield batch
+    finally:
+        await consumer.stop()
+
+async def memory_batches(broker: InMemoryBroker, topic: str, start_ts: Optional[float], end_ts: Optional[float],
+                         start_offset: Optional[int], end_offset: Optional[int], batch_size: int,
+                         ready: asyncio.Future) -> AsyncIterator[List[bytes]]:
+    """Same contract as kafka_batches over an InMemoryBroker (PIPELINE_BACKEND=memory)."""
+    def resolve(p: int, ts: Optional[float], offset: Optional[int], default: int) -> int:
+        if ts is not None:
+            return broker.offset_for_time(topic, p, ts)
+        if offset is not None:
+            return min(offset, broker.end_offset(topic, p))
+        return default
+
+    parts = range(broker.partitions)
+    rng = Range(
+        {p: resolve(p, start_ts, start_offset, 0) for p in parts},
+        {p: resolve(p, end_ts, end_offset, broker.end_offset(topic, p)) for p in parts},
+    )
+    ready.set_result(rng)
+    for p in parts:
+        offset = rng.start[p]
+        while offset < rng.end[p]:
+            records = broker.fetch(topic, p, offset, min(batch_size, rng.end[p] - offset))
+            offset = records[-1].offset + 1
+            yield [r.value for r in records]
+
+# ---------------------------------------------------------------- transforms
+
+_stateless: list = []
+
+def init_worker(dictionaries: Any) -> None:
+    """
+    Process-pool initializer: build the stateless transforms once per worker, on the
+    driver's DictionaryStore (it pickles as its current version only), so every worker
+    enriches with the version the driver loaded rather than re-reading the file.
+    """
+    global _stateless
+    from services.pathway_services.main import build_transforms
+    _stateless = [t for t in build_transforms(dictionaries) if not getattr(t, "stateful", False)]
+
+def apply_stateless(items: List[NewsItem]) -> List[NewsItem]:
+    out = []
+    for item in items:
+        for t in _stateless:
+            item = t(item)
+        out.append(item)
+    return out
+
+def enrich_batch(values: List[bytes]) -> List[NewsItem]:
+    """Decode and run the stateless transforms over one batch (executes in a pool worker)."""
+    return apply_stateless([to_news_item(orjson.loads(value)) for value in values])
+
+# ---------------------------------------------------------------- driver
+
+async def notify_hot_windows(redis: Any, items: List[NewsItem]) -> None:
+    """
+    Rows written here bypass the live stream the API hot windows follow: publish the
+    ids of those inside the window so each API process reloads them from Postgres.
+    """
+    if redis is None:
+        return
+    cutoff = time.time() - settings.HOT_STORE_WINDOW_SECONDS
+    ids = [item.id for item in items if to_epoch(item.published_at) >= cutoff]
+    try:
+        await publish_changed(redis, settings.HOT_STORE_CHANGED_CHANNEL, ids)
+    except Exception as e:
+        logger.warning("Could not notify hot windows of {} rewritten rows: {}", len(ids), e)
+
+class Progress:
+    def __init__(self, total: int, every: float = 5.0, label: str = "Backfill") -> None:
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.every = every
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed else 0.0
+
+    def advance(self, n: int) -> None:
+        self.done += n
+        now = time.perf_counter()
+        if now - self._last >= self.every:
+            self._last = now
+            rate = self.rate
+            eta = (self.total - self.done) / rate if rate else float("inf")
+            logger.info("⏩ {} {}/{} ({:.1f}%) {:.0f} items/s, ETA {:.0f}s",
+                        self.label, self.done, self.total, 100.0 * self.done / max(self.total, 1), rate, eta)
+
+async def run_backfill(args: argparse.Namespace) -> dict:
+    from services.pathway_services.main import build_dictionaries, build_memory_input, build_transforms
+
+    loop = asyncio.get_running_loop()
+    ready: asyncio.Future = loop.create_future()
+    bounds = dict(start_ts=args.start, end_ts=args.end, start_offset=args.start_offset,
+                  end_offset=args.end_offset, batch_size=args.batch_size, ready=ready)
+    if settings.PIPELINE_BACKEND == "memory":
+        batches = memory_batches(build_memory_input().broker, settings.KAFKA_TOPIC_NEWS, **bounds)
+        writer = MemoryPostgresSink()
+        redis = None
+    else:
+        batches = kafka_batches(settings.KAFKA_BROKERS, settings.KAFKA_TOPIC_NEWS, **bounds)
+        writer = BulkPostgresWriter(settings.POSTGRES_URL)
+        redis = await get_redis(settings.REDIS_URL)
+    dictionaries = build_dictionaries()
+    stateful = [t for t in build_transforms(dictionaries) if getattr(t, "stateful", False)]
+
+    progress: Optional[Progress] = None
+    pending: deque = deque()
+    window = args.workers * 2
+
+    async def drain_one() -> None:
+        items = await pending.popleft()
+        for t in stateful:
+            items = [t(item) for item in items]
+        await writer.write(items)
+        await notify_hot_windows(redis, items)
+        progress.advance(len(items))
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(dictionaries,)) as pool:
+        async for values in batches:
+            if progress is None:
+                rng = ready.result()
+                progress = Progress(rng.total)
+                logger.info("⏪ Backfilling {} items from {} partitions", rng.total, len(rng.start))
+            # Bounded look-ahead keeps workers busy while results are applied in order.
+            pending.append(loop.run_in_executor(pool, enrich_batch, values))
+            if len(pending) >= window:
+                await drain_one()
+        while pending:
+            await drain_one()
+    close = getattr(writer, "close", None)
+    if close is not None:
+        await close()
+
+    done = progress.done if progress else 0
+    elapsed = time.perf_counter() - progress.started if progress else 0.0
+    return {"items": done, "elapsed_s": round(elapsed, 2), "items_per_s": round(done / elapsed, 1) if elapsed else None,
+            "workers": args.workers, "batch_size": args.batch_size}
+
+def _timestamp(value: str) -> float:
+    ts = to_epoch(value, default=math.nan)
+    if math.isnan(ts):
+        raise argparse.ArgumentTypeError(f"not an ISO timestamp: {value!r}")
+    return ts
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument("--start", type=_timestamp, help="ISO timestamp to seek every partition to")
+    start.add_argument("--start-offset", type=int, help="Offset to seek every partition to (default: earliest)")
+    end = parser.add_mutually_exclusive_group()
+    end.add_argument("--end", type=_timestamp, help="ISO timestamp to stop at (exclusive)")
+    end.add_argument("--end-offset", type=int, help="Offset to stop at (default: end offsets at start-up)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logger.info("🚀 Starting backfill on {} (backend={})", settings.KAFKA_TOPIC_NEWS, settings.PIPELINE_BACKEND)
+    print(json.dumps(asyncio.run(run_backfill(args))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Fixed vs adaptive micro-batching under a changing arrival rate.
+
+Items from the seeded stream arrive following ``--profile`` (``rate:seconds`` phases,
+e.g. quiet, market open, quiet) and go through the worker's transform DAG (inline)
+and an encoding sink via a MicroBatcher. Each policy reports enqueue-to-sink latency
+percentiles (from each item's scheduled arrival), throughput and batch sizes:
+
+    python -m services.pathway_services.benchmarks.batching --profile 50:4,400:4,50:8 --target-p99 0.5
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import argparse
+import asyncio
+import copy
+import json
+import time
+
+import numpy as np
+
+from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+from services.pathway_services.benchmarks.pipeline import EncodingSink
+from services.pathway_services.connectors.batching import BatchController, MicroBatcher
+from services.pathway_services.news.processors.dag import TransformDAG, apply_batch
+from services.pathway_services.schema import NewsItem
+
+class FixedPolicy(BatchController):
+    """Constant size and wait, for comparison."""
+
+    def __init__(self, size: int, wait: float, name: str) -> None:
+        super().__init__(min_size=size, max_size=size, name=name)
+        self.size, self.wait = size, wait
+
+    def decide(self) -> Tuple[int, float]:
+        return self.size, self.wait
+
+def parse_profile(spec: str) -> List[Tuple[float, float]]:
+    return [(float(rate), float(seconds)) for rate, seconds in (p.split(":") for p in spec.split(","))]
+
+async def run_policy(controller: BatchController, items: List[NewsItem], profile: List[Tuple[float, float]],
+                     dag: TransformDAG) -> Dict[str, object]:
+    sink = EncodingSink("sink")
+    latencies: List[float] = []
+    sizes: List[int] = []
+
+    async def process(batch: List[NewsItem]) -> None:
+        sizes.append(len(batch))
+        for item in await apply_batch([dag], batch):
+            await sink.emit(item)
+            latencies.append(time.monotonic() - item.trace["enqueued"])
+
+    batcher = MicroBatcher(controller, process)
+    batcher.start()
+    stream = iter(items)
+    started = time.monotonic()
+    phase_start, sent = started, 0
+    for rate, seconds in profile:
+        # Items are due on a fixed schedule; while processing holds the loop they
+        # queue up and are put as one burst, as a consumer would see them.
+        for i in range(int(rate * seconds)):
+            due = phase_start + i / rate
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            item = next(stream)
+            item.trace["enqueued"] = due
+            await batcher.put(item)
+            sent += 1
+        phase_start += seconds
+    await batcher.stop()
+    wall = time.monotonic() - started
+    ms = np.asarray(latencies) * 1e3
+    return {
+        "items": sent,
+        "items_per_s": round(sent / wall, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+        "batches": len(sizes),
+        "mean_batch": round(float(np.mean(sizes)), 1),
+        "max_batch": int(max(sizes)),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", default="50:4,400:4,50:8")
+    parser.add_argument("--target-p99", type=float, default=0.5)
+    parser.add_argument("--fixed", type=int, nargs="+", default=[1, 500], help="fixed batch sizes to compare")
+    parser.add_argument("--fixed-wait", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from services.pathway_services.main import build_transforms
+
+    profile = parse_profile(args.profile)
+    total = int(sum(rate * seconds for rate, seconds in profile)) + 1
+    items = NewsGenerator(GeneratorConfig(seed=args.seed)).items(total)
+    dag = TransformDAG(build_transforms(), executor="inline", name="bench")
+    policies = [(f"fixed_{size}", FixedPolicy(size, args.fixed_wait, f"fixed_{size}")) for size in args.fixed]
+    policies.append(("adaptive", BatchController(target_p99=args.target_p99, name="adaptive")))
+    results = {"profile": args.profile, "target_p99_ms": args.target_p99 * 1e3, "policies": {}}
+    for name, controller in policies:
+        results["policies"][name] = asyncio.run(run_policy(controller, copy.deepcopy(items), profile, dag))
+    dag.close()
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Dictionary compile time and entity matching cost as the alias count grows, plus a
+hot swap under load: items are enriched in a loop while the watched file is rewritten
+with a new version, and every item must come out matched against exactly one version.
+
+    python -m services.pathway_services.benchmarks.dictionaries --aliases 1000 50000 --items 2000
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+from services.pathway_services.news.processors.entity_extractor import EntityExtractor
+from services.pathway_services.utils.dictionaries import CompiledDictionaries, DictionaryStore, builtin_source
+from services.pathway_services.utils.keywords import COMPANIES_IN
+
+def synthetic_source(aliases: int, version: str, seed: int = 0) -> dict:
+    """The built-in dictionaries plus ``aliases`` made-up company aliases (three per name)."""
+    rng = random.Random(seed)
+    source = builtin_source()
+    companies = {name: [] for name in COMPANIES_IN}
+    syllables = ["tata", "adi", "vik", "ram", "sun", "jai", "neo", "tech", "fin", "agro", "pharma", "power"]
+    for i in range(max(0, aliases - len(COMPANIES_IN)) // 3):
+        name = " ".join(rng.choice(syllables) for _ in range(rng.randint(1, 3))).title() + f" {i} Ltd"
+        companies[name] = [name.replace(" Ltd", ""), f"{name.split()[0]}{i}"]
+    source.update(version=version, companies=companies)
+    return source
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aliases", type=int, nargs="+", default=[1000, 50000])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    items = list(NewsGenerator(GeneratorConfig(seed=args.seed)).items(args.items))
+    results = {"items": len(items), "dictionaries": {}}
+    for n in args.aliases:
+        source = synthetic_source(n, f"synthetic-{n}")
+        t0 = time.perf_counter()
+        compiled = CompiledDictionaries(source)
+        compile_s = time.perf_counter() - t0
+        texts = [" ".join(filter(None, [i.title, i.summary or "", i.content or ""])).lower() for i in items]
+        t0 = time.perf_counter()
+        for text in texts:
+            compiled.entities.match(text)
+        match_s = time.perf_counter() - t0
+        results["dictionaries"][n] = {
+            "entity_aliases": len(compiled.entities),
+            "compile_ms": round(compile_s * 1e3, 1),
+            "match_us_per_item": round(match_s / len(texts) * 1e6, 2),
+        }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dictionaries.json")
+        with open(path, "w") as f:
+            json.dump(synthetic_source(1000, "v1"), f)
+        store = DictionaryStore(path, poll_interval=0.01)
+        store.start()
+        extract = EntityExtractor(store)
+        versions: dict = {}
+        swapped = False
+        deadline = time.perf_counter() + 10
+        while time.perf_counter() < deadline:
+            for item in items:
+                extract(item)
+                versions[item.dict_version] = versions.get(item.dict_version, 0) + 1
+            if not swapped:
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(synthetic_source(max(args.aliases), "v2"), f)
+                os.replace(tmp_path, path)
+                swapped = True
+            elif "v2" in versions:
+                break
+        store.stop()
+        results["hot_swap"] = {"items_per_version": versions, "final_version": store.version}
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
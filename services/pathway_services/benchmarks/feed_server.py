@@ -0,0 +1,161 @@
+"""
+Local RSS stand-in for exercising conditional, incremental fetching.
+
+Serves the newest ``--window`` items of a seeded NewsGenerator stream as RSS 2.0 at
+any path, advancing the stream in (sped-up) wall-clock time, with ETag and
+Last-Modified validators and 304 replies. ``--compare`` polls it with RSSFeed and
+with a plain full download side by side and reports bytes and items per poll:
+
+    python -m services.pathway_services.benchmarks.feed_server --compare --polls 30 --speedup 5
+    python -m services.pathway_services.benchmarks.feed_server --port 8765   # serve only
+"""
+from __future__ import annotations
+from collections import defaultdict, deque
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict
+from xml.sax.saxutils import escape
+import argparse
+import asyncio
+import datetime as dt
+import json
+import tempfile
+import threading
+import time
+
+import httpx
+
+from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+from services.pathway_services.news.fetchers.rss import RSSFeed, parse_feed
+from services.pathway_services.schema import NewsItem
+
+class FeedServer:
+    def __init__(self, config: GeneratorConfig, window: int = 50, speedup: float = 1.0, port: int = 0) -> None:
+        self.gen = NewsGenerator(config)
+        self.window = window
+        self.speedup = speedup
+        self.items: Deque[NewsItem] = deque(maxlen=window)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "not_modified": 0, "bytes": 0})
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._due = 0.0
+        self._next = self.gen.next()
+        self._body = b""
+        self._etag = ""
+        self._modified = ""
+        self._render()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.port = self.httpd.server_address[1]
+
+    def _advance(self) -> None:
+        elapsed = (time.monotonic() - self._started) * self.speedup
+        changed = False
+        while self._due + self._next[0] <= elapsed:
+            gap, item = self._next
+            self._due += gap
+            self.items.append(item)
+            self._next = self.gen.next()
+            changed = True
+        if changed:
+            self._render()
+
+    def _render(self) -> None:
+        entries = []
+        for item in reversed(self.items):
+            published = dt.datetime.fromisoformat(item.published_at)
+            entries.append(
+                f"<item><title>{escape(item.title)}</title><link>{escape(item.url)}</link>"
+                f"<guid>{escape(item.id)}</guid><pubDate>{format_datetime(published)}</pubDate>"
+                f"<description>{escape(item.summary or '')}</description></item>"
+            )
+        self._body = ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                      "<title>Bench wire</title>" + "".join(entries) + "</channel></rss>").encode()
+        self._etag = f'"{self.gen.config.seed}-{self.items[-1].id if self.items else 0}"'
+        if self.items:
+            self._modified = format_datetime(dt.datetime.fromisoformat(self.items[-1].published_at), usegmt=True)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with server._lock:
+                    server._advance()
+                    body, etag, modified = server._body, server._etag, server._modified
+                stats = server.stats[self.path]
+                stats["requests"] += 1
+                if self.headers.get("If-None-Match") == etag:
+                    stats["not_modified"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                stats["bytes"] += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                if modified:
+                    self.send_header("Last-Modified", modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "FeedServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+async def compare(server: FeedServer, polls: int, interval: float, state_dir: str) -> dict:
+    base = f"http://127.0.0.1:{server.port}"
+    feed = RSSFeed("bench", base + "/conditional.xml", state_dir=state_dir)
+    emitted = {"conditional": 0, "full": 0}
+    async with httpx.AsyncClient() as client:
+        for _ in range(polls):
+            emitted["conditional"] += len(await feed(client))
+            resp = await client.get(base + "/full.xml")
+            emitted["full"] += len(parse_feed(resp.content, "bench", "bench"))
+            await asyncio.sleep(interval)
+    out = {}
+    for mode, path in (("conditional", "/conditional.xml"), ("full", "/full.xml")):
+        stats = server.stats[path]
+        out[mode] = {**stats, "items_emitted": emitted[mode],
+                     "bytes_per_poll": round(stats["bytes"] / max(1, stats["requests"]))}
+    out["published"] = server.gen._seq - 1
+    return out
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rate", type=float, default=0.2, help="mean items/s outside bursts")
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--speedup", type=float, default=1.0)
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--polls", type=int, default=30)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    config = GeneratorConfig(seed=args.seed, rate_per_s=args.rate)
+    if not args.compare:
+        server = FeedServer(config, args.window, args.speedup, args.port)
+        print(f"Serving RSS on http://127.0.0.1:{server.port}/")
+        server.httpd.serve_forever()
+        return
+    server = FeedServer(config, args.window, args.speedup, port=0).start()
+    try:
+        with tempfile.TemporaryDirectory() as state_dir:
+            result = asyncio.run(compare(server, args.polls, args.poll_interval, state_dir))
+    finally:
+        server.stop()
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Seeded synthetic news stream for benchmarks.
+
+Items look like the wire feeds the worker sees: lognormal summary/content lengths,
+a configurable number of company/index/regulator mentions per item, percentages,
+amounts and index points, syndicated duplicates (same story, another source) and
+bursty arrivals from a two-state Markov-modulated Poisson process.
+
+    python -m services.pathway_services.benchmarks.generator --items 5 --seed 1
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+import argparse
+import math
+import random
+
+import orjson
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.keywords import (
+    CATEGORY_KEYWORDS, COMPANIES_IN, FIN_KEYWORDS_WEIGHTED, INDICES_IN, REGULATORS_IN,
+)
+
+SOURCES = ["Bloomberg", "CNBC", "Reuters", "Moneycontrol", "Economic Times", "Mint", "Business Standard"]
+
+HEADLINES = [
+    "{company} stock {move} {pct} after {keyword} update",
+    "{regulator} {action} as {index} {move} {points}",
+    "{index} {move} {points}; {company} leads {keyword} gains",
+    "{company} Q{quarter} earnings beat estimates, revenue at {amount}",
+    "{regulator} flags {keyword} risks, {company} in focus",
+    "{company} announces {amount} buyback; {index} {move} {pct}",
+    "Markets: {index} {move} {pct} as {regulator} {action}",
+]
+MOVES = ["rises", "falls", "gains", "slips", "jumps", "drops", "surges", "tumbles", "edges higher", "edges lower"]
+ACTIONS = ["holds rates", "hikes repo rate", "cuts rates", "tightens norms", "issues circular", "reviews policy"]
+FILLER = (
+    "the analysts said investors market session traders outlook quarter demand margin growth "
+    "guidance sector volumes liquidity foreign domestic institutional flows policy yields bond "
+    "currency rupee dollar crude prices index heavyweights earnings season expectations"
+).split()
+
+@dataclass
+class GeneratorConfig:
+    seed: int = 42
+    rate_per_s: float = 5.0          # mean arrival rate outside bursts
+    burst_multiplier: float = 20.0   # arrival rate multiplier inside a burst
+    burst_on_s: float = 60.0         # mean burst duration
+    burst_off_s: float = 900.0       # mean quiet period between bursts
+    entity_density: float = 2.5      # mean entity mentions per item (Poisson)
+    duplicate_rate: float = 0.08     # share of items that re-syndicate a recent story
+    content_rate: float = 0.3        # share of items carrying full content
+    summary_words: float = 35.0      # median summary length (lognormal)
+    content_words: float = 250.0     # median content length (lognormal)
+    start: str = "2024-01-01T03:45:00+00:00"
+
+class NewsGenerator:
+    """Deterministic for a given config: the same seed yields the same stream."""
+
+    def __init__(self, config: GeneratorConfig | None = None) -> None:
+        self.config = config or GeneratorConfig()
+        self.rng = random.Random(self.config.seed)
+        self.clock = datetime.fromisoformat(self.config.start)
+        self._in_burst = False
+        self._state_left = self.rng.expovariate(1.0 / self.config.burst_off_s)
+        self._burst_company = COMPANIES_IN[0]
+        self._recent: List[NewsItem] = []
+        self._seq = 0
+        self._keywords = list(FIN_KEYWORDS_WEIGHTED) + [k for ks in CATEGORY_KEYWORDS.values() for k in ks]
+
+    def _gap(self) -> float:
+        """Next inter-arrival gap, advancing the burst/quiet state machine."""
+        cfg = self.config
+        rate = cfg.rate_per_s * (cfg.burst_multiplier if self._in_burst else 1.0)
+        gap = self.rng.expovariate(rate)
+        self._state_left -= gap
+        if self._state_left <= 0:
+            self._in_burst = not self._in_burst
+            self._state_left = self.rng.expovariate(1.0 / (cfg.burst_on_s if self._in_burst else cfg.burst_off_s))
+            if self._in_burst:
+                self._burst_company = self.rng.choice(COMPANIES_IN)
+        return gap
+
+    def _words(self, median: float) -> int:
+        return max(3, int(self.rng.lognormvariate(math.log(median), 0.6)))
+
+    def _poisson(self, mean: float) -> int:
+        # Knuth; means here are small.
+        limit, k, p = math.exp(-mean), 0, 1.0
+        while True:
+            p *= self.rng.random()
+            if p <= limit:
+                return k
+            k += 1
+
+    def _numbers(self) -> dict:
+        rng = self.rng
+        return {
+            "pct": f"{rng.uniform(0.1, 9.9):.1f}%",
+            "points": f"{rng.randint(20, 900)} points",
+            "amount": rng.choice(["₹", "$"]) + f"{rng.randint(1, 999):,},{rng.randint(0, 999):03d}",
+            "quarter": rng.randint(1, 4),
+        }
+
+    def _text(self, words: int, mentions: List[str]) -> str:
+        out = self.rng.choices(FILLER, k=words)
+        for m in mentions:
+            out.insert(self.rng.randrange(len(out) + 1), m)
+        return " ".join(out).capitalize() + "."
+
+    def _fresh(self, published: str) -> NewsItem:
+        rng = self.rng
+        company = self._burst_company if self._in_burst and rng.random() < 0.7 else rng.choice(COMPANIES_IN)
+        fields = {
+            "company": company,
+            "index": rng.choice(INDICES_IN),
+            "regulator": rng.choice(REGULATORS_IN),
+            "keyword": rng.choice(self._keywords),
+            "move": rng.choice(MOVES),
+            "action": rng.choice(ACTIONS),
+            **self._numbers(),
+        }
+        title = rng.choice(HEADLINES).format(**fields)
+        pool = COMPANIES_IN + INDICES_IN + REGULATORS_IN
+        mentions = rng.sample(pool, min(len(pool), self._poisson(self.config.entity_density)))
+        mentions += [self._numbers()["pct"], self._numbers()["amount"]]
+        summary = self._text(self._words(self.config.summary_words), mentions)
+        content = None
+        if rng.random() < self.config.content_rate:
+            content = self._text(self._words(self.config.content_words), mentions + [fields["keyword"]])
+        return self._item(rng.choice(SOURCES), title, summary, content, published)
+
+    def _item(self, source: str, title: str, summary: str, content: str | None, published: str) -> NewsItem:
+        self._seq += 1
+        slug = source.lower().replace(" ", "-")
+        return NewsItem(
+            id=f"bench-{self.config.seed}-{self._seq}",
+            source=source,
+            title=title,
+            url=f"https://{slug}.example/news/{self._seq}",
+            published_at=published,
+            summary=summary,
+            content=content,
+            categories=[],
+            sentiment="neutral",
+            sentiment_confidence=0.5,
+            relevance=0,
+            market_impact="low",
+            entities={"companies": [], "indices": [], "regulators": []},
+            numbers={"percentages": [], "amounts": [], "currencies": [], "points": [], "bps": []},
+        )
+
+    def next(self) -> Tuple[float, NewsItem]:
+        """Returns (seconds since the previous item, item)."""
+        gap = self._gap()
+        self.clock += timedelta(seconds=gap)
+        published = self.clock.isoformat()
+        if self._recent and self.rng.random() < self.config.duplicate_rate:
+            orig = self.rng.choice(self._recent)
+            item = self._item(self.rng.choice(SOURCES), orig.title, orig.summary, orig.content, published)
+        else:
+            item = self._fresh(published)
+            self._recent.append(item)
+            if len(self._recent) > 200:
+                self._recent.pop(0)
+        return gap, item
+
+    def stream(self, n: int) -> Iterator[Tuple[float, NewsItem]]:
+        for _ in range(n):
+            yield self.next()
+
+    def items(self, n: int) -> List[NewsItem]:
+        return [item for _, item in self.stream(n)]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    gen = NewsGenerator(GeneratorConfig(seed=args.seed))
+    for gap, item in gen.stream(args.items):
+        print(orjson.dumps({"gap_s": round(gap, 4), **item.__dict__}).decode())
+
+if __name__ == "__main__":
+    main()
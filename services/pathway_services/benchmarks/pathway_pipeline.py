@@ -0,0 +1,104 @@
+"""
+Throughput of the Pathway dataflow (pathway_main.py) vs the asyncio loop (main.py).
+
+Both run the worker's transforms over the same seeded stream into encoding sinks: the
+asyncio loop reads an InMemoryBroker through MemoryKafkaInput with the inline DAG,
+the dataflow a python connector emitting the same JSON messages. Each Pathway
+thread count runs in its own process, since the engine reads PATHWAY_THREADS when
+it starts:
+
+    python -m services.pathway_services.benchmarks.pathway_pipeline --items 5000 --threads 1 2 4
+"""
+from __future__ import annotations
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import orjson
+
+from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+from services.pathway_services.benchmarks.pipeline import EncodingSink
+from services.pathway_services.connectors.memory import InMemoryBroker, MemoryKafkaInput
+from services.pathway_services.news.processors.dag import TransformDAG
+from services.pathway_services.utils.timeutil import to_epoch
+
+TOPIC = "bench"
+
+def messages(n: int, seed: int) -> List[Dict[str, Any]]:
+    out = []
+    for item in NewsGenerator(GeneratorConfig(seed=seed)).items(n):
+        raw = orjson.loads(orjson.dumps(item.__dict__))
+        raw.pop("trace", None)
+        out.append(raw)
+    return out
+
+def run_asyncio(msgs: List[Dict[str, Any]], batch_size: int) -> Dict[str, Any]:
+    from services.pathway_services.main import build_transforms
+
+    broker = InMemoryBroker(partitions=4)
+    for raw in msgs:
+        broker.produce(TOPIC, orjson.dumps(raw), key=raw["id"].encode(), timestamp=to_epoch(raw["published_at"]))
+    sinks = [EncodingSink("postgres"), EncodingSink("redis")]
+    dag = TransformDAG(build_transforms(), executor="inline", name="bench")
+    t0 = time.perf_counter()
+    MemoryKafkaInput(broker, TOPIC, batch_size=batch_size).run_pipeline([dag], sinks)
+    wall = time.perf_counter() - t0
+    dag.close()
+    return {"items": sinks[0].count, "wall_s": round(wall, 2), "items_per_s": round(sinks[0].count / wall, 1)}
+
+def run_pathway(msgs: List[Dict[str, Any]], batch_size: int) -> Dict[str, Any]:
+    import pathway as pw
+
+    from services.pathway_services.main import build_transforms
+    from services.pathway_services.pathway_main import FIELDS, RawNewsSchema, SinkWriter, enrich
+
+    columns = {c: FIELDS.get(c, c) for c in RawNewsSchema.column_names()}
+
+    class Stream(pw.io.python.ConnectorSubject):
+        def run(self) -> None:
+            for raw in msgs:
+                self.next_json({c: raw.get(f) for c, f in columns.items()})
+
+    sinks = [EncodingSink("postgres"), EncodingSink("redis")]
+    raw = pw.io.python.read(Stream(), schema=RawNewsSchema, autocommit_duration_ms=100)
+    SinkWriter(sinks).subscribe(enrich(raw, build_transforms(), batch_size))
+    t0 = time.perf_counter()
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+    wall = time.perf_counter() - t0
+    return {"items": sinks[0].count, "wall_s": round(wall, 2), "items_per_s": round(sinks[0].count / wall, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--engine", choices=["all", "asyncio", "pathway"], default="all")
+    args = parser.parse_args()
+
+    msgs = messages(args.items, args.seed)
+    if args.engine == "asyncio":
+        print(json.dumps(run_asyncio(msgs, args.batch_size)))
+        return
+    if args.engine == "pathway":
+        print(json.dumps(run_pathway(msgs, args.batch_size)))
+        return
+
+    results: Dict[str, Any] = {"items": args.items, "batch_size": args.batch_size,
+                               "asyncio": run_asyncio(msgs, args.batch_size), "pathway": {}}
+    for threads in args.threads:
+        cmd = [sys.executable, "-m", "services.pathway_services.benchmarks.pathway_pipeline", "--engine", "pathway",
+               "--items", str(args.items), "--batch-size", str(args.batch_size), "--seed", str(args.seed)]
+        proc = subprocess.run(cmd, env={**os.environ, "PATHWAY_THREADS": str(threads)}, capture_output=True, text=True)
+        if proc.returncode != 0:
+            results["pathway"][f"threads_{threads}"] = {"error": proc.stderr.strip().splitlines()[-1:]}
+            continue
+        results["pathway"][f"threads_{threads}"] = json.loads(proc.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
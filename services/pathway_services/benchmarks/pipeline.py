@@ -0,0 +1,119 @@
+"""
+End-to-end pipeline benchmark: synthetic stream -> transforms -> sinks.
+
+Runs the worker's transforms over a seeded NewsGenerator stream and reports items/s
+and p50/p99 latency per stage, per sink and end to end as JSON, so runs before and
+after a change can be diffed. ``--backend memory`` replaces Postgres and Redis with
+sinks that only serialise the item; ``--backend local`` uses the real sinks against
+POSTGRES_URL / REDIS_URL.
+
+    python -m services.pathway_services.benchmarks.pipeline --items 20000 --seed 42
+    python -m services.pathway_services.benchmarks.pipeline --backend local --speedup 50
+"""
+from __future__ import annotations
+from typing import Any, Dict, List
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import orjson
+
+from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+from services.pathway_services.benchmarks.source import InProcessSource
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.logger import logger
+from services.pathway_services.utils.metrics import stage_name
+
+class EncodingSink:
+    """Stand-in for a network sink: pays the serialisation cost and keeps a count."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.count = 0
+        self.bytes = 0
+
+    async def emit(self, item: NewsItem) -> None:
+        self.bytes += len(orjson.dumps(item.__dict__))
+        self.count += 1
+
+class _TimedStage:
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self.name = stage_name(inner)
+        self.samples: List[float] = []
+
+    def __call__(self, item: NewsItem) -> NewsItem:
+        t0 = time.perf_counter()
+        item = self.inner(item)
+        self.samples.append(time.perf_counter() - t0)
+        return item
+
+class _TimedEmit(_TimedStage):
+    async def emit(self, item: NewsItem) -> None:
+        t0 = time.perf_counter()
+        await self.inner.emit(item)
+        self.samples.append(time.perf_counter() - t0)
+
+    async def flush(self) -> None:
+        flush = getattr(self.inner, "flush", None)
+        if flush is not None:
+            await flush()
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    us = np.asarray(samples) * 1e6
+    return {
+        "count": len(samples),
+        "mean_us": round(float(us.mean()), 2),
+        "p50_us": round(float(np.percentile(us, 50)), 2),
+        "p99_us": round(float(np.percentile(us, 99)), 2),
+        "max_us": round(float(us.max()), 2),
+    }
+
+def build_sinks(backend: str) -> List[Any]:
+    if backend == "memory":
+        return [EncodingSink("postgres"), EncodingSink("redis")]
+    from services.pathway_services.main import build_sinks as real_sinks
+    return real_sinks()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backend", choices=["memory", "local"], default="memory")
+    parser.add_argument("--speedup", type=float, default=None,
+                        help="Replay at generated arrival times divided by this factor (default: flat out)")
+    parser.add_argument("--duplicate-rate", type=float, default=GeneratorConfig.duplicate_rate)
+    parser.add_argument("--entity-density", type=float, default=GeneratorConfig.entity_density)
+    args = parser.parse_args()
+
+    from services.pathway_services.main import build_transforms
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    config = GeneratorConfig(seed=args.seed, duplicate_rate=args.duplicate_rate, entity_density=args.entity_density)
+    # Generate up front so generator cost is not billed to the pipeline.
+    stream = list(NewsGenerator(config).stream(args.items))
+
+    transforms = [_TimedStage(t) for t in build_transforms()]
+    sinks = [_TimedEmit(s) for s in build_sinks(args.backend)]
+    source = InProcessSource(stream, speedup=args.speedup)
+    source.run_pipeline(transforms, sinks)
+
+    print(json.dumps({
+        "config": {**vars(args), "python": platform.python_version()},
+        "items": len(source.latencies),
+        "elapsed_s": round(source.elapsed, 3),
+        "items_per_s": round(len(source.latencies) / source.elapsed, 1) if source.elapsed else None,
+        "end_to_end": summarize(source.latencies),
+        "stages": {t.name: summarize(t.samples) for t in transforms},
+        "sinks": {s.name: summarize(s.samples) for s in sinks},
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
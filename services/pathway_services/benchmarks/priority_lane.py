@@ -0,0 +1,99 @@
+"""
+Publish latency of breaking items with and without the priority lane.
+
+The seeded stream arrives at ``--rate`` items/s (above what one CPU enriches, so a
+bulk backlog builds) in 50 ms fetches, with one item in ``--every`` replaced by a
+breaking regulator headline. Items go through a MicroBatcher, the worker's transform
+DAG (inline) and the real RedisWebSocketSink over MemoryRedis plus an encoding
+stand-in for Postgres. Reports ingest-to-publish latency per lane, and the cost and
+hit rate of the PriorityClassifier on the unmodified stream:
+
+    python -m services.pathway_services.benchmarks.priority_lane --rate 400 --seconds 6 --every 100
+"""
+from __future__ import annotations
+from typing import Dict, List
+import argparse
+import asyncio
+import copy
+import json
+import time
+
+import numpy as np
+
+from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+from services.pathway_services.benchmarks.pipeline import EncodingSink
+from services.pathway_services.connectors.batching import BatchController, MicroBatcher, lanes
+from services.pathway_services.connectors.memory import MemoryRedis
+from services.pathway_services.connectors.websocket_sink import RedisWebSocketSink
+from services.pathway_services.database.redis import set_redis
+from services.pathway_services.news.processors.dag import TransformDAG
+from services.pathway_services.news.processors.priority import PriorityClassifier
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.tracing import INGEST, PUBLISH
+
+BREAKING = "RBI hikes repo rate by 25 bps in surprise move"
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1e3
+    return {"count": len(samples), "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p99_ms": round(float(np.percentile(ms, 99)), 1), "max_ms": round(float(ms.max()), 1)}
+
+async def run(items: List[NewsItem], rate: float, dag: TransformDAG, lane: bool, classify) -> Dict[str, object]:
+    set_redis(MemoryRedis())
+    sinks = [RedisWebSocketSink(redis_url="memory", channel="bench"), EncodingSink("postgres")]
+    bulk, priority = lanes([dag], sinks)
+    batcher = MicroBatcher(BatchController(target_p99=0.5, name="lane" if lane else "no_lane"), bulk,
+                           urgent=classify if lane else None, process_urgent=priority)
+    batcher.start()
+    fetch = 0.05
+    started = time.monotonic()
+    for i in range(0, len(items), max(1, int(rate * fetch))):
+        chunk = items[i:i + max(1, int(rate * fetch))]
+        delay = started + i / rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        now = time.time()
+        for item in chunk:
+            item.trace[INGEST] = now
+        await batcher.put_many(chunk)
+    await batcher.stop()
+    breaking = [item.trace[PUBLISH] - item.trace[INGEST] for item in items if item.title == BREAKING]
+    other = [item.trace[PUBLISH] - item.trace[INGEST] for item in items if item.title != BREAKING]
+    return {"breaking": percentiles(breaking), "bulk": percentiles(other),
+            "wall_s": round(time.monotonic() - started, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=400)
+    parser.add_argument("--seconds", type=float, default=6)
+    parser.add_argument("--every", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from services.pathway_services.main import build_transforms
+
+    items = NewsGenerator(GeneratorConfig(seed=args.seed)).items(int(args.rate * args.seconds))
+    classifier = PriorityClassifier()
+    t0 = time.perf_counter()
+    flagged = sum(classifier(item) for item in items)
+    classify_us = (time.perf_counter() - t0) / len(items) * 1e6
+    for item in items[::args.every]:
+        item.title = BREAKING
+    # The lane under test: only the injected headlines, so the result does not depend
+    # on how keyword-dense the synthetic titles are.
+    def is_breaking(item: NewsItem) -> bool:
+        return item.title == BREAKING
+
+    dag = TransformDAG(build_transforms(), executor="inline", name="bench")
+    results = {
+        "classifier": {"us_per_title": round(classify_us, 2), "flagged_share": round(flagged / len(items), 3)},
+        "no_lane": asyncio.run(run(copy.deepcopy(items), args.rate, dag, False, is_breaking)),
+        "lane": asyncio.run(run(copy.deepcopy(items), args.rate, dag, True, is_breaking)),
+    }
+    dag.close()
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
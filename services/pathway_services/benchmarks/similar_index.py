@@ -0,0 +1,102 @@
+"""
+Recall and latency of the HNSW similar-news index against brute-force search.
+
+Builds an index over clustered synthetic embeddings, saves it, reopens it memory-mapped
+the way the API does and compares top-k results with an exact scan. Then inserts
+``--append`` more items and saves again, which only writes the new rows and the links
+they changed, and times the API's switch to that version:
+
+    python -m services.pathway_services.benchmarks.similar_index --n 100000 --queries 500
+"""
+from __future__ import annotations
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from services.pathway_services.news.analytics.hnsw import HNSWIndex, HNSWReader
+
+def clustered_vectors(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    x = centers[rng.integers(0, clusters, n)] + rng.normal(size=(n, dim)) * 0.8
+    x = x.astype(np.float32)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x
+
+def percentiles(samples: list[float]) -> dict:
+    ms = np.array(samples) * 1e3
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--append", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    total = args.n + args.append
+    data = clustered_vectors(total, args.dim, clusters=max(10, total // 100), seed=args.seed)
+    index = HNSWIndex(args.dim)
+    t0 = time.perf_counter()
+    for i in range(args.n):
+        index.add(str(i), data[i])
+    build_s = time.perf_counter() - t0
+
+    path = tempfile.mkdtemp(prefix="hnsw-bench-")
+    t0 = time.perf_counter()
+    index.save(path)
+    full_save_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    reader = HNSWReader.open(path)
+    open_s = time.perf_counter() - t0
+
+    rng = np.random.default_rng(args.seed + 1)
+    rows = rng.integers(0, args.n, args.queries)
+    brute_lat, truth = [], []
+    for row in rows:
+        q = np.asarray(reader.vectors[row])
+        t = time.perf_counter()
+        sims = reader.vectors @ q
+        top = np.argpartition(-sims, args.k)[: args.k]
+        brute_lat.append(time.perf_counter() - t)
+        truth.append({str(i) for i in top.tolist()})
+
+    results = {"n": args.n, "dim": args.dim, "k": args.k, "build_s": round(build_s, 2),
+               "inserts_per_s": round(args.n / build_s, 1), "full_save_ms": round(full_save_s * 1e3, 1),
+               "open_ms": round(open_s * 1e3, 1), "brute_force": percentiles(brute_lat), "hnsw": []}
+    for ef in args.ef:
+        lat, recall = [], 0.0
+        for row, expected in zip(rows, truth):
+            q = np.asarray(reader.vectors[row])
+            t = time.perf_counter()
+            hits = reader.search(q, args.k, ef)
+            lat.append(time.perf_counter() - t)
+            recall += len(expected & {i for i, _ in hits}) / args.k
+        results["hnsw"].append({"ef": ef, "recall_at_k": round(recall / len(rows), 4), **percentiles(lat)})
+
+    if args.append:
+        for i in range(args.n, total):
+            index.add(str(i), data[i])
+        dirty = len(index._dirty0)
+        t0 = time.perf_counter()
+        index.save(path)
+        save_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reader = HNSWReader.open(path)
+        reopen_s = time.perf_counter() - t0
+        assert reader.row_of(str(total - 1)) == total - 1
+        results["append"] = {"items": args.append, "rows_rewritten": dirty,
+                             "incremental_save_ms": round(save_s * 1e3, 1), "reopen_ms": round(reopen_s * 1e3, 1)}
+    shutil.rmtree(path, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
 from __future__ import annotations
-from typing import List, Protocol
+from collections import OrderedDict
+from typing import Dict, List, Optional, Protocol
 from loguru import logger
 import asyncio
-import datetime as dt
 
 from services.pathway_services.schema import NewsItem
-from services.pathway_services.news.fetchers.bloomberg import fetch_latest_bloomberg
-from services.pathway_services.news.fetchers.cnbc import fetch_latest_cnbc
+from services.pathway_services.connectors.batching import BatchController, MicroBatcher, Urgent, flush_sinks, lanes
+from services.pathway_services.connectors.scheduler import FetchScheduler
+from services.pathway_services.news.fetchers.registry import get_fetcher
+from services.pathway_services.utils.metrics import IngestObserver
 
 class Transform(Protocol):
     def __call__(self, item: NewsItem) -> NewsItem: ...
@@ -15,25 +17,72 @@ class Sink(Protocol):
     async def emit(self, item: NewsItem) -> None: ...
 
 class APIPullInput:
-    def __init__(self, sources: List[str], interval_seconds: int = 15) -> None:
+    """
+    Polls registered fetchers (see ``news.fetchers.registry``) through a FetchScheduler.
+    ``interval_seconds`` overrides every source's base interval when given. Fetched
+    items are enriched in micro-batches sized by ``controller``, with ``urgent`` ones
+    on the priority lane, as in KafkaInput. Items whose id is among the last
+    ``seen_per_source`` ids of their source are dropped, so a poll that returns
+    overlapping pages counts (and adapts the interval to) only the new ones.
+    """
+
+    def __init__(self, sources: List[str], interval_seconds: Optional[float] = None, max_concurrency: int = 8,
+                 off_hours_multiplier: float = 4.0, weekend_multiplier: float = 8.0,
+                 controller: Optional[BatchController] = None, urgent: Optional[Urgent] = None,
+                 seen_per_source: int = 10_000) -> None:
         self.sources = sources
-        self.interval_seconds = interval_seconds
+        self.specs = [get_fetcher(name) for name in sources]
+        if interval_seconds:
+            self.specs = [spec.with_interval(interval_seconds) for spec in self.specs]
+        self.max_concurrency = max_concurrency
+        self.off_hours_multiplier = off_hours_multiplier
+        self.weekend_multiplier = weekend_multiplier
+        self.controller = controller or BatchController(name="api")
+        self.urgent = urgent
+        self.seen_per_source = seen_per_source
+        self._seen: Dict[str, "OrderedDict[str, None]"] = {}  # source -> recent ids, oldest first
+
+    def _new_items(self, source: str, items: List[NewsItem]) -> List[NewsItem]:
+        seen = self._seen.setdefault(source, OrderedDict())
+        fresh = []
+        for item in items:
+            if item.id in seen:
+                seen.move_to_end(item.id)
+                continue
+            seen[item.id] = None
+            fresh.append(item)
+        while len(seen) > self.seen_per_source:
+            seen.popitem(last=False)
+        return fresh
 
     def run_pipeline(self, transforms: List[Transform], sinks: List[Sink]) -> None:
         asyncio.run(self._loop(transforms, sinks))
 
     async def _loop(self, transforms: List[Transform], sinks: List[Sink]) -> None:
-        logger.info("🕸️ Starting API pull loop for sources={}", self.sources)
-        while True:
-            items: List[NewsItem] = []
-            if "bloomberg" in self.sources:
-                items += await fetch_latest_bloomberg()
-            if "cnbc" in self.sources:
-                items += await fetch_latest_cnbc()
+        logger.info("🕸️ Starting API pull scheduler for sources={}", self.sources)
+        observe_ingest = IngestObserver("api")
+
+        bulk, priority = lanes(transforms, sinks)
+        batcher = MicroBatcher(self.controller, bulk, urgent=self.urgent, process_urgent=priority)
+        batcher.start()
 
+        async def on_items(source: str, items: List[NewsItem]) -> int:
+            items = self._new_items(source, items)
             for item in items:
-                for t in transforms:
-                    item = t(item)
-                await asyncio.gather(*(s.emit(item) for s in sinks))
+                observe_ingest(item)
+            if items:
+                await batcher.put_many(items)
+            return len(items)
 
-            await asyncio.sleep(self.interval_seconds)
+        scheduler = FetchScheduler(
+            self.specs,
+            on_items,
+            max_concurrency=self.max_concurrency,
+            off_hours_multiplier=self.off_hours_multiplier,
+            weekend_multiplier=self.weekend_multiplier,
+        )
+        try:
+            await scheduler.run()
+        finally:
+            await batcher.stop()
+            await flush_sinks(sinks)
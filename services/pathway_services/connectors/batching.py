@@ -0,0 +1,335 @@
+from __future__ import annotations
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Sequence, Tuple
+import asyncio
+import math
+import time
+
+import numpy as np
+from loguru import logger
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.news.processors.dag import apply_batch
+from services.pathway_services.news.processors.relevance_scoring import RelevanceScorer
+from services.pathway_services.utils.metrics import (
+    BATCH_ARRIVAL_RATE, BATCH_BYPASSED, BATCH_COST, BATCH_HEADROOM, BATCH_LATENCY_P99, BATCH_MAX_WAIT,
+    BATCH_SIZE, BATCH_TARGET_SIZE, QUEUE_DEPTH,
+)
+from services.pathway_services.utils.tracing import PRIORITY, stamp
+
+# Capacity the controller sizes batches for, as a multiple of the arrival rate.
+MIN_HEADROOM = 1.25
+MAX_HEADROOM = 8.0
+
+# Processes one batch end to end (transforms and sinks).
+ProcessBatch = Callable[[List[NewsItem]], Awaitable[None]]
+Urgent = Callable[[NewsItem], bool]
+
+class BatchController:
+    """
+    Sizes and times micro-batches against a p99 latency target.
+
+    Two online estimates drive it: the arrival rate (an exponentially decayed count
+    over ``rate_window`` seconds) and the batch cost as ``fixed + per_item * size``
+    (exponentially weighted least squares over recent batches). The target size is
+    the smallest ``n`` whose cost fits in the time ``n`` items take to arrive at
+    ``headroom`` times the current rate, i.e. the smallest batch that keeps up with
+    capacity to spare: one item at a time when quiet, growing to amortise the fixed
+    cost as load rises, and ``max_size`` once even that cannot keep up. The oldest
+    item waits at most until the batch would fill, and never past what ``target_p99``
+    leaves after processing.
+
+    Queueing shows up in the observed p99 of recent enqueue-to-sink latencies,
+    recomputed every ``feedback_interval`` seconds: while it exceeds the target,
+    ``headroom`` grows by a quarter (bigger batches, more throughput), and it relaxes
+    back towards 1.25 once the p99 is under 90% of the target.
+    """
+
+    def __init__(self, target_p99: float = 0.5, min_size: int = 1, max_size: int = 1000,
+                 rate_window: float = 2.0, cost_decay: float = 0.9, window: int = 2048,
+                 feedback_interval: float = 0.25, name: str = "worker") -> None:
+        self.target_p99 = target_p99
+        self.min_size = min_size
+        self.max_size = max_size
+        self.rate_window = rate_window
+        self.cost_decay = cost_decay
+        self.feedback_interval = feedback_interval
+        self.name = name
+        self.headroom = MIN_HEADROOM
+        self.size = min_size
+        self.wait = target_p99 / 2
+        self._count = 0.0
+        self._last_arrival: Optional[float] = None
+        self._moments = np.zeros(5)  # weights, sum x, sum y, sum xx, sum xy
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._next_feedback = 0.0
+        self._gauges = {
+            "size": BATCH_TARGET_SIZE.labels(input=name),
+            "wait": BATCH_MAX_WAIT.labels(input=name),
+            "rate": BATCH_ARRIVAL_RATE.labels(input=name),
+            "fixed": BATCH_COST.labels(input=name, term="fixed"),
+            "per_item": BATCH_COST.labels(input=name, term="per_item"),
+            "p99": BATCH_LATENCY_P99.labels(input=name),
+            "headroom": BATCH_HEADROOM.labels(input=name),
+        }
+
+    @property
+    def rate(self) -> float:
+        """Items/s, decayed to the present."""
+        if self._last_arrival is None:
+            return 0.0
+        return self._count * math.exp(-(time.monotonic() - self._last_arrival) / self.rate_window) / self.rate_window
+
+    def observe_arrivals(self, n: int = 1, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self._last_arrival is not None:
+            self._count *= math.exp(-(now - self._last_arrival) / self.rate_window)
+        self._count += n
+        self._last_arrival = now
+
+    def cost_model(self) -> Tuple[float, float]:
+        """``(fixed, per_item)`` seconds; per-item only until batch sizes have varied."""
+        w, sx, sy, sxx, sxy = self._moments
+        if w <= 0 or sx <= 0:
+            return 0.0, 0.0
+        var = w * sxx - sx * sx
+        if var <= 1e-9 * w * sxx:
+            return 0.0, sy / sx
+        per_item = (w * sxy - sx * sy) / var
+        fixed = (sy - per_item * sx) / w
+        if per_item <= 0 or fixed < 0:
+            return 0.0, sy / sx
+        return fixed, per_item
+
+    def cost(self, size: int) -> float:
+        fixed, per_item = self.cost_model()
+        return fixed + per_item * size
+
+    def observe_batch(self, size: int, seconds: float, latencies: Sequence[float]) -> None:
+        """Fold in one processed batch: its size, processing time and per-item latencies."""
+        self._moments *= self.cost_decay
+        self._moments += (1.0, size, seconds, size * size, size * seconds)
+        self._latencies.extend(latencies)
+        now = time.monotonic()
+        if now < self._next_feedback or not self._latencies:
+            return
+        self._next_feedback = now + self.feedback_interval
+        p99 = float(np.percentile(self._latencies, 99))
+        if p99 > self.target_p99:
+            self.headroom = min(MAX_HEADROOM, self.headroom * 1.25)
+        elif p99 < 0.9 * self.target_p99:
+            self.headroom = max(MIN_HEADROOM, self.headroom * 0.98)
+        self._gauges["p99"].set(p99)
+        self._gauges["headroom"].set(self.headroom)
+
+    def decide(self) -> Tuple[int, float]:
+        """``(size, max_wait)`` for the next batch."""
+        fixed, per_item = self.cost_model()
+        rate = self.rate
+        load = rate * self.headroom
+        if per_item * load < 1.0:
+            size = math.ceil(fixed * load / (1.0 - per_item * load))  # fixed + per_item * n <= n / load
+        else:
+            size = self.max_size
+        size = min(self.max_size, max(self.min_size, size))
+        fill = size / rate if rate > 0 else self.target_p99
+        wait = max(0.0, min(fill, self.target_p99 - fixed - per_item * size))
+        self.size, self.wait = size, wait
+        g = self._gauges
+        g["size"].set(size)
+        g["wait"].set(wait)
+        g["rate"].set(rate)
+        g["fixed"].set(fixed)
+        g["per_item"].set(per_item)
+        return size, wait
+
+class MicroBatcher:
+    """
+    Collects items from an input loop and hands them to ``process`` in batches sized
+    and timed by a BatchController. A batch is dispatched when it reaches the target
+    size or its oldest item has waited ``max_wait``; one bulk batch is processed at a
+    time and ``put`` blocks once ``max_pending`` items are waiting, which pushes back
+    on the input.
+
+    Items for which ``urgent`` holds take the priority lane instead: a separate queue
+    drained by its own task through ``process_urgent`` (``process`` if not given), so
+    they neither wait for a batch to fill nor queue behind the bulk backlog. They are
+    stamped ``priority`` in their trace, never block on backpressure, and do not feed
+    the controller's cost model. At most ``max_urgent`` wait in the priority queue;
+    beyond that flagged items go to the bulk lane, so a flood of matches cannot turn
+    the priority lane into a second, unbatched bulk lane.
+    """
+
+    def __init__(self, controller: BatchController, process: ProcessBatch, urgent: Optional[Urgent] = None,
+                 process_urgent: Optional[ProcessBatch] = None, max_pending: int = 10_000,
+                 max_urgent: int = 64) -> None:
+        self.controller = controller
+        self.process = process
+        self.urgent = urgent
+        self.process_urgent = process_urgent or process
+        self.max_pending = max_pending
+        self.max_urgent = max_urgent
+        self._pending: Deque[Tuple[float, NewsItem]] = deque()
+        self._urgent: Deque[NewsItem] = deque()
+        self._wake = asyncio.Event()
+        self._wake_urgent = asyncio.Event()
+        self._space = asyncio.Event()
+        self._closed = False
+        self._tasks: List[asyncio.Task] = []
+        name = controller.name
+        self._depth = QUEUE_DEPTH.labels(queue=f"{name}_batch")
+        self._urgent_depth = QUEUE_DEPTH.labels(queue=f"{name}_priority")
+        self._sizes = BATCH_SIZE.labels(input=name)
+        self._bypassed = BATCH_BYPASSED.labels(input=name)
+
+    def start(self) -> None:
+        name = self.controller.name
+        self._tasks = [asyncio.create_task(self.run(), name=f"batcher-{name}"),
+                       asyncio.create_task(self.run_urgent(), name=f"priority-{name}")]
+
+    def _check(self) -> None:
+        for task in self._tasks:
+            if task.done():
+                task.result()  # surfaces a processing error in the input loop
+                raise RuntimeError("MicroBatcher is not running")
+
+    def _offer_urgent(self, item: NewsItem) -> bool:
+        if self.urgent is None or len(self._urgent) >= self.max_urgent or not self.urgent(item):
+            return False
+        stamp(item, PRIORITY)
+        self._urgent.append(item)
+        self._urgent_depth.set(len(self._urgent))
+        self._bypassed.inc()
+        self._wake_urgent.set()
+        return True
+
+    async def _append(self, item: NewsItem, now: float) -> None:
+        while len(self._pending) >= self.max_pending:
+            self._space.clear()
+            await self._space.wait()
+        self._pending.append((now, item))
+        self._depth.set(len(self._pending))
+        if len(self._pending) == 1 or len(self._pending) >= self.controller.size:
+            self._wake.set()
+
+    async def put(self, item: NewsItem) -> None:
+        self._check()
+        now = time.monotonic()
+        self.controller.observe_arrivals(1, now)
+        if not self._offer_urgent(item):
+            await self._append(item, now)
+
+    async def put_many(self, items: Sequence[NewsItem]) -> None:
+        """Enqueue a fetched batch: its urgent items first, then the rest in order."""
+        self._check()
+        now = time.monotonic()
+        self.controller.observe_arrivals(len(items), now)
+        bulk = [item for item in items if not self._offer_urgent(item)]
+        for item in bulk:
+            await self._append(item, now)
+
+    async def stop(self) -> None:
+        """Dispatch whatever is pending and wait for both lanes to finish."""
+        self._closed = True
+        self._wake.set()
+        self._wake_urgent.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _next_batch(self) -> Optional[List[Tuple[float, NewsItem]]]:
+        while True:
+            self._wake.clear()
+            timeout: Optional[float] = None
+            if self._pending:
+                size, wait = self.controller.decide()
+                timeout = self._pending[0][0] + wait - time.monotonic()
+                if len(self._pending) >= size or timeout <= 0 or self._closed:
+                    batch = [self._pending.popleft() for _ in range(min(size, len(self._pending)))]
+                    self._depth.set(len(self._pending))
+                    self._space.set()
+                    return batch
+            elif self._closed:
+                return None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                break
+            items = [item for _, item in batch]
+            self._sizes.observe(len(items))
+            t0 = time.monotonic()
+            await self.process(items)
+            done = time.monotonic()
+            self.controller.observe_batch(len(items), done - t0, [done - enqueued for enqueued, _ in batch])
+        logger.info("🧺 Micro-batcher {} drained", self.controller.name)
+
+    async def run_urgent(self) -> None:
+        while True:
+            self._wake_urgent.clear()
+            if self._urgent:
+                items = list(self._urgent)
+                self._urgent.clear()
+                self._urgent_depth.set(0)
+                await self.process_urgent(items)
+            elif self._closed:
+                break
+            else:
+                await self._wake_urgent.wait()
+
+def any_of(*checks: Optional[Urgent]) -> Optional[Urgent]:
+    """Combine urgency checks (``None`` entries are skipped); None if there are none."""
+    active = [c for c in checks if c is not None]
+    if not active:
+        return None
+    if len(active) == 1:
+        return active[0]
+    return lambda item: any(check(item) for check in active)
+
+def urgent_by_relevance(scorer: RelevanceScorer, threshold: int) -> Urgent:
+    """Pre-enrichment check: title and summary alone already score ``threshold``."""
+    def urgent(item: NewsItem) -> bool:
+        return scorer.score(f"{item.title} {item.summary or ''}".lower()) >= threshold
+    return urgent
+
+def lanes(transforms: Sequence[Any], sinks: Sequence[Any]) -> Tuple[ProcessBatch, ProcessBatch]:
+    """
+    ``(bulk, priority)`` batch processors over the same transforms and sinks. Bulk emits
+    each item to every sink concurrently; priority emits to the ``realtime`` sinks
+    (WebSocket publish) first and only then to the rest.
+    """
+    realtime = [s for s in sinks if getattr(s, "realtime", False)]
+    rest = [s for s in sinks if not getattr(s, "realtime", False)]
+
+    async def bulk(items: List[NewsItem]) -> None:
+        for item in await apply_batch(transforms, items):
+            await asyncio.gather(*(s.emit(item) for s in sinks))
+
+    async def priority(items: List[NewsItem]) -> None:
+        for item in await apply_batch(transforms, items):
+            await asyncio.gather(*(s.emit(item) for s in realtime))
+            await asyncio.gather(*(s.emit(item) for s in rest))
+
+    return bulk, priority
+
+async def flush_sinks(sinks: Sequence[Any]) -> bool:
+    """
+    Flush every sink that buffers (Parquet archive, similar-news index) at shutdown,
+    after the batcher has drained and before the final state checkpoint marks the
+    drained offsets as done. False when any flush failed.
+    """
+    ok = True
+    for sink in sinks:
+        flush = getattr(sink, "flush", None)
+        if flush is None:
+            continue
+        try:
+            await flush()
+        except Exception:
+            ok = False
+            logger.exception("Flushing {} at shutdown failed", getattr(sink, "name", type(sink).__name__))
+    return ok
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from typing import Dict, Mapping, Tuple
+import numpy as np
+import orjson
+from loguru import logger
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.database.redis import get_redis
+from services.pathway_services.news.analytics.burst import BurstDetector
+from services.pathway_services.utils.timeutil import to_epoch
+
+class BurstAlertSink:
+    """
+    Feeds every extracted entity into a BurstDetector and publishes alerts
+    to a dedicated Redis channel.
+    """
+
+    def __init__(self, redis_url: str, channel: str, detector: BurstDetector) -> None:
+        self.redis_url = redis_url
+        self.channel = channel
+        self.detector = detector
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        return self.detector.snapshot()
+
+    def restore(self, arrays: Mapping[str, np.ndarray], meta: dict) -> None:
+        self.detector.restore(arrays, meta)
+
+    async def emit(self, item: NewsItem) -> None:
+        ts = to_epoch(item.published_at)
+        alerts = []
+        for kind, names in item.entities.items():
+            for name in names:
+                alert = self.detector.observe(f"{kind}:{name}", ts)
+                if alert is not None:
+                    alerts.append(alert)
+        if not alerts:
+            return
+        redis = await get_redis(self.redis_url)
+        for alert in alerts:
+            payload = orjson.dumps({**alert.__dict__, "trigger_id": item.id}).decode("utf-8")
+            await redis.publish(self.channel, payload)
+            logger.info("🔥 Burst on {} ({} items, z={:.1f})", alert.entity, alert.count, alert.zscore)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+import orjson
+from loguru import logger
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.database.redis import get_redis
+from services.pathway_services.news.analytics.ranking import DecayedTopK, base_score, feed_key, feeds_key, items_key
+from services.pathway_services.utils.snapshot import pack_bytes, pack_strings, unpack_bytes, unpack_strings
+from services.pathway_services.utils.timeutil import to_epoch
+
+ALL_CATEGORY = "all"
+
+# Stores an item and ranks it into the feeds it entered, trims each feed to K and drops
+# the payloads of trimmed ids that no feed holds any more, in one atomic step. Every feed
+# key is recorded in a set, so the check covers feeds this process has not seen (e.g.
+# after a restart without a snapshot).
+# KEYS: items hash, set of feed keys, the feeds entered. ARGV: K, id, payload, key.
+FEED_UPDATE_SCRIPT = """
+local k = tonumber(ARGV[1])
+redis.call("HSET", KEYS[1], ARGV[2], ARGV[3])
+local trimmed = {}
+for i = 3, #KEYS do
+    redis.call("SADD", KEYS[2], KEYS[i])
+    redis.call("ZADD", KEYS[i], ARGV[4], ARGV[2])
+    for _, id in ipairs(redis.call("ZRANGE", KEYS[i], 0, -k - 1)) do
+        trimmed[#trimmed + 1] = id
+    end
+    redis.call("ZREMRANGEBYRANK", KEYS[i], 0, -k - 1)
+end
+if #trimmed > 0 then
+    local feeds = redis.call("SMEMBERS", KEYS[2])
+    for _, id in ipairs(trimmed) do
+        local held = false
+        for _, feed in ipairs(feeds) do
+            if redis.call("ZSCORE", feed, id) then
+                held = true
+                break
+            end
+        end
+        if not held then
+            redis.call("HDEL", KEYS[1], id)
+        end
+    end
+end
+return #trimmed
+"""
+
+def feed_payload(item: NewsItem) -> bytes:
+    """The item as served in feeds: no article body (``content`` is null) and no trace."""
+    fields = dict(item.__dict__, content=None)
+    fields.pop("trace", None)
+    return orjson.dumps(fields)
+
+class RankedFeedSink:
+    """
+    Maintains a time-decayed top-K feed per category and mirrors it to Redis: each
+    category is a sorted set of item ids scored by the static ranking key (see
+    DecayedTopK) and trimmed to K, and the encoded items live once per id in a
+    hash shared by all categories. An item that enters the in-memory top-K of any
+    category costs one FEED_UPDATE_SCRIPT call, which also removes the payloads of
+    ids that no feed in Redis holds any more. The API turns keys into decayed
+    scores when it reads.
+    """
+
+    def __init__(self, redis_url: str, key_prefix: str, k: int = 100, half_life_seconds: float = 3 * 3600) -> None:
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.k = k
+        self.half_life_seconds = half_life_seconds
+        self._feeds: Dict[str, DecayedTopK] = {}
+        self._update: Optional[Any] = None
+
+    def _feed(self, category: str) -> DecayedTopK:
+        feed = self._feeds.get(category)
+        if feed is None:
+            feed = self._feeds[category] = DecayedTopK(self.k, self.half_life_seconds)
+        return feed
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        categories = list(self._feeds)
+        rows = [(code, *entry) for code, c in enumerate(categories) for entry in self._feeds[c].entries()]
+        ids, ids_end = pack_strings([r[2] for r in rows])
+        payloads, payloads_end = pack_bytes([r[3] for r in rows])
+        return {
+            "category": np.array([r[0] for r in rows], dtype=np.int32),
+            "key": np.array([r[1] for r in rows], dtype=np.float64),
+            "published": np.array([r[4] for r in rows], dtype=np.float64),
+            "ids": ids, "ids_end": ids_end, "payloads": payloads, "payloads_end": payloads_end,
+        }, {"categories": categories, "half_life_seconds": self.half_life_seconds}
+
+    def restore(self, arrays: Mapping[str, np.ndarray], meta: dict) -> None:
+        # Keys are log2(base) + published / half_life; re-key if the half-life changed.
+        rekey = 1.0 / self.half_life_seconds - 1.0 / meta["half_life_seconds"]
+        entries: Dict[int, list] = {}
+        rows = zip(arrays["category"].tolist(), arrays["key"].tolist(), arrays["published"].tolist(),
+                   unpack_strings(arrays["ids"], arrays["ids_end"]),
+                   unpack_bytes(arrays["payloads"], arrays["payloads_end"]))
+        for code, key, published, item_id, payload in rows:
+            entries.setdefault(code, []).append((key + published * rekey, item_id, payload, published))
+        feeds = {}
+        for code, category in enumerate(meta["categories"]):
+            feed = feeds[category] = DecayedTopK(self.k, self.half_life_seconds)
+            feed.load(entries.get(code, []))
+        self._feeds = feeds
+
+    async def emit(self, item: NewsItem) -> None:
+        base = base_score(item.relevance, item.market_impact)
+        published = to_epoch(item.published_at)
+        payload = feed_payload(item)
+        changed = [category for category in [ALL_CATEGORY, *item.categories]
+                   if self._feed(category).push(item.id, base, published, payload) is not None]
+        if not changed:
+            return
+        redis = await get_redis(self.redis_url)
+        if self._update is None:
+            self._update = redis.register_script(FEED_UPDATE_SCRIPT)
+        keys = [items_key(self.key_prefix), feeds_key(self.key_prefix),
+                *(feed_key(self.key_prefix, category) for category in changed)]
+        await self._update(keys=keys, args=[self.k, item.id, payload, self._feed(ALL_CATEGORY).key(base, published)])
+        logger.debug("🏆 Feed updated for {} after {}", changed, item.id)
@@ -0,0 +1,345 @@
+from __future__ import annotations
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+import asyncio
+import random
+import time
+import zlib
+
+import orjson
+from loguru import logger
+
+from services.pathway_services.connectors.batching import BatchController, Urgent, flush_sinks, lanes
+from services.pathway_services.connectors.feed_sink import FEED_UPDATE_SCRIPT
+from services.pathway_services.connectors.kafka_input import KafkaInput, Sink, Transform
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.metrics import KAFKA_LAG, IngestObserver
+from services.pathway_services.utils.snapshot import StateRegistry
+
+@dataclass
+class Record:
+    offset: int
+    key: Optional[bytes]
+    value: bytes
+    timestamp: float
+
+class InMemoryBroker:
+    """
+    Kafka-shaped log kept in process: topics split into partitions of append-only
+    records, keyed partitioning (stable crc32, so runs are reproducible) and
+    committed offsets per consumer group.
+    """
+
+    def __init__(self, partitions: int = 4) -> None:
+        self.partitions = partitions
+        self._logs: Dict[str, List[List[Record]]] = {}
+        self._committed: Dict[Tuple[str, str, int], int] = {}
+
+    def _log(self, topic: str) -> List[List[Record]]:
+        log = self._logs.get(topic)
+        if log is None:
+            log = self._logs[topic] = [[] for _ in range(self.partitions)]
+        return log
+
+    def produce(self, topic: str, value: bytes, key: Optional[bytes] = None,
+                partition: Optional[int] = None, timestamp: Optional[float] = None) -> Tuple[int, int]:
+        log = self._log(topic)
+        if partition is None:
+            partition = zlib.crc32(key) % self.partitions if key is not None else sum(map(len, log)) % self.partitions
+        records = log[partition]
+        records.append(Record(len(records), key, value, time.time() if timestamp is None else timestamp))
+        return partition, len(records) - 1
+
+    def fetch(self, topic: str, partition: int, offset: int, max_records: int) -> List[Record]:
+        return self._log(topic)[partition][offset:offset + max_records]
+
+    def end_offset(self, topic: str, partition: int) -> int:
+        return len(self._log(topic)[partition])
+
+    def offset_for_time(self, topic: str, partition: int, timestamp: float) -> int:
+        """First offset whose record timestamp is >= ``timestamp`` (end offset if none)."""
+        records = self._log(topic)[partition]
+        return bisect_left([r.timestamp for r in records], timestamp)
+
+    def committed(self, group: str, topic: str, partition: int) -> Optional[int]:
+        return self._committed.get((group, topic, partition))
+
+    def commit(self, group: str, topic: str, partition: int, offset: int) -> None:
+        self._committed[(group, topic, partition)] = offset
+
+class MemoryKafkaInput(KafkaInput):
+    """
+    KafkaInput over an InMemoryBroker with at-least-once semantics: each partition's
+    offset is committed after a batch has reached every sink; a batch that raises is
+    redelivered from the last committed offset, up to ``max_redeliveries`` times.
+    With ``stop_when_drained`` the pipeline returns once every partition is caught
+    up, which makes runs finite and deterministic.
+
+    Batches are ``batch_size`` records unless a ``controller`` is given, in which case
+    each fetch takes the controller's target size (capped at ``batch_size``). Offsets
+    are committed per fetched batch, so there is no wait to bypass: ``urgent`` items
+    of a batch go through the priority lane (``lanes``) ahead of the rest of it.
+    ``snapshots`` restores state and start offsets and checkpoints as in KafkaInput.
+    """
+
+    def __init__(self, broker: InMemoryBroker, topic: str, group: str = "worker", batch_size: int = 500,
+                 auto_offset_reset: str = "earliest", max_redeliveries: int = 3, stop_when_drained: bool = True,
+                 poll_interval: float = 0.05, controller: Optional[BatchController] = None,
+                 urgent: Optional[Urgent] = None, snapshots: Optional[StateRegistry] = None) -> None:
+        super().__init__(brokers="memory", topic=topic, controller=controller, urgent=urgent, snapshots=snapshots)
+        self.adaptive = controller is not None
+        self.broker = broker
+        self.group = group
+        self.batch_size = batch_size
+        self.auto_offset_reset = auto_offset_reset
+        self.max_redeliveries = max_redeliveries
+        self.stop_when_drained = stop_when_drained
+        self.poll_interval = poll_interval
+        self.redelivered = 0
+
+    def _start_offset(self, partition: int) -> int:
+        committed = self.broker.committed(self.group, self.topic, partition)
+        if committed is not None:
+            return committed
+        return 0 if self.auto_offset_reset == "earliest" else self.broker.end_offset(self.topic, partition)
+
+    async def _loop(self, transforms: List[Transform], sinks: List[Sink]) -> None:
+        broker, topic, snapshots = self.broker, self.topic, self.snapshots
+        positions = {p: self._start_offset(p) for p in range(broker.partitions)}
+        failures: Dict[int, int] = defaultdict(int)
+        lag_gauges = {p: KAFKA_LAG.labels(topic=topic, partition=str(p)) for p in positions}
+        observe_ingest = IngestObserver("memory")
+
+        bulk, priority = lanes(transforms, sinks)
+        urgent = self.urgent
+
+        async def process(items: List[NewsItem]) -> None:
+            if urgent is not None:
+                first, rest = [], []
+                for item in items:
+                    (first if urgent(item) else rest).append(item)
+                if first:
+                    await priority(first)
+                items = rest
+            if items:
+                await bulk(items)
+
+        checkpoints = None
+        if snapshots is not None:
+            restored = snapshots.restore().get(topic, {})
+            for partition in positions:
+                positions[partition] = restored.get(partition, positions[partition])
+                snapshots.offsets.seek(topic, partition, positions[partition])
+            process = snapshots.guard(process)
+            checkpoints = asyncio.create_task(snapshots.run())
+        logger.info("📥 In-memory consumer started on {} ({} partitions)", topic, broker.partitions)
+        try:
+            while True:
+                progressed = False
+                for partition, offset in positions.items():
+                    size = min(self.batch_size, self.controller.decide()[0]) if self.adaptive else self.batch_size
+                    batch = broker.fetch(topic, partition, offset, size)
+                    if not batch:
+                        continue
+                    progressed = True
+                    try:
+                        t0 = time.monotonic()
+                        items = [self._to_news_item(orjson.loads(record.value)) for record in batch]
+                        for record, item in zip(batch, items):
+                            observe_ingest(item)
+                            if snapshots is not None:
+                                snapshots.offsets.add(item, topic, partition, record.offset)
+                        await process(items)
+                        if self.adaptive:
+                            elapsed = time.monotonic() - t0
+                            self.controller.observe_arrivals(len(batch), t0)
+                            self.controller.observe_batch(len(batch), elapsed, [elapsed] * len(batch))
+                    except Exception:
+                        failures[partition] += 1
+                        if failures[partition] > self.max_redeliveries:
+                            raise
+                        self.redelivered += len(batch)
+                        logger.exception("♻️ Redelivering {}[{}] from offset {}", topic, partition, offset)
+                        continue
+                    failures[partition] = 0
+                    positions[partition] = batch[-1].offset + 1
+                    broker.commit(self.group, topic, partition, positions[partition])
+                    lag_gauges[partition].set(broker.end_offset(topic, partition) - positions[partition])
+                if not progressed:
+                    if self.stop_when_drained:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            flushed = await flush_sinks(sinks)
+            if checkpoints is not None:
+                checkpoints.cancel()
+                if flushed:
+                    await snapshots.checkpoint()
+                else:
+                    logger.warning("📸 Skipping the final snapshot: a sink failed to flush")
+        logger.info("🛑 In-memory consumer drained {}", topic)
+
+class MemoryPostgresSink:
+    """
+    Upserts into a dict keyed by id with the same columns as PostgresSink. JSON
+    columns are round-tripped through orjson so serialisation cost stays realistic.
+    ``fail_rate`` injects seeded failures to exercise redelivery.
+    """
+
+    def __init__(self, fail_rate: float = 0.0, seed: int = 0) -> None:
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.writes = 0
+        self.fail_rate = fail_rate
+        self._rng = random.Random(seed)
+
+    async def emit(self, item: NewsItem) -> None:
+        if self.fail_rate and self._rng.random() < self.fail_rate:
+            raise ConnectionError(f"injected failure storing {item.id}")
+        row = orjson.loads(orjson.dumps(item.__dict__))
+        row.pop("trace", None)
+        self.rows[item.id] = row
+        self.writes += 1
+
+    async def write(self, items: List[NewsItem]) -> None:
+        """BulkPostgresWriter interface."""
+        for item in items:
+            await self.emit(item)
+
+class _MemoryPipeline:
+    def __init__(self, redis: "MemoryRedis") -> None:
+        self._redis = redis
+        self._ops: List[Tuple[str, tuple]] = []
+
+    def _queue(self, name: str, *args: Any) -> "_MemoryPipeline":
+        self._ops.append((name, args))
+        return self
+
+    def delete(self, *keys: str) -> "_MemoryPipeline":
+        return self._queue("delete", *keys)
+
+    def rpush(self, key: str, *values: Any) -> "_MemoryPipeline":
+        return self._queue("rpush", key, *values)
+
+    def publish(self, channel: str, message: Any) -> "_MemoryPipeline":
+        return self._queue("publish", channel, message)
+
+    def hset(self, key: str, field: str, value: Any) -> "_MemoryPipeline":
+        return self._queue("hset", key, field, value)
+
+    def hdel(self, key: str, *fields: str) -> "_MemoryPipeline":
+        return self._queue("hdel", key, *fields)
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> "_MemoryPipeline":
+        return self._queue("zadd", key, mapping)
+
+    def zremrangebyrank(self, key: str, start: int, stop: int) -> "_MemoryPipeline":
+        return self._queue("zremrangebyrank", key, start, stop)
+
+    async def execute(self) -> List[Any]:
+        ops, self._ops = self._ops, []
+        return [await getattr(self._redis, name)(*args) for name, args in ops]
+
+class MemoryRedis:
+    """
+    The subset of ``redis.asyncio.Redis`` the worker sinks use (publish, lists,
+    hashes, sorted sets, pipelines), so RedisWebSocketSink, BurstAlertSink and
+    RankedFeedSink run unchanged with ``database.redis.set_redis(MemoryRedis())``.
+    Published messages are kept in a bounded per-channel deque. The sinks' Lua
+    scripts run as Python equivalents (see ``register_script``).
+    """
+
+    def __init__(self, history: int = 10_000) -> None:
+        self.lists: Dict[str, List[Any]] = {}
+        self.hashes: Dict[str, Dict[str, Any]] = {}
+        self.zsets: Dict[str, Dict[str, float]] = {}
+        self.sets: Dict[str, Set[str]] = {}
+        self.channels: Dict[str, Deque[Any]] = defaultdict(lambda: deque(maxlen=history))
+        self.published: Dict[str, int] = defaultdict(int)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        self.channels[channel].append(message)
+        self.published[channel] += 1
+        return 0
+
+    async def delete(self, *keys: str) -> int:
+        return sum(any(store.pop(k, None) is not None for store in (self.lists, self.hashes, self.zsets, self.sets))
+                   for k in keys)
+
+    async def rpush(self, key: str, *values: Any) -> int:
+        lst = self.lists.setdefault(key, [])
+        lst.extend(values)
+        return len(lst)
+
+    async def lrange(self, key: str, start: int, stop: int) -> List[Any]:
+        lst = self.lists.get(key, [])
+        return lst[start:(stop + 1) or None]
+
+    async def hset(self, key: str, field: str, value: Any) -> int:
+        h = self.hashes.setdefault(key, {})
+        added = field not in h
+        h[field] = value
+        return int(added)
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        h = self.hashes.get(key, {})
+        return sum(h.pop(f, None) is not None for f in fields)
+
+    async def hmget(self, key: str, fields: List[str]) -> List[Any]:
+        h = self.hashes.get(key, {})
+        return [h.get(f) for f in fields]
+
+    async def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        z = self.zsets.setdefault(key, {})
+        added = sum(m not in z for m in mapping)
+        z.update(mapping)
+        return added
+
+    def _zranked(self, key: str) -> List[Tuple[str, float]]:
+        return sorted(self.zsets.get(key, {}).items(), key=lambda e: (e[1], e[0]))
+
+    async def zremrangebyrank(self, key: str, start: int, stop: int) -> int:
+        ranked = self._zranked(key)
+        doomed = ranked[start:(stop + 1) or None]
+        for member, _ in doomed:
+            del self.zsets[key][member]
+        return len(doomed)
+
+    async def zrevrange(self, key: str, start: int, stop: int, withscores: bool = False) -> List[Any]:
+        ranked = self._zranked(key)[::-1][start:(stop + 1) or None]
+        return ranked if withscores else [m for m, _ in ranked]
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True) -> AsyncIterator[_MemoryPipeline]:
+        yield _MemoryPipeline(self)
+
+    def register_script(self, script: str) -> Callable[..., Awaitable[Any]]:
+        run = {FEED_UPDATE_SCRIPT: self._feed_update}[script]
+
+        async def call(keys: Sequence[str] = (), args: Sequence[Any] = ()) -> Any:
+            return run(list(keys), list(args))
+        return call
+
+    def _feed_update(self, keys: List[str], args: List[Any]) -> int:
+        items, feeds, entered = keys[0], keys[1], keys[2:]
+        k, item_id, payload, key = int(args[0]), args[1], args[2], float(args[3])
+        self.hashes.setdefault(items, {})[item_id] = payload
+        known = self.sets.setdefault(feeds, set())
+        trimmed: List[str] = []
+        for zkey in entered:
+            known.add(zkey)
+            z = self.zsets.setdefault(zkey, {})
+            z[item_id] = key
+            for member, _ in self._zranked(zkey)[:max(0, len(z) - k)]:
+                del z[member]
+                trimmed.append(member)
+        h = self.hashes[items]
+        for member in trimmed:
+            if not any(member in self.zsets.get(feed, {}) for feed in known):
+                h.pop(member, None)
+        return len(trimmed)
+
+    async def close(self) -> None:
+        pass
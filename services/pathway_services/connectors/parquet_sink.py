@@ -0,0 +1,60 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from loguru import logger
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.archive import to_record, write_partitioned
+
+class ParquetArchiveSink:
+    """
+    Buffers flattened records and writes them to the date/hour-partitioned Parquet
+    archive once ``flush_rows`` accumulate or ``flush_seconds`` pass. Encoding and
+    compression run in a worker thread; the buffer is swapped out on the loop.
+    """
+
+    def __init__(self, root: str, flush_rows: int = 50_000, flush_seconds: float = 600.0) -> None:
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._writing: Optional[asyncio.Task] = None
+
+    async def emit(self, item: NewsItem) -> None:
+        self._buffer.append(to_record(item))
+        if len(self._buffer) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+            # One write at a time; keep buffering until the previous one lands
+            # unless the buffer has grown to twice the flush size.
+            if self._writing and not self._writing.done():
+                if len(self._buffer) < 2 * self.flush_rows:
+                    return
+                await asyncio.wait([self._writing])
+            self._start_write()
+
+    async def flush(self) -> None:
+        """Write everything buffered and wait for it; a failed write raises and its rows stay buffered."""
+        if self._writing and not self._writing.done():
+            # Its rows go back into the buffer on failure and are written below.
+            await asyncio.wait([self._writing])
+        if self._buffer:
+            await self._start_write()
+
+    def _start_write(self) -> asyncio.Task:
+        records, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        self._writing = asyncio.create_task(asyncio.to_thread(write_partitioned, self.root, records))
+        self._writing.add_done_callback(lambda task: self._written(task, records))
+        return self._writing
+
+    def _written(self, task: asyncio.Task, records: List[Dict[str, Any]]) -> None:
+        # Cancelled at loop shutdown: asyncio.run still joins the writer thread.
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            # Put the rows back so the next flush retries them.
+            self._buffer[:0] = records
+            logger.warning("Parquet archive write failed: {}", task.exception())
+        else:
+            logger.debug("🗄️ Archived {} items into {} files", len(records), len(task.result()))
@@ -1,20 +1,22 @@
 from __future__ import annotations
 import asyncpg
 from loguru import logger
-from typing import Optional
+from typing import List, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from services.pathway_services.database.postgres import init_json_codecs, migrate
 from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.metrics import count_retry, track_pool
 
 UPSERT_SQL = """
 INSERT INTO news (
   id, source, title, url, published_at, summary, content,
   categories, sentiment, sentiment_confidence, relevance,
-  market_impact, entities, numbers
+  market_impact, entities, numbers, story_id
 )
 VALUES (
   $1, $2, $3, $4, $5, $6, $7,
-  $8, $9, $10, $11, $12, $13, $14
+  $8, $9, $10, $11, $12, $13, $14, $15
 )
 ON CONFLICT (id) DO UPDATE SET
   source=EXCLUDED.source,
@@ -29,9 +31,28 @@ ON CONFLICT (id) DO UPDATE SET
   relevance=EXCLUDED.relevance,
   market_impact=EXCLUDED.market_impact,
   entities=EXCLUDED.entities,
-  numbers=EXCLUDED.numbers
+  numbers=EXCLUDED.numbers,
+  story_id=EXCLUDED.story_id
 """
 
+NEWS_COLUMNS = (
+    "id", "source", "title", "url", "published_at", "summary", "content",
+    "categories", "sentiment", "sentiment_confidence", "relevance",
+    "market_impact", "entities", "numbers", "story_id",
+)
+
+STAGE_TABLE = "news_stage"
+CREATE_STAGE_SQL = f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} (LIKE news INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+# Same conflict handling as UPSERT_SQL, fed from the COPY staging table.
+UPSERT_FROM_STAGE_SQL = (
+    f"INSERT INTO news ({', '.join(NEWS_COLUMNS)})\n"
+    f"SELECT {', '.join(NEWS_COLUMNS)} FROM {STAGE_TABLE}\n"
+    + UPSERT_SQL[UPSERT_SQL.index("ON CONFLICT"):]
+)
+
+def news_record(item: NewsItem) -> tuple:
+    return tuple(getattr(item, c) for c in NEWS_COLUMNS)
+
 class PostgresSink:
     def __init__(self, dsn: str) -> None:
         self.dsn = dsn
@@ -39,10 +60,14 @@ class PostgresSink:
 
     async def _pool_ready(self) -> asyncpg.Pool:
         if not self._pool:
-            self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=5)
+            pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=5, init=init_json_codecs)
+            await migrate(pool)
+            self._pool = pool
+            track_pool("postgres_sink", self._pool)
         return self._pool
 
-    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10))
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10),
+           before_sleep=count_retry("postgres"))
     async def emit(self, item: NewsItem) -> None:
         pool = await self._pool_ready()
         async with pool.acquire() as conn:
@@ -62,5 +87,42 @@ class PostgresSink:
                 item.market_impact,
                 item.entities,
                 item.numbers,
+                item.story_id,
             )
         logger.debug("💾 Stored news {}", item.id)
+
+class BulkPostgresWriter:
+    """
+    Batch writer for backfills: COPY a batch into a per-connection temp table, then
+    upsert it into ``news`` in one statement. Duplicate ids within a batch are
+    collapsed (last wins) since one INSERT cannot update a row twice.
+    """
+
+    def __init__(self, dsn: str, pool_size: int = 4) -> None:
+        self.dsn = dsn
+        self.pool_size = pool_size
+        self._pool: Optional[asyncpg.Pool] = None
+
+    async def _pool_ready(self) -> asyncpg.Pool:
+        if not self._pool:
+            pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=self.pool_size, init=init_json_codecs)
+            await migrate(pool)
+            self._pool = pool
+            track_pool("postgres_bulk", self._pool)
+        return self._pool
+
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10),
+           before_sleep=count_retry("postgres_bulk"))
+    async def write(self, items: List[NewsItem]) -> None:
+        records = list({item.id: news_record(item) for item in items}.values())
+        pool = await self._pool_ready()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(CREATE_STAGE_SQL)
+                await conn.copy_records_to_table(STAGE_TABLE, records=records, columns=NEWS_COLUMNS)
+                await conn.execute(UPSERT_FROM_STAGE_SQL)
+        logger.debug("💾 Bulk stored {} news rows", len(records))
+
+    async def close(self) -> None:
+        if self._pool:
+            await self._pool.close()
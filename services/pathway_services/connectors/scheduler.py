@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import random
+import time
+
+import httpx
+from loguru import logger
+
+from services.pathway_services.news.fetchers.registry import FetcherSpec
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.metrics import FETCH_ERRORS, FETCH_INTERVAL, FETCH_SECONDS
+from services.pathway_services.utils.timeutil import market_phase
+
+# Handler for a fetched batch; returns how many items were new.
+OnItems = Callable[[str, List[NewsItem]], Awaitable[int]]
+
+class AdaptiveInterval:
+    """
+    Per-source poll period: ``spec.interval`` scaled by an activity factor (halved
+    after a poll that produced new items, grown 1.25x after an empty or failed one,
+    kept within [1/8, 4]) and by the market-phase multiplier, then clamped to
+    [min_interval, max_interval] with +/- jitter.
+    """
+
+    def __init__(self, spec: FetcherSpec, phase_multipliers: Dict[str, float]) -> None:
+        self.spec = spec
+        self.phase_multipliers = phase_multipliers
+        self.activity = 1.0
+
+    def update(self, new_items: int) -> None:
+        self.activity = max(0.125, self.activity * 0.5) if new_items else min(4.0, self.activity * 1.25)
+
+    def next_delay(self, phase: str, rng: random.Random) -> float:
+        spec = self.spec
+        base = spec.interval * self.activity * self.phase_multipliers.get(phase, 1.0)
+        base = min(spec.max_interval, max(spec.min_interval, base))
+        return base * (1.0 + rng.uniform(-spec.jitter, spec.jitter))
+
+class FetchScheduler:
+    """
+    Polls every source on its own adaptive schedule. Fetches run concurrently, at most
+    ``max_concurrency`` at a time, over one shared httpx connection pool; each fetch is
+    bounded by its spec's timeout and failures only affect that source's schedule.
+    """
+
+    def __init__(self, specs: List[FetcherSpec], on_items: OnItems, max_concurrency: int = 8,
+                 off_hours_multiplier: float = 4.0, weekend_multiplier: float = 8.0,
+                 seed: Optional[int] = None) -> None:
+        self.specs = specs
+        self.on_items = on_items
+        self.max_concurrency = max_concurrency
+        self.phase_multipliers = {"open": 1.0, "pre_open": 1.0, "closed": off_hours_multiplier,
+                                  "weekend": weekend_multiplier}
+        self._rng = random.Random(seed)
+        self._sem = asyncio.Semaphore(max_concurrency)
+
+    async def run(self) -> None:
+        limits = httpx.Limits(max_connections=self.max_concurrency * 2, max_keepalive_connections=self.max_concurrency)
+        async with httpx.AsyncClient(limits=limits, follow_redirects=True,
+                                     headers={"User-Agent": "hexapulse-finpocket/1.0"}) as client:
+            await asyncio.gather(*(self._poll(client, spec) for spec in self.specs))
+
+    async def _poll(self, client: httpx.AsyncClient, spec: FetcherSpec) -> None:
+        interval = AdaptiveInterval(spec, self.phase_multipliers)
+        latency = FETCH_SECONDS.labels(source=spec.name)
+        errors = FETCH_ERRORS.labels(source=spec.name)
+        gauge = FETCH_INTERVAL.labels(source=spec.name)
+        # Stagger the first round so sources do not all fire together.
+        await asyncio.sleep(self._rng.uniform(0, spec.interval * spec.jitter))
+        while True:
+            started = time.perf_counter()
+            items: List[NewsItem] = []
+            try:
+                async with self._sem:
+                    async with asyncio.timeout(spec.timeout):
+                        items = await spec.fetch(client)
+            except Exception as exc:
+                errors.inc()
+                logger.warning("Fetch from {} failed: {!r}", spec.name, exc)
+            finally:
+                latency.observe(time.perf_counter() - started)
+            new = await self.on_items(spec.name, items) if items else 0
+            interval.update(new)
+            delay = interval.next_delay(market_phase(), self._rng)
+            gauge.set(delay)
+            await asyncio.sleep(max(0.0, delay - (time.perf_counter() - started)))
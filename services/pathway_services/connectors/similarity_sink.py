@@ -0,0 +1,74 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import asyncio
+import time
+from loguru import logger
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.news.analytics.hnsw import HNSWIndex
+from services.pathway_services.news.analytics.vectors import dense_vector
+
+# Items queued for insertion before emit waits for the index to catch up.
+MAX_PENDING = 2048
+
+class SimilarityIndexSink:
+    """
+    Embeds each item locally (feature hashing, no external calls), inserts it into an
+    HNSW index and periodically persists a new memory-mappable version for the API.
+
+    Embedding, inserts and saves run on one dedicated thread, never on the event loop:
+    ``emit`` only queues the item, a drain task hands the queue over in batches, and
+    ``emit`` waits once ``MAX_PENDING`` items are queued. Saves are incremental (see
+    ``HNSWIndex.save``) and run between insert batches on the same thread.
+    """
+
+    def __init__(self, path: str, dim: int = 128, save_interval_seconds: float = 60.0) -> None:
+        self.path = path
+        self.dim = dim
+        self.save_interval_seconds = save_interval_seconds
+        self.index = HNSWIndex.load(path) or HNSWIndex(dim)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="similar-index")
+        self._pending: List[Tuple[str, str]] = []
+        self._draining: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._last_save = time.monotonic()
+        logger.info("🧭 Similarity index ready with {} items", len(self.index))
+
+    async def emit(self, item: NewsItem) -> None:
+        self._pending.append((item.id, " ".join(filter(None, [item.title, item.summary or ""]))))
+        if self._draining is None or self._draining.done():
+            self._draining = asyncio.create_task(self._drain())
+        if len(self._pending) >= MAX_PENDING:
+            await asyncio.shield(self._draining)
+
+    async def flush(self) -> None:
+        """Insert everything queued and save now."""
+        if self._draining is not None:
+            await asyncio.shield(self._draining)
+        await self._drain(force_save=True)
+
+    async def _drain(self, force_save: bool = False) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await loop.run_in_executor(self._executor, self._insert, batch)
+            except Exception as e:
+                logger.warning("Similarity index insert failed for a batch of {}: {}", len(batch), e)
+        due = time.monotonic() - self._last_save >= self.save_interval_seconds
+        if self._dirty and (due or force_save):
+            self._dirty = False
+            self._last_save = time.monotonic()
+            try:
+                version = await loop.run_in_executor(self._executor, self.index.save, self.path)
+                logger.debug("🧭 Saved similarity index version {}", version)
+            except Exception as e:
+                self._dirty = True
+                logger.warning("Similarity index save failed: {}", e)
+
+    def _insert(self, batch: List[Tuple[str, str]]) -> None:
+        for item_id, text in batch:
+            if item_id not in self.index:
+                self.index.add(item_id, dense_vector(text, self.dim))
+                self._dirty = True
@@ -0,0 +1,361 @@
+from __future__ import annotations
+from typing import Any, Callable, List, Tuple, Type
+import asyncio
+import glob
+import os
+import struct
+import threading
+import time
+import zlib
+
+import orjson
+from loguru import logger
+from tenacity import RetryError
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.metrics import DEAD_LETTERS, SINK_HEALTHY, SPOOL_BYTES, SPOOL_DEPTH
+
+# Errors that mean "downstream unavailable, try again later". Anything else raised
+# for a single item is treated as a poison item and dead-lettered.
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (ConnectionError, OSError, asyncio.TimeoutError)
+
+_FRAME = struct.Struct("<II")  # payload length, crc32
+
+class Spool:
+    """
+    Append-only write-ahead log of length-prefixed, checksummed frames split into
+    segment files. Appends go through a buffered file and are fsynced in batches by
+    ``sync()``; the read position is a (segment, offset) cursor persisted with an
+    atomic rename, and fully consumed segments are deleted. A torn frame at the tail
+    (crash mid-write) is truncated on open.
+
+    ``append`` runs on the event loop; ``sync``, ``read``, ``commit`` and ``close`` may
+    run in worker threads. A lock serialises the write file and the counters between
+    them, and is never held across an fsync of the write file.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._cursor_path = os.path.join(directory, "cursor")
+        self.read_segment, self.read_offset = self._load_cursor()
+        segments = self._segments()
+        self.pending = 0
+        self.bytes = 0
+        for seq in segments:
+            count, size = self._recover(seq, self.read_offset if seq == self.read_segment else 0)
+            self.pending += count
+            self.bytes += size
+        self._seq = segments[-1] if segments else self.read_segment
+        self._file = open(self._path(self._seq), "ab")
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"seg-{seq:012d}.log")
+
+    def _segments(self) -> List[int]:
+        seqs = sorted(int(os.path.basename(p)[4:16]) for p in glob.glob(os.path.join(self.directory, "seg-*.log")))
+        return [s for s in seqs if s >= self.read_segment]
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(self._cursor_path, "rb") as f:
+                c = orjson.loads(f.read())
+            return c["segment"], c["offset"]
+        except FileNotFoundError:
+            return 0, 0
+
+    def _recover(self, seq: int, start: int) -> Tuple[int, int]:
+        """Count complete frames after ``start`` and cut off a torn tail."""
+        path = self._path(seq)
+        count, good = 0, start
+        with open(path, "rb") as f:
+            f.seek(start)
+            while True:
+                header = f.read(_FRAME.size)
+                if len(header) < _FRAME.size:
+                    break
+                length, crc = _FRAME.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                count += 1
+                good = f.tell()
+        if good < os.path.getsize(path):
+            logger.warning("Truncating torn spool tail in {} at byte {}", path, good)
+            os.truncate(path, good)
+        return count, good - start
+
+    def append(self, payload: bytes) -> None:
+        with self._lock:
+            if self._file.tell() >= self.segment_bytes:
+                self._roll()
+            self._file.write(_FRAME.pack(len(payload), zlib.crc32(payload)))
+            self._file.write(payload)
+            self.pending += 1
+            self.bytes += _FRAME.size + len(payload)
+            self._dirty = True
+
+    def _roll(self) -> None:
+        # Under the lock. The closed segment's frames are fsynced by the next sync()
+        # through the descriptor it duplicated, or here when none is pending.
+        self._file.flush()
+        if self._dirty:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+        self._file.close()
+        self._seq += 1
+        self._file = open(self._path(self._seq), "ab")
+
+    def sync(self) -> None:
+        """Flush and fsync pending appends (safe to call from a worker thread)."""
+        with self._lock:
+            if not self._dirty or self._file.closed:
+                return
+            self._dirty = False
+            self._file.flush()
+            # A duplicate stays valid if the segment rolls while it is being fsynced.
+            fd = os.dup(self._file.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def read(self, max_records: int) -> Tuple[List[bytes], Tuple[int, int]]:
+        """Up to ``max_records`` payloads from the cursor, plus the position after them."""
+        with self._lock:
+            self._file.flush()
+            last = self._seq
+        seq, offset = self.read_segment, self.read_offset
+        out: List[bytes] = []
+        while len(out) < max_records:
+            path = self._path(seq)
+            if not os.path.exists(path):
+                break
+            with open(path, "rb") as f:
+                f.seek(offset)
+                while len(out) < max_records:
+                    header = f.read(_FRAME.size)
+                    if len(header) < _FRAME.size:
+                        break
+                    length, _ = _FRAME.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length:  # an append still in flight
+                        break
+                    out.append(payload)
+                    offset = f.tell()
+            if len(out) >= max_records or seq >= last:
+                break
+            seq, offset = seq + 1, 0
+        return out, (seq, offset)
+
+    def commit(self, position: Tuple[int, int], records: int, size: int) -> None:
+        seq, offset = position
+        tmp = self._cursor_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps({"segment": seq, "offset": offset}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._cursor_path)
+        for old in range(self.read_segment, seq):
+            try:
+                os.remove(self._path(old))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.read_segment, self.read_offset = seq, offset
+            self.pending -= records
+            self.bytes -= size
+
+    def close(self) -> None:
+        self.sync()
+        with self._lock:
+            self._file.close()
+
+class DeadLetterFile:
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def write(self, sink: str, payload: bytes, error: BaseException) -> None:
+        entry = b'{"sink":' + orjson.dumps(sink) + b',"error":' + orjson.dumps(f"{type(error).__name__}: {error}") \
+            + b',"failed_at":' + orjson.dumps(time.time()) + b',"item":' + payload + b"}\n"
+        with open(self.path, "ab") as f:
+            f.write(entry)
+            f.flush()
+            os.fsync(f.fileno())
+
+def _unwrap(exc: BaseException) -> BaseException:
+    # tenacity gives up with RetryError; classify by what the last attempt raised.
+    if isinstance(exc, RetryError) and exc.last_attempt.failed:
+        return exc.last_attempt.exception()
+    return exc
+
+def single_attempt(method: Callable) -> Callable:
+    """
+    ``method`` without its tenacity ``@retry``: the spool is the retry, and a retry
+    loop with backoff outlasts the spool timeout, so every error, poison or not,
+    would surface as a timeout.
+    """
+    fn = getattr(method, "__func__", method)
+    if getattr(fn, "retry", None) is None or getattr(fn, "__wrapped__", None) is None:
+        return method
+    owner = getattr(method, "__self__", None)
+    return fn.__wrapped__.__get__(owner) if owner is not None else fn.__wrapped__
+
+class SpooledSink:
+    """
+    Wraps a sink so the pipeline never waits on a slow or failed downstream. While
+    healthy, ``emit`` calls the inner sink under ``timeout``; on a transient failure
+    the sink turns degraded and items are appended to the disk spool (preserving order
+    until the spool is empty again). A background drainer replays the spool in batches
+    (through ``bulk.write`` when given, else item by item), backs off while the
+    downstream keeps failing and sends items that fail with non-transient errors to
+    the dead-letter file together with the error. The inner sink and bulk writer are
+    called once per attempt (their own tenacity retries are stripped); running into
+    ``timeout`` counts as transient, anything raised is classified by its type.
+    Spool reads, commits and dead-letter writes run in worker threads. ``flush``
+    (reached through ``flush_sinks`` at shutdown) stops the background tasks and
+    fsyncs and closes the spool.
+    """
+
+    def __init__(self, inner: Any, name: str, directory: str, bulk: Any = None, timeout: float = 2.0,
+                 batch_size: int = 500, fsync_interval: float = 0.1, max_backoff: float = 30.0,
+                 transient_errors: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS) -> None:
+        self.inner = inner
+        self.name = name
+        self.bulk = bulk
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.max_backoff = max_backoff
+        self.transient_errors = transient_errors
+        self._emit = single_attempt(inner.emit)
+        self._write = single_attempt(bulk.write) if bulk is not None else None
+        self.spool = Spool(os.path.join(directory, name))
+        self.dead_letters = DeadLetterFile(os.path.join(directory, f"{name}.dead-letter.jsonl"))
+        self.healthy = self.spool.pending == 0
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._depth = SPOOL_DEPTH.labels(sink=name)
+        self._bytes = SPOOL_BYTES.labels(sink=name)
+        self._dead = DEAD_LETTERS.labels(sink=name)
+        self._health = SINK_HEALTHY.labels(sink=name)
+        self._health.set(1 if self.healthy else 0)
+        self._depth.set_function(lambda: self.spool.pending)
+        self._bytes.set_function(lambda: self.spool.bytes)
+        if not self.healthy:
+            logger.warning("📼 {} spool has {} items from a previous run", name, self.spool.pending)
+
+    @property
+    def realtime(self) -> bool:
+        return bool(getattr(self.inner, "realtime", False))
+
+    def _start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._drain()), asyncio.create_task(self._fsync_loop())]
+            if self.spool.pending:
+                self._wake.set()
+
+    def _set_health(self, healthy: bool) -> None:
+        if healthy != self.healthy:
+            self.healthy = healthy
+            self._health.set(1 if healthy else 0)
+            if healthy:
+                logger.info("✅ {} recovered; spool drained", self.name)
+            else:
+                logger.warning("📼 {} degraded; spooling to disk", self.name)
+
+    def _is_poison(self, exc: BaseException, scope: asyncio.Timeout) -> bool:
+        """Raised by the sink with a non-transient error, as opposed to timing out or an outage."""
+        return not scope.expired() and not isinstance(_unwrap(exc), self.transient_errors)
+
+    async def emit(self, item: NewsItem) -> None:
+        self._start()
+        if self.healthy:
+            # asyncio.timeout avoids the extra task wait_for creates per call.
+            scope = asyncio.timeout(self.timeout)
+            try:
+                async with scope:
+                    await self._emit(item)
+                return
+            except Exception as exc:
+                if self._is_poison(exc, scope):
+                    self._dead.inc()
+                    await asyncio.to_thread(self.dead_letters.write, self.name, orjson.dumps(item.__dict__),
+                                            _unwrap(exc))
+                    return
+                logger.warning("{} emit failed ({}); spooling", self.name, _unwrap(exc))
+                self._set_health(False)
+        self.spool.append(orjson.dumps(item.__dict__))
+        self._wake.set()
+
+    async def _fsync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            try:
+                await asyncio.to_thread(self.spool.sync)
+            except OSError as e:
+                logger.error("{} spool fsync failed: {}", self.name, e)
+
+    async def _drain(self) -> None:
+        backoff = 0.5
+        while True:
+            await self._wake.wait()
+            payloads, position = await asyncio.to_thread(self.spool.read, self.batch_size)
+            if not payloads:
+                self._wake.clear()
+                if self.spool.pending == 0:
+                    self._set_health(True)
+                continue
+            items = [NewsItem(**orjson.loads(p)) for p in payloads]
+            ok = await self._replay(items, payloads)
+            if ok:
+                await asyncio.to_thread(self.spool.commit, position, len(payloads),
+                                        sum(_FRAME.size + len(p) for p in payloads))
+                backoff = 0.5
+            else:
+                await asyncio.sleep(backoff)
+                backoff = min(self.max_backoff, backoff * 2)
+
+    async def _replay(self, items: List[NewsItem], payloads: List[bytes]) -> bool:
+        """True when the whole batch was delivered or dead-lettered."""
+        if self._write is not None:
+            scope = asyncio.timeout(self.timeout * 5)
+            try:
+                async with scope:
+                    await self._write(items)
+                return True
+            except Exception as exc:
+                if not self._is_poison(exc, scope):
+                    logger.debug("{} still unavailable: {}", self.name, _unwrap(exc))
+                    return False
+                # Fall through: find the poison item(s) one by one.
+        for item, payload in zip(items, payloads):
+            scope = asyncio.timeout(self.timeout)
+            try:
+                async with scope:
+                    await self._emit(item)
+            except Exception as exc:
+                if not self._is_poison(exc, scope):
+                    # Items before this one may be re-sent; sinks upsert by id.
+                    return False
+                self._dead.inc()
+                await asyncio.to_thread(self.dead_letters.write, self.name, payload, _unwrap(exc))
+                logger.error("☠️ {} dead-lettered {}: {}", self.name, item.id, _unwrap(exc))
+        return True
+
+    async def flush(self) -> None:
+        """Flush the inner sink if it buffers, then stop the spool's tasks and fsync and close it."""
+        inner_flush = getattr(self.inner, "flush", None)
+        if inner_flush is not None:
+            await inner_flush()
+        await self.close()
+
+    async def close(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(self.spool.close)
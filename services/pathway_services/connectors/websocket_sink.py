@@ -1,24 +1,42 @@
 from __future__ import annotations
-from typing import Optional
+import random
+import time
 import orjson
 from loguru import logger
-from redis.asyncio import Redis
 
 from services.pathway_services.schema import NewsItem
+from services.pathway_services.database.redis import get_redis
+from services.pathway_services.utils.metrics import FRESHNESS, PUBLISH_LATENCY
+from services.pathway_services.utils.timeutil import to_epoch
+from services.pathway_services.utils.tracing import INGEST, PRIORITY, PUBLISH, stage_deltas
 
 class RedisWebSocketSink:
-    def __init__(self, redis_url: str, channel: str) -> None:
+    # Priority-lane items are published here before any other sink sees them.
+    realtime = True
+
+    def __init__(self, redis_url: str, channel: str, trace_sample_rate: float = 0.0) -> None:
         self.redis_url = redis_url
         self.channel = channel
-        self._redis: Optional[Redis] = None
-
-    async def _client(self) -> Redis:
-        if not self._redis:
-            self._redis = Redis.from_url(self.redis_url, encoding="utf-8", decode_responses=True)
-        return self._redis
+        self.trace_sample_rate = trace_sample_rate
+        self._source_ingest = FRESHNESS.labels(segment="source_ingest")
+        self._ingest_publish = FRESHNESS.labels(segment="ingest_publish")
+        self._lane_latency = {lane: PUBLISH_LATENCY.labels(lane=lane) for lane in ("priority", "bulk")}
 
     async def emit(self, item: NewsItem) -> None:
-        redis = await self._client()
+        redis = await get_redis(self.redis_url)
+        now = time.time()
+        item.trace[PUBLISH] = now
         payload = orjson.dumps(item.__dict__).decode("utf-8")
         await redis.publish(self.channel, payload)
         logger.debug("📣 Published news {} to channel {}", item.id, self.channel)
+        self._record_freshness(item, now)
+
+    def _record_freshness(self, item: NewsItem, published: float) -> None:
+        ingest = item.trace.get(INGEST)
+        if ingest is None:
+            return
+        self._source_ingest.observe(max(0.0, ingest - to_epoch(item.published_at, default=ingest)))
+        self._ingest_publish.observe(published - ingest)
+        self._lane_latency["priority" if PRIORITY in item.trace else "bulk"].observe(published - ingest)
+        if self.trace_sample_rate and random.random() < self.trace_sample_rate:
+            logger.info("🧵 Trace {} {}", item.id, stage_deltas(item.trace))
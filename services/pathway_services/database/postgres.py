@@ -1,11 +1,42 @@
 from __future__ import annotations
 import asyncpg
+import orjson
 from typing import Optional
 
 _pool: Optional[asyncpg.Pool] = None
 
+# Columns and indexes added to ``news`` after it was first deployed. Each statement is
+# idempotent; they run once per pool, under an advisory lock so that workers and the
+# API starting together do not race on the DDL.
+SCHEMA_MIGRATIONS = (
+    "ALTER TABLE news ADD COLUMN IF NOT EXISTS story_id text",
+    "CREATE INDEX IF NOT EXISTS news_story_published_idx ON news (published_at) WHERE story_id IS NOT NULL",
+)
+MIGRATION_LOCK_KEY = 0x6E657773  # "news"
+
+async def init_json_codecs(conn: asyncpg.Connection) -> None:
+    """
+    Pool ``init`` for connections that write Python objects into json/jsonb columns.
+    The codecs are binary because ``copy_records_to_table`` only speaks the binary
+    protocol: jsonb's binary form is a version byte (1) followed by the JSON text,
+    json's is the text itself.
+    """
+    await conn.set_type_codec("json", encoder=orjson.dumps, decoder=orjson.loads,
+                              schema="pg_catalog", format="binary")
+    await conn.set_type_codec("jsonb", encoder=lambda v: b"\x01" + orjson.dumps(v),
+                              decoder=lambda b: orjson.loads(b[1:]), schema="pg_catalog", format="binary")
+
+async def migrate(pool: asyncpg.Pool) -> None:
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK_KEY)
+            for sql in SCHEMA_MIGRATIONS:
+                await conn.execute(sql)
+
 async def get_pool(dsn: str) -> asyncpg.Pool:
     global _pool
     if _pool is None:
-        _pool = await asyncpg.create_pool(dsn, min_size=1, max_size=10)
+        pool = await asyncpg.create_pool(dsn, min_size=1, max_size=10)
+        await migrate(pool)
+        _pool = pool
     return _pool
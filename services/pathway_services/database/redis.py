@@ -1,6 +1,7 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Optional, Sequence
 from redis.asyncio import Redis
+import orjson
 
 _client: Optional[Redis] = None
 
@@ -9,3 +10,13 @@ async def get_redis(url: str) -> Redis:
     if _client is None:
         _client = Redis.from_url(url, encoding="utf-8", decode_responses=True)
     return _client
+
+def set_redis(client: Optional[Redis]) -> None:
+    """Install a client (e.g. connectors.memory.MemoryRedis) for every get_redis caller."""
+    global _client
+    _client = client
+
+async def publish_changed(redis: Redis, channel: str, ids: Sequence[str]) -> None:
+    """Tell the API hot windows that these ``news`` rows were written outside the live stream."""
+    if ids:
+        await redis.publish(channel, orjson.dumps({"ids": list(ids)}))
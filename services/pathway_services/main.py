@@ -1,13 +1,140 @@
 from services.pathway_services.utils.config import settings
 from services.pathway_services.utils.logger import logger
 from services.pathway_services.connectors.kafka_input import KafkaInput
-from services.pathway_services.connectors.api_input import APIPullInput
+from services.pathway_services.connectors.api_input import APIPullInput, Sink, Transform
+from services.pathway_services.connectors.batching import BatchController, Urgent, any_of, urgent_by_relevance
 from services.pathway_services.news.processors.sentiment_categorizer import SentimentCategorizer
 from services.pathway_services.news.processors.entity_extractor import EntityExtractor
 from services.pathway_services.news.processors.relevance_scoring import RelevanceScorer
 from services.pathway_services.news.processors.market_impact import MarketImpactAssessor
-from services.pathway_services.connectors.postgres_sink import PostgresSink
+from services.pathway_services.news.processors.story_clustering import StoryClusterer
+from services.pathway_services.news.processors.dag import TransformDAG
+from services.pathway_services.news.processors.priority import PriorityClassifier
+from services.pathway_services.news.analytics.stories import StoryIndex
+from services.pathway_services.connectors.postgres_sink import BulkPostgresWriter, PostgresSink
+from services.pathway_services.connectors.spool import TRANSIENT_ERRORS, SpooledSink
 from services.pathway_services.connectors.websocket_sink import RedisWebSocketSink
+from services.pathway_services.connectors.burst_sink import BurstAlertSink
+from services.pathway_services.connectors.feed_sink import RankedFeedSink
+from services.pathway_services.connectors.similarity_sink import SimilarityIndexSink
+from services.pathway_services.connectors.memory import InMemoryBroker, MemoryKafkaInput, MemoryPostgresSink, MemoryRedis
+from services.pathway_services.database.redis import set_redis
+from services.pathway_services.news.analytics.burst import BurstDetector
+from services.pathway_services.utils.metrics import TimedSink, start_metrics_server
+from services.pathway_services.utils.profiling import SamplingProfiler, start_on_signal
+from services.pathway_services.utils.dictionaries import DictionaryStore
+from services.pathway_services.utils.snapshot import StateRegistry
+from services.pathway_services.utils.timeutil import to_epoch
+import signal
+import asyncpg
+import redis.exceptions
+import orjson
+from typing import List, Optional, Tuple
+
+PG_TRANSIENT_ERRORS = TRANSIENT_ERRORS + (
+    asyncpg.PostgresConnectionError, asyncpg.InterfaceError, asyncpg.TooManyConnectionsError,
+    asyncpg.CannotConnectNowError,
+)
+REDIS_TRANSIENT_ERRORS = TRANSIENT_ERRORS + (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+def build_dictionaries() -> DictionaryStore:
+    return DictionaryStore(settings.DICTIONARY_PATH or None, poll_interval=settings.DICTIONARY_POLL_SECONDS)
+
+def build_transforms(dictionaries: Optional[DictionaryStore] = None) -> List[Transform]:
+    """Enrichment stages; each declares the fields it reads and writes (see TransformDAG)."""
+    dictionaries = dictionaries or build_dictionaries()
+    sentiment = SentimentCategorizer(dictionaries)
+    entities = EntityExtractor(dictionaries)
+    relevance = RelevanceScorer(dictionaries)
+    impact = MarketImpactAssessor()
+    stories = StoryClusterer(
+        StoryIndex(threshold=settings.STORY_SIMILARITY_THRESHOLD, ttl_seconds=settings.STORY_TTL_SECONDS)
+    )
+    return [sentiment, entities, relevance, impact, stories]
+
+def build_batching(name: str, dictionaries: DictionaryStore) -> Tuple[BatchController, Optional[Urgent]]:
+    controller = BatchController(target_p99=settings.BATCH_TARGET_P99_SECONDS, max_size=settings.BATCH_MAX_SIZE,
+                                 name=name)
+    kinds = [k.strip() for k in settings.PRIORITY_KINDS.split(",") if k.strip()]
+    return controller, any_of(
+        PriorityClassifier(dictionaries, kinds) if kinds else None,
+        urgent_by_relevance(RelevanceScorer(dictionaries), settings.BATCH_URGENT_RELEVANCE)
+        if settings.BATCH_URGENT_RELEVANCE > 0 else None,
+    )
+
+def build_sinks() -> List[Sink]:
+    """Output sinks configured from settings (Postgres, Redis pub/sub and feeds, similar-news index)."""
+    if settings.PIPELINE_BACKEND == "memory":
+        db_sink = MemoryPostgresSink(fail_rate=settings.MEMORY_FAIL_RATE, seed=settings.MEMORY_SEED)
+        db_bulk = db_sink
+        set_redis(MemoryRedis())
+    else:
+        db_sink = PostgresSink(dsn=settings.POSTGRES_URL)
+        db_bulk = BulkPostgresWriter(dsn=settings.POSTGRES_URL)
+    ws_sink = RedisWebSocketSink(
+        redis_url=settings.REDIS_URL,
+        channel=settings.WS_REDIS_CHANNEL,
+        trace_sample_rate=settings.TRACE_SAMPLE_RATE,
+    )
+    burst_sink = BurstAlertSink(
+        redis_url=settings.REDIS_URL,
+        channel=settings.BURST_REDIS_CHANNEL,
+        detector=BurstDetector(
+            bucket_seconds=settings.BURST_BUCKET_SECONDS,
+            alpha=settings.BURST_ALPHA,
+            z_threshold=settings.BURST_Z_THRESHOLD,
+            p_threshold=settings.BURST_P_THRESHOLD,
+            min_count=settings.BURST_MIN_COUNT,
+        ),
+    )
+    feed_sink = RankedFeedSink(
+        redis_url=settings.REDIS_URL,
+        key_prefix=settings.FEED_REDIS_PREFIX,
+        k=settings.FEED_TOP_K,
+        half_life_seconds=settings.FEED_HALF_LIFE_SECONDS,
+    )
+    similar_sink = SimilarityIndexSink(
+        path=settings.SIMILAR_INDEX_DIR,
+        dim=settings.SIMILAR_VECTOR_DIM,
+        save_interval_seconds=settings.SIMILAR_SAVE_INTERVAL_SECONDS,
+    )
+    if settings.SPOOL_ENABLED:
+        # Outages and slow downstreams divert to a disk spool instead of stalling the pipeline.
+        spool = dict(directory=settings.SPOOL_DIR, timeout=settings.SPOOL_TIMEOUT_SECONDS,
+                     fsync_interval=settings.SPOOL_FSYNC_INTERVAL_SECONDS)
+        db_sink = SpooledSink(db_sink, "postgres", bulk=db_bulk, transient_errors=PG_TRANSIENT_ERRORS, **spool)
+        ws_sink = SpooledSink(ws_sink, "websocket", transient_errors=REDIS_TRANSIENT_ERRORS, **spool)
+    sinks = [db_sink, ws_sink, burst_sink, feed_sink, similar_sink]
+    if settings.ARCHIVE_ENABLED:
+        # Imported lazily: pyarrow is only needed when the archive is on.
+        from services.pathway_services.connectors.parquet_sink import ParquetArchiveSink
+        sinks.append(ParquetArchiveSink(
+            root=settings.ARCHIVE_DIR,
+            flush_rows=settings.ARCHIVE_FLUSH_ROWS,
+            flush_seconds=settings.ARCHIVE_FLUSH_SECONDS,
+        ))
+    return sinks
+
+def build_snapshots(components: List[object]) -> Optional[StateRegistry]:
+    """Registry of the stateful transforms and sinks among ``components``, if snapshots are on."""
+    if not settings.SNAPSHOT_ENABLED:
+        return None
+    registry = StateRegistry(settings.SNAPSHOT_DIR, interval_seconds=settings.SNAPSHOT_INTERVAL_SECONDS)
+    logger.info("📸 Snapshotting {} to {} every {:.0f} s", registry.register_all(components),
+                settings.SNAPSHOT_DIR, settings.SNAPSHOT_INTERVAL_SECONDS)
+    return registry
+
+def build_memory_input(controller: Optional[BatchController] = None, snapshots: Optional[StateRegistry] = None,
+                       urgent: Optional[Urgent] = None) -> MemoryKafkaInput:
+    """In-memory topic preloaded with the seeded benchmark stream."""
+    from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+
+    broker = InMemoryBroker(partitions=settings.MEMORY_PARTITIONS)
+    for _, item in NewsGenerator(GeneratorConfig(seed=settings.MEMORY_SEED)).stream(settings.MEMORY_ITEMS):
+        broker.produce(settings.KAFKA_TOPIC_NEWS, orjson.dumps(item.__dict__), key=item.id.encode(),
+                       timestamp=to_epoch(item.published_at))
+    return MemoryKafkaInput(broker, settings.KAFKA_TOPIC_NEWS, controller=controller, urgent=urgent,
+                            snapshots=snapshots)
 
 def main() -> None:
     """
@@ -15,28 +142,60 @@ def main() -> None:
     transformations, and output sinks (DB + WebSocket).
     """
     logger.info("🚀 Starting HexaPulse FinPocket worker (env={})", settings.ENV)
+    start_metrics_server(settings.WORKER_METRICS_PORT)
+
+    # `kill -USR1 <pid>` profiles the running worker for PROFILE_SECONDS.
+    profiler = SamplingProfiler(settings.PROFILE_DIR, "worker", interval=settings.PROFILE_INTERVAL_SECONDS)
+    start_on_signal(profiler, signal.SIGUSR1, settings.PROFILE_SECONDS, settings.PROFILE_TRACEMALLOC)
+
+    # Dictionary edits are picked up without a restart; items carry the version they used.
+    dictionaries = build_dictionaries()
+    dictionaries.start()
+
+    transforms = build_transforms(dictionaries)
+    sinks = build_sinks()
+    # Restored by the input before it consumes, from the offsets the state was saved at.
+    snapshots = build_snapshots([*transforms, *sinks])
 
     # Select input source based on config
-    if settings.KAFKA_BROKERS:
-        input_source = KafkaInput(brokers=settings.KAFKA_BROKERS, topic=settings.KAFKA_TOPIC_NEWS)
+    if settings.PIPELINE_BACKEND == "memory":
+        controller, urgent = build_batching("memory", dictionaries)
+        input_source = build_memory_input(controller, snapshots, urgent)
+        logger.info("🧪 Using in-memory backend ({} items, seed={})", settings.MEMORY_ITEMS, settings.MEMORY_SEED)
+    elif settings.KAFKA_BROKERS:
+        controller, urgent = build_batching("kafka", dictionaries)
+        input_source = KafkaInput(brokers=settings.KAFKA_BROKERS, topic=settings.KAFKA_TOPIC_NEWS,
+                                  controller=controller, urgent=urgent, snapshots=snapshots,
+                                  group=settings.KAFKA_GROUP)
         logger.info("🔌 Using Kafka input on topic: {}", settings.KAFKA_TOPIC_NEWS)
     else:
-        input_source = APIPullInput(sources=["bloomberg", "cnbc"], interval_seconds=10)
-        logger.info("🔌 Using API pull input from Bloomberg/CNBC placeholders")
-
-    sentiment = SentimentCategorizer()
-    entities = EntityExtractor()
-    relevance = RelevanceScorer()
-    impact = MarketImpactAssessor()
-
-    db_sink = PostgresSink(dsn=settings.POSTGRES_URL)
-    ws_sink = RedisWebSocketSink(redis_url=settings.REDIS_URL, channel=settings.WS_REDIS_CHANNEL)
+        sources = [name.strip() for name in settings.FETCH_SOURCES.split(",") if name.strip()]
+        controller, urgent = build_batching("api", dictionaries)
+        input_source = APIPullInput(
+            sources=sources,
+            max_concurrency=settings.FETCH_MAX_CONCURRENCY,
+            off_hours_multiplier=settings.FETCH_OFF_HOURS_MULTIPLIER,
+            weekend_multiplier=settings.FETCH_WEEKEND_MULTIPLIER,
+            controller=controller,
+            urgent=urgent,
+        )
+        logger.info("🔌 Using API pull input from {}", sources)
+        if snapshots is not None:
+            # No offsets to resume from: fetchers keep their own cursors (news/fetchers/state.py).
+            logger.warning("📸 State snapshots need a Kafka input; disabled for API pull")
 
-    # Build and run pipeline
-    input_source.run_pipeline(
-        transforms=[sentiment, entities, relevance, impact],
-        sinks=[db_sink, ws_sink],
+    # Independent stages run concurrently; the DAG times each stage and the critical path.
+    dag = TransformDAG(
+        transforms,
+        executor=settings.DAG_EXECUTOR,
+        workers=settings.DAG_WORKERS or None,
+        chunk_size=settings.DAG_CHUNK_SIZE,
     )
+    try:
+        input_source.run_pipeline(transforms=[dag], sinks=[TimedSink(s) for s in sinks])
+    finally:
+        dag.close()
+        dictionaries.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+import math
+
+import numpy as np
+
+from services.pathway_services.utils.snapshot import pack_strings, unpack_strings
+
+@dataclass
+class BurstAlert:
+    entity: str
+    bucket_start: float
+    count: int
+    mean: float
+    std: float
+    zscore: float
+    p_value: float
+
+class _EntityState:
+    __slots__ = ("first", "bucket", "count", "mean", "var", "pmf", "cdf", "alerted")
+
+    def __init__(self, bucket: int, first: Optional[int] = None) -> None:
+        self.first = bucket if first is None else first  # bucket the entity was first seen in
+        self.bucket = bucket
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.pmf = 1.0  # P(X = count) under Poisson(mean), maintained incrementally
+        self.cdf = 0.0  # P(X < count)
+        self.alerted = False
+
+class BurstDetector:
+    """
+    Streaming per-entity burst detector.
+
+    Arrivals are counted in fixed buckets; when a bucket closes its count updates an
+    EWMA mean/variance of the entity's arrival rate. The open bucket is compared
+    against that baseline with both a z-score and a Poisson tail probability, which is
+    maintained incrementally because the baseline is fixed while a bucket is open.
+    An entity only alerts once ``warmup_buckets`` have passed since it was first seen,
+    so one that appears mid-stream is not compared against an empty baseline. Every
+    observation costs O(1) regardless of the number of tracked entities, and whenever
+    the stream enters a new bucket, entities idle for so long that their baseline has
+    decayed to zero are dropped (one that returns warms up again as a new entity).
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = 300.0,
+        alpha: float = 0.1,
+        z_threshold: float = 4.0,
+        p_threshold: float = 1e-6,
+        min_count: int = 3,
+        warmup_buckets: int = 12,
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.p_threshold = p_threshold
+        self.min_count = min_count
+        self.warmup_buckets = warmup_buckets
+        # Beyond this many empty buckets the EWMA has decayed below 1e-6 of its value.
+        self._max_decay_steps = max(1, math.ceil(math.log(1e-6) / math.log(1.0 - alpha)))
+        self._states: Dict[str, _EntityState] = {}
+        self._latest: Optional[int] = None  # newest bucket observed
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def observe(self, entity: str, ts: float) -> Optional[BurstAlert]:
+        bucket = int(ts // self.bucket_seconds)
+        if self._latest is None or bucket > self._latest:
+            self._latest = bucket
+            self._evict(bucket)
+        state = self._states.get(entity)
+        if state is None:
+            state = self._states[entity] = _EntityState(bucket)
+        elif bucket > state.bucket:
+            self._roll(state, bucket)
+        # Late arrivals (bucket < state.bucket) are counted in the open bucket.
+
+        state.cdf += state.pmf
+        state.count += 1
+        state.pmf *= state.mean / state.count
+
+        if state.alerted or state.count < self.min_count:
+            return None
+        if bucket - state.first < self.warmup_buckets:
+            return None
+
+        # Floor at one item per bucket so near-silent entities don't alert on noise.
+        std = math.sqrt(max(state.var, state.mean, 1.0))
+        z = (state.count - state.mean) / std
+        p = max(0.0, 1.0 - state.cdf)
+        if z < self.z_threshold and p > self.p_threshold:
+            return None
+        state.alerted = True
+        return BurstAlert(
+            entity=entity,
+            bucket_start=bucket * self.bucket_seconds,
+            count=state.count,
+            mean=state.mean,
+            std=std,
+            zscore=z,
+            p_value=p,
+        )
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        states = list(self._states.values())
+        entities, entities_end = pack_strings(list(self._states))
+        arrays = {"entities": entities, "entities_end": entities_end}
+        for field, dtype in (("first", np.int64), ("bucket", np.int64), ("count", np.int64), ("mean", np.float64), ("var", np.float64),
+                             ("pmf", np.float64), ("cdf", np.float64), ("alerted", np.bool_)):
+            arrays[field] = np.array([getattr(s, field) for s in states], dtype=dtype)
+        return arrays, {"bucket_seconds": self.bucket_seconds}
+
+    def restore(self, arrays: Mapping[str, np.ndarray], meta: dict) -> None:
+        if meta["bucket_seconds"] != self.bucket_seconds:
+            raise ValueError(f"snapshot counts {meta['bucket_seconds']} s buckets, detector uses {self.bucket_seconds} s")
+        columns = [arrays[f].tolist() for f in ("first", "bucket", "count", "mean", "var", "pmf", "cdf", "alerted")]
+        states: Dict[str, _EntityState] = {}
+        for entity, first, bucket, count, mean, var, pmf, cdf, alerted in zip(
+                unpack_strings(arrays["entities"], arrays["entities_end"]), *columns):
+            state = states[entity] = _EntityState(bucket, first)
+            state.count, state.mean, state.var = count, mean, var
+            state.pmf, state.cdf, state.alerted = pmf, cdf, alerted
+        self._states = states
+        self._latest = max(columns[1], default=None)
+
+    def _evict(self, bucket: int) -> None:
+        idle = [e for e, s in self._states.items() if bucket - s.bucket > self._max_decay_steps]
+        for entity in idle:
+            del self._states[entity]
+
+    def _roll(self, state: _EntityState, bucket: int) -> None:
+        self._update(state, float(state.count))
+        empty = bucket - state.bucket - 1
+        if empty >= self._max_decay_steps:
+            state.mean = 0.0
+            state.var = 0.0
+        else:
+            for _ in range(empty):
+                self._update(state, 0.0)
+        state.bucket = bucket
+        state.count = 0
+        state.pmf = math.exp(-state.mean)
+        state.cdf = 0.0
+        state.alerted = False
+
+    def _update(self, state: _EntityState, x: float) -> None:
+        diff = x - state.mean
+        incr = self.alpha * diff
+        state.mean += incr
+        state.var = (1.0 - self.alpha) * (state.var + diff * incr)
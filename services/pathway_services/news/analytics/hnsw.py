@@ -0,0 +1,490 @@
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import heapq
+import json
+import math
+import os
+import random
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+GENERATION_PREFIX = "g"
+
+Neighbors = Callable[[int, int], Sequence[int]]
+
+def search_layer(
+    vectors: np.ndarray, neighbors: Neighbors, q: np.ndarray, entries: List[int], ef: int, level: int
+) -> List[Tuple[float, int]]:
+    """Best-first beam search on one graph layer; returns up to ``ef`` (similarity, node) pairs, best first."""
+    visited = set(entries)
+    sims = (vectors[entries] @ q).tolist()
+    candidates = [(-s, e) for s, e in zip(sims, entries)]
+    heapq.heapify(candidates)
+    best = [(s, e) for s, e in zip(sims, entries)]
+    heapq.heapify(best)
+    while len(best) > ef:
+        heapq.heappop(best)
+    while candidates:
+        neg, node = heapq.heappop(candidates)
+        if len(best) >= ef and -neg < best[0][0]:
+            break
+        fresh = [n for n in neighbors(node, level) if n not in visited]
+        if not fresh:
+            continue
+        visited.update(fresh)
+        for sim, n in zip((vectors[fresh] @ q).tolist(), fresh):
+            if len(best) < ef or sim > best[0][0]:
+                heapq.heappush(candidates, (-sim, n))
+                heapq.heappush(best, (sim, n))
+                if len(best) > ef:
+                    heapq.heappop(best)
+    return sorted(best, reverse=True)
+
+def greedy_search(
+    vectors: np.ndarray, neighbors: Neighbors, q: np.ndarray, entry: int, top_level: int, ef: int
+) -> List[Tuple[float, int]]:
+    ep = [entry]
+    for level in range(top_level, 0, -1):
+        ep = [search_layer(vectors, neighbors, q, ep, 1, level)[0][1]]
+    return search_layer(vectors, neighbors, q, ep, ef, 0)
+
+class HNSWIndex:
+    """
+    Mutable HNSW graph over L2-normalized float32 vectors (inner-product similarity).
+
+    Layer 0 adjacency lives in a padded int32 array; the sparse upper layers are dicts.
+    ``save`` is incremental (see ``_Generation``): only rows added since the last save
+    and layer-0 rows whose links changed are written, into memory-mapped files the
+    readers share, and a small new version with the upper layers and the row count is
+    published by flipping ``CURRENT`` atomically. Not thread-safe: ``add`` and ``save``
+    must not run concurrently.
+    """
+
+    def __init__(self, dim: int, m: int = 16, ef_construction: int = 100, capacity: int = 1024, seed: int = 0) -> None:
+        self.dim = dim
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self._ml = 1.0 / math.log(m)
+        self._rng = random.Random(seed)
+        self.count = 0
+        self.entry = -1
+        self.max_level = -1
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.levels = np.zeros(capacity, dtype=np.int8)
+        self.layer0 = np.full((capacity, self.m0), -1, dtype=np.int32)
+        self.degree0 = np.zeros(capacity, dtype=np.int16)
+        self.upper: List[Dict[int, List[int]]] = []  # upper[l - 1][node] -> neighbours on level l
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.uid = uuid.uuid4().hex  # tells readers a rebuilt index from the one they cached ids for
+        self._dirty0: Set[int] = set()  # rows whose layer-0 links changed since the last save
+        self._disk: Optional[_Generation] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    def _neighbors(self, node: int, level: int) -> Sequence[int]:
+        if level == 0:
+            return self.layer0[node, : self.degree0[node]].tolist()
+        return self.upper[level - 1].get(node, ())
+
+    def _grow(self) -> None:
+        cap = self.vectors.shape[0] * 2
+        self.vectors = np.resize(self.vectors, (cap, self.dim))
+        self.levels = np.resize(self.levels, cap)
+        layer0 = np.full((cap, self.m0), -1, dtype=np.int32)
+        layer0[: self.count] = self.layer0[: self.count]
+        self.layer0 = layer0
+        self.degree0 = np.resize(self.degree0, cap)
+
+    def add(self, item_id: str, vec: np.ndarray) -> int:
+        row = self._rows.get(item_id)
+        if row is not None:
+            return row  # vectors are immutable once linked
+        if self.count == self.vectors.shape[0]:
+            self._grow()
+        row = self.count
+        self.count += 1
+        self.vectors[row] = vec
+        self.degree0[row] = 0
+        self.ids.append(item_id)
+        self._rows[item_id] = row
+
+        level = int(-math.log(1.0 - self._rng.random()) * self._ml)
+        self.levels[row] = level
+        while len(self.upper) < level:
+            self.upper.append({})
+        for l in range(1, level + 1):
+            self.upper[l - 1][row] = []
+
+        if self.entry < 0:
+            self.entry, self.max_level = row, level
+            return row
+
+        q = self.vectors[row]
+        vectors = self.vectors[: self.count]
+        ep = [self.entry]
+        for l in range(self.max_level, level, -1):
+            ep = [search_layer(vectors, self._neighbors, q, ep, 1, l)[0][1]]
+        for l in range(min(level, self.max_level), -1, -1):
+            found = search_layer(vectors, self._neighbors, q, ep, self.ef_construction, l)
+            cap = self.m0 if l == 0 else self.m
+            selected = self._select(vectors, found, cap)
+            self._set_links(row, l, selected)
+            for n in selected:
+                self._link(vectors, n, row, l, cap)
+            ep = [n for _, n in found]
+        if level > self.max_level:
+            self.entry, self.max_level = row, level
+        return row
+
+    def _select(self, vectors: np.ndarray, found: List[Tuple[float, int]], cap: int) -> List[int]:
+        """HNSW neighbour heuristic: keep a candidate only if it is closer to the query than to any kept one."""
+        if len(found) <= cap:
+            return [n for _, n in found]
+        nodes = [n for _, n in found]
+        cand = vectors[nodes]
+        gram = cand @ cand.T
+        closest_kept = np.full(len(nodes), -np.inf, dtype=np.float32)
+        kept: List[int] = []
+        pruned: List[int] = []
+        for i, (sim, n) in enumerate(found):
+            if closest_kept[i] > sim:
+                pruned.append(n)
+                continue
+            kept.append(n)
+            if len(kept) >= cap:
+                break
+            np.maximum(closest_kept, gram[i], out=closest_kept)
+        return kept + pruned[: cap - len(kept)]
+
+    def _set_links(self, node: int, level: int, links: List[int]) -> None:
+        if level == 0:
+            self._dirty0.add(node)
+            self.layer0[node, : len(links)] = links
+            self.layer0[node, len(links):] = -1
+            self.degree0[node] = len(links)
+        else:
+            self.upper[level - 1][node] = list(links)
+
+    def _link(self, vectors: np.ndarray, node: int, new: int, level: int, cap: int) -> None:
+        links = list(self._neighbors(node, level))
+        links.append(new)
+        if len(links) > cap:
+            sims = (vectors[links] @ vectors[node]).tolist()
+            found = sorted(zip(sims, links), reverse=True)
+            links = self._select(vectors, found, cap)
+        self._set_links(node, level, links)
+
+    def search(self, vec: np.ndarray, k: int, ef: int = 64) -> List[Tuple[str, float]]:
+        if self.entry < 0:
+            return []
+        found = greedy_search(self.vectors[: self.count], self._neighbors, vec, self.entry, self.max_level, max(ef, k))
+        return [(self.ids[n], s) for s, n in found[:k]]
+
+    def save(self, path: str) -> str:
+        """Persist to ``path`` incrementally and publish a new version. Returns the version name."""
+        n = self.count
+        disk = self._disk
+        if disk is None or disk.root != path or n > disk.capacity:
+            # First save, or the files are full: start a generation sized for growth, written in full.
+            capacity = max(1024, 1 << max(0, n - 1).bit_length())
+            disk = self._disk = _Generation.create(path, capacity, self.dim, self.m0)
+            dirty: List[int] = []
+        else:
+            dirty = sorted(r for r in self._dirty0 if r < disk.count)
+        disk.write(self, dirty)
+        self._dirty0.clear()
+        arrays: Dict[str, np.ndarray] = {}
+        for l, nodes in enumerate(self.upper, start=1):
+            keys = np.array(sorted(nodes), dtype=np.int32)
+            links = np.full((len(keys), self.m), -1, dtype=np.int32)
+            for i, node in enumerate(keys.tolist()):
+                links[i, : len(nodes[node])] = nodes[node]
+            arrays[f"upper_nodes_{l}"] = keys
+            arrays[f"upper_links_{l}"] = links
+        meta = {
+            "dim": self.dim, "m": self.m, "ef_construction": self.ef_construction, "count": n,
+            "entry": self.entry, "max_level": self.max_level, "saved_at": time.time(), "uid": self.uid,
+            "generation": disk.name, "capacity": disk.capacity, "ids_bytes": disk.ids_bytes,
+        }
+        version = write_version(path, arrays, meta)
+        _prune_generations(path)
+        return version
+
+    @classmethod
+    def load(cls, path: str) -> Optional["HNSWIndex"]:
+        """Rebuild a mutable index from the current on-disk version, if any; later saves continue it."""
+        reader = HNSWReader.open(path)
+        if reader is None:
+            return None
+        index = cls(reader.dim, m=reader.meta["m"], ef_construction=reader.meta["ef_construction"],
+                    capacity=max(1024, reader.count))
+        n = reader.count
+        index.count = n
+        index.uid = reader.meta["uid"]
+        index.entry, index.max_level = reader.entry, reader.max_level
+        index.vectors[:n] = reader.vectors
+        index.levels[:n] = reader.levels
+        layer0 = np.array(reader.layer0)
+        # A save interrupted after writing links but before publishing its count can
+        # leave links to rows this version does not have: drop them, rewrite those rows.
+        stale = layer0 >= n
+        for row in np.flatnonzero(stale.any(axis=1)).tolist():
+            links = layer0[row][(layer0[row] >= 0) & ~stale[row]]
+            layer0[row] = -1
+            layer0[row, : len(links)] = links
+            index._dirty0.add(row)
+        index.layer0[:n] = layer0
+        index.degree0[:n] = (layer0 >= 0).sum(axis=1)
+        for l in range(1, reader.max_level + 1):
+            nodes, links = reader.upper[l - 1]
+            index.upper.append({int(node): [int(x) for x in row if x >= 0] for node, row in zip(nodes, links)})
+        index.ids = [reader.id_of(row) for row in range(n)]
+        index._rows = {item_id: row for row, item_id in enumerate(index.ids)}
+        index._disk = _Generation.open(path, reader.meta)
+        return index
+
+class _Generation:
+    """
+    The row data of a saved index, preallocated to ``capacity`` rows under
+    ``<root>/g<n>/``: memory-mapped ``vectors``, ``levels``, ``layer0`` and ``id_ends``
+    plus an append-only ``ids.bin``. Rows below a published count only change in
+    ``layer0`` (links added or pruned), so a save writes the new rows and the dirty
+    layer-0 rows in place, flushes, and only then publishes the count; readers ignore
+    rows and links at or past the count of the version they opened. A full generation
+    is replaced by a new, larger one that the index writes in full; the old one is
+    deleted once no kept version refers to it.
+    """
+
+    FILES = ("vectors", "levels", "layer0", "id_ends")
+
+    def __init__(self, root: str, name: str, count: int, ids_bytes: int, arrays: Dict[str, np.ndarray]) -> None:
+        self.root = root
+        self.name = name
+        self.count = count
+        self.ids_bytes = ids_bytes
+        self.vectors, self.levels = arrays["vectors"], arrays["levels"]
+        self.layer0, self.id_ends = arrays["layer0"], arrays["id_ends"]
+        self.capacity = self.vectors.shape[0]
+
+    @classmethod
+    def create(cls, root: str, capacity: int, dim: int, m0: int) -> "_Generation":
+        os.makedirs(root, exist_ok=True)
+        name = "%s%d" % (GENERATION_PREFIX, time.time_ns())
+        base = os.path.join(root, name)
+        os.makedirs(base)
+        shapes = {"vectors": ((capacity, dim), np.float32), "levels": ((capacity,), np.int8),
+                  "layer0": ((capacity, m0), np.int32), "id_ends": ((capacity,), np.int64)}
+        arrays = {
+            f: np.lib.format.open_memmap(os.path.join(base, f + ".npy"), mode="w+", dtype=dtype, shape=shape)
+            for f, (shape, dtype) in shapes.items()
+        }
+        open(os.path.join(base, "ids.bin"), "wb").close()
+        return cls(root, name, 0, 0, arrays)
+
+    @classmethod
+    def open(cls, root: str, meta: dict) -> "_Generation":
+        base = os.path.join(root, meta["generation"])
+        arrays = {f: np.load(os.path.join(base, f + ".npy"), mmap_mode="r+") for f in cls.FILES}
+        # Ids appended by a save that never published its version.
+        os.truncate(os.path.join(base, "ids.bin"), meta["ids_bytes"])
+        return cls(root, meta["generation"], meta["count"], meta["ids_bytes"], arrays)
+
+    def write(self, index: HNSWIndex, dirty: List[int]) -> None:
+        start, n = self.count, index.count
+        self.vectors[start:n] = index.vectors[start:n]
+        self.levels[start:n] = index.levels[start:n]
+        self.layer0[start:n] = index.layer0[start:n]
+        if dirty:
+            rows = np.array(dirty, dtype=np.int64)
+            self.layer0[rows] = index.layer0[rows]
+        new_ids = [i.encode("utf-8") for i in index.ids[start:n]]
+        if new_ids:
+            self.id_ends[start:n] = self.ids_bytes + np.cumsum([len(i) for i in new_ids])
+            with open(os.path.join(self.root, self.name, "ids.bin"), "ab") as f:
+                f.write(b"".join(new_ids))
+                f.flush()
+                os.fsync(f.fileno())
+            self.ids_bytes = int(self.id_ends[n - 1])
+        for f in self.FILES:
+            getattr(self, f).flush()
+        self.count = n
+
+def _prune_generations(path: str) -> None:
+    """Delete generation directories that no kept version refers to (open readers keep their mappings)."""
+    used = set()
+    for d in os.listdir(path):
+        if d.startswith("v") and not d.endswith(".tmp"):
+            try:
+                with open(os.path.join(path, d, "meta.json")) as f:
+                    used.add(json.load(f).get("generation"))
+            except FileNotFoundError:
+                continue
+    if not used:
+        return
+    newest = max(int(g[len(GENERATION_PREFIX):]) for g in used)
+    for d in os.listdir(path):
+        # Only older ones: a newer generation may be in the middle of its first save.
+        if d.startswith(GENERATION_PREFIX) and d not in used and int(d[len(GENERATION_PREFIX):]) < newest:
+            shutil.rmtree(os.path.join(path, d), ignore_errors=True)
+
+def write_version(path: str, arrays: Dict[str, np.ndarray], meta: dict) -> str:
+    os.makedirs(path, exist_ok=True)
+    version = "v%d" % time.time_ns()
+    tmp = os.path.join(path, version + ".tmp")
+    os.makedirs(tmp)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, name + ".npy"), arr)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    os.rename(tmp, os.path.join(path, version))
+    pointer = os.path.join(path, CURRENT_FILE + ".tmp")
+    with open(pointer, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, os.path.join(path, CURRENT_FILE))
+    _prune_versions(path, keep=KEEP_VERSIONS)
+    return version
+
+def _prune_versions(path: str, keep: int) -> None:
+    versions = sorted((d for d in os.listdir(path) if d.startswith("v") and not d.endswith(".tmp")),
+                      key=lambda d: int(d[1:]))
+    for old in versions[:-keep]:
+        shutil.rmtree(os.path.join(path, old), ignore_errors=True)
+
+def current_version(path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+class _IdLookup:
+    """
+    Item id -> row for every version of one index (same ``uid``), extended with each
+    newer version's rows instead of rebuilt: recent ids sit in a dict that is merged
+    into sorted numpy arrays once it grows past an eighth of them. Readers search from
+    request threads, so each extension publishes a new ``(keys, rows, recent)`` tuple
+    in one assignment and never mutates a published one.
+    """
+
+    def __init__(self) -> None:
+        self.known = 0
+        self._state: Tuple[np.ndarray, np.ndarray, Dict[bytes, int]] = (
+            np.zeros(0, dtype="S1"), np.zeros(0, dtype=np.int64), {})
+        self._lock = threading.Lock()
+
+    def extend(self, reader: "HNSWReader") -> None:
+        with self._lock:
+            if reader.count <= self.known:
+                return
+            keys, rows, recent = self._state
+            recent = {**recent, **{reader.id_bytes(row): row for row in range(self.known, reader.count)}}
+            if len(recent) > max(4096, len(keys) // 8):
+                keys = np.concatenate([keys, np.array(list(recent), dtype=bytes)])
+                rows = np.concatenate([rows, np.fromiter(recent.values(), dtype=np.int64)])
+                order = np.argsort(keys, kind="stable")
+                keys, rows, recent = keys[order], rows[order], {}
+            self._state = (keys, rows, recent)
+            self.known = reader.count
+
+    def get(self, key: bytes) -> Optional[int]:
+        keys, rows, recent = self._state
+        row = recent.get(key)
+        if row is not None:
+            return row
+        i = int(np.searchsorted(keys, key))
+        return int(rows[i]) if i < len(keys) and keys[i] == key else None
+
+# root -> (uid, lookup) of the newest index seen there; readers keep their own reference.
+_lookups: Dict[str, Tuple[str, _IdLookup]] = {}
+_lookups_lock = threading.Lock()
+
+def _lookup_for(root: str, uid: str) -> _IdLookup:
+    with _lookups_lock:
+        entry = _lookups.get(root)
+        if entry is None or entry[0] != uid:
+            entry = _lookups[root] = (uid, _IdLookup())
+        return entry[1]
+
+class HNSWReader:
+    """
+    Read-only, memory-mapped view of a saved HNSWIndex version. Row data is shared with
+    the writer's current generation, which keeps growing: rows and links at or past
+    this version's ``count`` are ignored.
+    """
+
+    def __init__(self, root: str, version: str) -> None:
+        self.version = version
+        base = os.path.join(root, version)
+        with open(os.path.join(base, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        def load(name: str, where: str = base) -> np.ndarray:
+            return np.load(os.path.join(where, name + ".npy"), mmap_mode="r")
+
+        self.dim = self.meta["dim"]
+        self.count = n = self.meta["count"]
+        self.entry = self.meta["entry"]
+        self.max_level = self.meta["max_level"]
+        self.upper = [(load(f"upper_nodes_{l}"), load(f"upper_links_{l}")) for l in range(1, self.max_level + 1)]
+        rows = os.path.join(root, self.meta["generation"])
+        self._id_ends = load("id_ends", rows)[:n]
+        ids_bytes = self.meta["ids_bytes"]
+        self._blob = (np.memmap(os.path.join(rows, "ids.bin"), dtype=np.uint8, mode="r", shape=(ids_bytes,))
+                      if ids_bytes else np.zeros(0, dtype=np.uint8))
+        self.vectors = load("vectors", rows)[:n]
+        self.levels = load("levels", rows)[:n]
+        self.layer0 = load("layer0", rows)[:n]
+        self._lookup = _lookup_for(root, self.meta["uid"])
+        self._lookup.extend(self)
+
+    @classmethod
+    def open(cls, root: str) -> Optional["HNSWReader"]:
+        version = current_version(root)
+        return cls(root, version) if version else None
+
+    def _neighbors(self, node: int, level: int) -> Iterable[int]:
+        if level == 0:
+            row = self.layer0[node]
+        else:
+            nodes, links = self.upper[level - 1]
+            row = links[int(np.searchsorted(nodes, node))]
+        return row[(row >= 0) & (row < self.count)].tolist()
+
+    def id_bytes(self, row: int) -> bytes:
+        start = int(self._id_ends[row - 1]) if row else 0
+        return self._blob[start:int(self._id_ends[row])].tobytes()
+
+    def id_of(self, row: int) -> str:
+        return self.id_bytes(row).decode("utf-8")
+
+    def row_of(self, item_id: str) -> Optional[int]:
+        row = self._lookup.get(item_id.encode("utf-8"))
+        # The lookup is shared with newer versions, which know rows this one does not.
+        return row if row is not None and row < self.count else None
+
+    def search(self, vec: np.ndarray, k: int, ef: int = 64) -> List[Tuple[str, float]]:
+        if self.entry < 0:
+            return []
+        found = greedy_search(self.vectors, self._neighbors, vec, self.entry, self.max_level, max(ef, k))
+        return [(self.id_of(n), s) for s, n in found[:k]]
+
+    def similar_to(self, item_id: str, k: int, ef: int = 64) -> Optional[List[Tuple[str, float]]]:
+        row = self.row_of(item_id)
+        if row is None:
+            return None
+        hits = self.search(np.asarray(self.vectors[row]), k + 1, ef)
+        return [(i, s) for i, s in hits if i != item_id][:k]
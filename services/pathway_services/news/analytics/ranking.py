@@ -0,0 +1,102 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import heapq
+import math
+
+IMPACT_WEIGHTS = {"low": 1.0, "medium": 1.5, "high": 2.5}
+
+def base_score(relevance: int, market_impact: str) -> float:
+    return (1.0 + max(0, relevance)) * IMPACT_WEIGHTS.get(market_impact, 1.0)
+
+def feed_key(prefix: str, category: str) -> str:
+    return f"{prefix}:{category}"
+
+# The shared keys use "." so that no category name can collide with them.
+def items_key(prefix: str) -> str:
+    return f"{prefix}.items"
+
+def feeds_key(prefix: str) -> str:
+    return f"{prefix}.feeds"
+
+def decayed(key: float, now: float, half_life: float) -> float:
+    """The score at ``now`` of an item with static key ``key`` (see DecayedTopK)."""
+    return 2.0 ** (key - now / half_life)
+
+class DecayedTopK:
+    """
+    Top-K items by ``base * 2 ** (-(now - published) / half_life)``.
+
+    Exponential decay multiplies every item's score by the same factor as time
+    passes, so the ranking only depends on the static key
+    ``log2(base) + published / half_life``. Items are keyed once on insert and
+    never rescored; the actual decayed score is only computed when reading.
+    """
+
+    def __init__(self, k: int, half_life_seconds: float) -> None:
+        self.k = k
+        self.half_life = half_life_seconds
+        # Min-heap of [key, seq, item_id, payload, published]; entries are invalidated
+        # in place (item_id=None) when an item is re-inserted.
+        self._heap: List[list] = []
+        self._members: Dict[str, list] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._members
+
+    def key(self, base: float, published: float) -> float:
+        return math.log2(max(base, 1e-9)) + published / self.half_life
+
+    def push(self, item_id: str, base: float, published: float, payload: bytes) -> Optional[List[str]]:
+        """
+        Insert or update an item. Returns None if it did not make the top-K, else the
+        ids it pushed out (usually none, one once the feed is full).
+        """
+        key = self.key(base, published)
+        old = self._members.get(item_id)
+        if old is None and len(self._members) >= self.k and key <= self._min_key():
+            return None
+        if old is not None:
+            old[2] = None
+        self._seq += 1
+        entry = [key, self._seq, item_id, payload, published]
+        self._members[item_id] = entry
+        heapq.heappush(self._heap, entry)
+        evicted = []
+        while len(self._members) > self.k:
+            entry = heapq.heappop(self._heap)
+            if entry[2] is not None:
+                del self._members[entry[2]]
+                evicted.append(entry[2])
+        self._prune()
+        if len(self._heap) > 2 * self.k:
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+        return evicted
+
+    def entries(self) -> List[Tuple[float, str, bytes, float]]:
+        """Members as (key, item_id, payload, published), oldest insert first."""
+        return [(e[0], e[2], e[3], e[4]) for e in sorted(self._members.values(), key=lambda e: e[1])]
+
+    def load(self, entries: List[Tuple[float, str, bytes, float]]) -> None:
+        """Replace the members with ``entries`` (as returned by ``entries``), keys kept as they were."""
+        members = {}
+        for seq, (key, item_id, payload, published) in enumerate(entries, start=1):
+            members[item_id] = [key, seq, item_id, payload, published]
+        heap = list(members.values())
+        heapq.heapify(heap)
+        self._members, self._heap, self._seq = members, heap, len(entries)
+        while len(self._members) > self.k:
+            evicted = heapq.heappop(self._heap)
+            del self._members[evicted[2]]
+
+    def _min_key(self) -> Optional[float]:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def _prune(self) -> None:
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
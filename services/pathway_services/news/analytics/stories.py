@@ -0,0 +1,155 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Set, Tuple
+import hashlib
+import heapq
+
+import numpy as np
+
+from services.pathway_services.news.analytics.vectors import cosine, l2_normalize
+from services.pathway_services.utils.snapshot import pack_strings, unpack_strings
+
+class StoryCluster:
+    __slots__ = ("story_id", "sum", "centroid", "size", "last_seen")
+
+    def __init__(self, story_id: str, vec: Dict[int, float], ts: float) -> None:
+        self.story_id = story_id
+        self.sum = dict(vec)
+        self.centroid = dict(vec)
+        self.size = 1
+        self.last_seen = ts
+
+class StoryIndex:
+    """
+    Online single-pass clustering of sparse item vectors into stories.
+
+    Candidate clusters come from an inverted index over each centroid's top terms
+    (an approximate nearest-neighbour lookup); only the best-overlapping few are
+    scored exactly. Centroids are truncated to ``max_terms`` and clusters idle for
+    ``ttl_seconds`` (or beyond ``max_clusters``) are expired, so per-item cost stays
+    bounded no matter how long the worker runs.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.2,
+        ttl_seconds: float = 6 * 3600,
+        max_clusters: int = 20_000,
+        max_terms: int = 64,
+        probe_terms: int = 12,
+        max_candidates: int = 32,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_clusters = max_clusters
+        self.max_terms = max_terms
+        self.probe_terms = probe_terms
+        self.max_candidates = max_candidates
+        self._clusters: "OrderedDict[str, StoryCluster]" = OrderedDict()  # least recently updated first
+        self._postings: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def assign(self, vec: Dict[int, float], ts: float, new_story_id: str) -> str:
+        """Add a vector to its nearest story (or a new one) and return the story id."""
+        self._expire(ts)
+        best = self._nearest(vec)
+        if best is None and new_story_id in self._clusters:
+            best = self._clusters[new_story_id]
+        if best is None:
+            cluster = StoryCluster(new_story_id, vec, ts)
+            self._clusters[new_story_id] = cluster
+            self._index(cluster, {}, self._truncate(cluster))
+            return new_story_id
+
+        cluster = best
+        for k, v in vec.items():
+            cluster.sum[k] = cluster.sum.get(k, 0.0) + v
+        cluster.size += 1
+        cluster.last_seen = max(cluster.last_seen, ts)
+        self._clusters.move_to_end(cluster.story_id)
+        old = cluster.centroid
+        self._index(cluster, old, self._truncate(cluster))
+        return cluster.story_id
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        """Clusters, least recently updated first, with term sums as CSR rows."""
+        clusters = list(self._clusters.values())
+        indptr = np.zeros(len(clusters) + 1, dtype=np.int64)
+        np.cumsum([len(c.sum) for c in clusters], out=indptr[1:])
+        ids, ids_end = pack_strings([c.story_id for c in clusters])
+        arrays = {
+            "ids": ids, "ids_end": ids_end,
+            "size": np.array([c.size for c in clusters], dtype=np.int64),
+            "last_seen": np.array([c.last_seen for c in clusters], dtype=np.float64),
+            "indptr": indptr,
+            "terms": np.fromiter((t for c in clusters for t in c.sum), dtype=np.int64, count=int(indptr[-1])),
+            "weights": np.fromiter((w for c in clusters for w in c.sum.values()), dtype=np.float64,
+                                   count=int(indptr[-1])),
+        }
+        return arrays, {"clusters": len(clusters)}
+
+    def restore(self, arrays: Mapping[str, np.ndarray], meta: dict) -> None:
+        """Replace the index with a snapshot; centroids and postings are rebuilt from the sums."""
+        indptr = arrays["indptr"].tolist()
+        terms, weights = arrays["terms"].tolist(), arrays["weights"].tolist()
+        restored = StoryIndex(self.threshold, self.ttl_seconds, self.max_clusters, self.max_terms,
+                              self.probe_terms, self.max_candidates)
+        rows = zip(unpack_strings(arrays["ids"], arrays["ids_end"]), arrays["size"].tolist(),
+                   arrays["last_seen"].tolist(), indptr, indptr[1:])
+        for story_id, size, last_seen, start, end in rows:
+            cluster = StoryCluster(story_id, dict(zip(terms[start:end], weights[start:end])), last_seen)
+            cluster.size = size
+            restored._clusters[story_id] = cluster
+            restored._index(cluster, {}, restored._truncate(cluster))
+        self._clusters, self._postings = restored._clusters, restored._postings
+
+    def _nearest(self, vec: Dict[int, float]) -> Optional[StoryCluster]:
+        probes = heapq.nlargest(self.probe_terms, vec.items(), key=lambda kv: kv[1])
+        overlap: Dict[str, int] = {}
+        for term, _ in probes:
+            for story_id in self._postings.get(term, ()):
+                overlap[story_id] = overlap.get(story_id, 0) + 1
+        if not overlap:
+            return None
+        candidates = heapq.nlargest(self.max_candidates, overlap.items(), key=lambda kv: kv[1])
+        best, best_sim = None, self.threshold
+        for story_id, _ in candidates:
+            cluster = self._clusters[story_id]
+            sim = cosine(vec, cluster.centroid)
+            if sim >= best_sim:
+                best, best_sim = cluster, sim
+        return best
+
+    def _truncate(self, cluster: StoryCluster) -> Dict[int, float]:
+        if len(cluster.sum) > self.max_terms:
+            cluster.sum = dict(heapq.nlargest(self.max_terms, cluster.sum.items(), key=lambda kv: kv[1]))
+        cluster.centroid = l2_normalize(cluster.sum)
+        return cluster.centroid
+
+    def _index(self, cluster: StoryCluster, old: Dict[int, float], new: Dict[int, float]) -> None:
+        for term in old.keys() - new.keys():
+            self._unpost(term, cluster.story_id)
+        for term in new.keys() - old.keys():
+            self._postings.setdefault(term, set()).add(cluster.story_id)
+
+    def _unpost(self, term: int, story_id: str) -> None:
+        posting = self._postings.get(term)
+        if posting is not None:
+            posting.discard(story_id)
+            if not posting:
+                del self._postings[term]
+
+    def _expire(self, now: float) -> None:
+        while self._clusters:
+            story_id, cluster = next(iter(self._clusters.items()))
+            if cluster.last_seen >= now - self.ttl_seconds and len(self._clusters) < self.max_clusters:
+                break
+            del self._clusters[story_id]
+            for term in cluster.centroid:
+                self._unpost(term, story_id)
+
+def story_id_for(item_id: str) -> str:
+    """Stable id for a story opened by ``item_id``."""
+    return "story-" + hashlib.blake2b(item_id.encode("utf-8"), digest_size=8).hexdigest()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Dict, List, Mapping, Tuple
+import math
+import re
+import zlib
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or said says that the to was were will with "
+    "after amid over new".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+def bucket(token: str, dim: int) -> int:
+    return zlib.crc32(token.encode("utf-8")) % dim
+
+def l2_normalize(vec: Dict[int, float]) -> Dict[int, float]:
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    if norm == 0.0:
+        return vec
+    return {k: v / norm for k, v in vec.items()}
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Dot product of two L2-normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+class HashedTfidf:
+    """
+    Sparse TF-IDF over hashed unigrams and bigrams with online document frequencies.
+    Memory is fixed at ``dim`` counters regardless of vocabulary size.
+    """
+
+    def __init__(self, dim: int = 1 << 18) -> None:
+        self.dim = dim
+        self.docs = 0
+        self.df: Dict[int, int] = {}
+
+    def features(self, text: str) -> Dict[int, int]:
+        toks = tokenize(text)
+        grams = toks + [f"{a}_{b}" for a, b in zip(toks, toks[1:])]
+        tf: Dict[int, int] = {}
+        for g in grams:
+            h = bucket(g, self.dim)
+            tf[h] = tf.get(h, 0) + 1
+        return tf
+
+    def transform(self, text: str, update: bool = True) -> Dict[int, float]:
+        tf = self.features(text)
+        if update:
+            self.docs += 1
+            for h in tf:
+                self.df[h] = self.df.get(h, 0) + 1
+        n = self.docs + 1
+        vec = {h: (1.0 + math.log(c)) * (math.log(n / (1 + self.df.get(h, 0))) + 1.0) for h, c in tf.items()}
+        return l2_normalize(vec)
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        return {
+            "df_buckets": np.fromiter(self.df.keys(), dtype=np.int64, count=len(self.df)),
+            "df_counts": np.fromiter(self.df.values(), dtype=np.int64, count=len(self.df)),
+        }, {"dim": self.dim, "docs": self.docs}
+
+    def restore(self, arrays: Mapping[str, np.ndarray], meta: dict) -> None:
+        if meta["dim"] != self.dim:
+            raise ValueError(f"snapshot hashes into {meta['dim']} buckets, vectorizer uses {self.dim}")
+        self.df = dict(zip(arrays["df_buckets"].tolist(), arrays["df_counts"].tolist()))
+        self.docs = meta["docs"]
+
+def dense_vector(text: str, dim: int = 128) -> np.ndarray:
+    """
+    Signed feature-hashing embedding of unigrams and bigrams with sublinear tf,
+    L2-normalized so inner product equals cosine similarity.
+    """
+    toks = tokenize(text)
+    vec = np.zeros(dim, dtype=np.float32)
+    counts: Dict[str, int] = {}
+    for g in toks + [f"{a}_{b}" for a, b in zip(toks, toks[1:])]:
+        counts[g] = counts.get(g, 0) + 1
+    for g, c in counts.items():
+        h = zlib.crc32(g.encode("utf-8"))
+        vec[h % dim] += (1.0 + math.log(c)) * (1.0 if (h >> 31) & 1 else -1.0)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0.0 else vec
@@ -0,0 +1,7 @@
+# Importing the fetcher modules registers them with the registry.
+from services.pathway_services.news.fetchers import bloomberg, cnbc  # noqa: F401
+from services.pathway_services.news.fetchers.rss import register_feeds
+from services.pathway_services.utils.config import settings
+
+# RSS_FEEDS="moneycontrol=https://...,livemint=https://..." adds conditional RSS sources.
+register_feeds(settings.RSS_FEEDS, settings.FETCH_STATE_DIR, settings.RSS_INTERVAL_SECONDS)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from typing import List
 import datetime as dt
+import httpx
 from services.pathway_services.schema import NewsItem
+from services.pathway_services.news.fetchers.registry import register
 
-async def fetch_latest_bloomberg() -> List[NewsItem]:
+@register("bloomberg", interval=15.0)
+async def fetch_latest_bloomberg(client: httpx.AsyncClient) -> List[NewsItem]:
     """
     Placeholder: In production, integrate official API or licensed feed.
     """
@@ -23,6 +26,6 @@ async def fetch_latest_bloomberg() -> List[NewsItem]:
             relevance=0,
             market_impact="low",
             entities={"companies": [], "indices": [], "regulators": []},
-            numbers={"percentages": [], "amounts": [], "points": []},
+            numbers={"percentages": [], "amounts": [], "currencies": [], "points": [], "bps": []},
         )
     ]
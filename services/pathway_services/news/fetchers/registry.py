@@ -0,0 +1,44 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Dict, List
+import httpx
+
+from services.pathway_services.schema import NewsItem
+
+FetchFn = Callable[[httpx.AsyncClient], Awaitable[List[NewsItem]]]
+
+@dataclass(frozen=True)
+class FetcherSpec:
+    """
+    How often and how patiently to poll one source. ``interval`` is the base period
+    during exchange hours; the scheduler shrinks it towards ``min_interval`` while the
+    source keeps publishing and stretches it towards ``max_interval`` while it is idle.
+    """
+
+    name: str
+    fetch: FetchFn
+    interval: float = 30.0
+    min_interval: float = 5.0
+    max_interval: float = 600.0
+    jitter: float = 0.1     # +/- fraction of the interval
+    timeout: float = 10.0
+
+    def with_interval(self, interval: float) -> "FetcherSpec":
+        return replace(self, interval=interval, min_interval=min(self.min_interval, interval))
+
+FETCHERS: Dict[str, FetcherSpec] = {}
+
+def register(name: str, **options) -> Callable[[FetchFn], FetchFn]:
+    """Decorator adding a fetcher to the registry under ``name``."""
+    def decorator(fn: FetchFn) -> FetchFn:
+        FETCHERS[name] = FetcherSpec(name=name, fetch=fn, **options)
+        return fn
+    return decorator
+
+def get_fetcher(name: str) -> FetcherSpec:
+    # Importing the package registers the built-in fetchers.
+    import services.pathway_services.news.fetchers  # noqa: F401
+    try:
+        return FETCHERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown news source {name!r}; registered: {sorted(FETCHERS)}") from None
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+import datetime as dt
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+
+import httpx
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.news.fetchers.registry import register
+from services.pathway_services.news.fetchers.state import SourceCursor
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+def _published(value: Optional[str]) -> str:
+    parsed = None
+    if value:
+        value = value.strip()
+        try:
+            parsed = parsedate_to_datetime(value)  # RSS: RFC 822
+        except (TypeError, ValueError):
+            try:
+                parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))  # Atom: RFC 3339
+            except ValueError:
+                parsed = None
+    if parsed is None:
+        parsed = dt.datetime.now(dt.timezone.utc)
+    elif parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.astimezone(dt.timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+def _text(node: ET.Element, tag: str) -> Optional[str]:
+    child = node.find(tag)
+    return child.text.strip() if child is not None and child.text else None
+
+def parse_feed(body: bytes, name: str, source: str) -> List[NewsItem]:
+    """RSS 2.0 ``<item>`` or Atom ``<entry>`` elements as NewsItems, in feed order."""
+    root = ET.fromstring(body)
+    entries = []
+    for node in root.iter("item"):
+        entries.append((_text(node, "guid"), _text(node, "title"), _text(node, "link"),
+                        _text(node, "pubDate"), _text(node, "description")))
+    for node in root.iter(ATOM + "entry"):
+        link = node.find(ATOM + "link")
+        entries.append((_text(node, ATOM + "id"), _text(node, ATOM + "title"),
+                        link.get("href") if link is not None else None,
+                        _text(node, ATOM + "updated") or _text(node, ATOM + "published"),
+                        _text(node, ATOM + "summary")))
+    items = []
+    for guid, title, url, published, summary in entries:
+        if not title or not url:
+            continue
+        key = hashlib.sha1((guid or url).encode()).hexdigest()[:16]
+        items.append(NewsItem(
+            id=f"{name}-{key}",
+            source=source,
+            title=title,
+            url=url,
+            published_at=_published(published),
+            summary=summary,
+            content=None,
+            categories=[],
+            sentiment="neutral",
+            sentiment_confidence=0.5,
+            relevance=0,
+            market_impact="low",
+            entities={"companies": [], "indices": [], "regulators": []},
+            numbers={"percentages": [], "amounts": [], "currencies": [], "points": [], "bps": []},
+        ))
+    return items
+
+class RSSFeed:
+    """
+    Conditional, incremental fetcher for one RSS/Atom feed. Sends the stored ETag /
+    Last-Modified validators (a 304 costs no body and no parsing) and emits only items
+    the SourceCursor has not seen. The cursor is saved at the start of the next poll,
+    i.e. once the scheduler has handed the previous batch downstream, so a crash
+    re-ingests at most one batch (sinks upsert by id) instead of losing it.
+    """
+
+    def __init__(self, name: str, url: str, source: Optional[str] = None, state_dir: str = "data/fetch-state") -> None:
+        self.name = name
+        self.url = url
+        self.source = source or name
+        self.cursor = SourceCursor(os.path.join(state_dir, f"{name}.json"))
+        self._dirty = False
+
+    async def __call__(self, client: httpx.AsyncClient) -> List[NewsItem]:
+        if self._dirty:
+            self.cursor.save()
+            self._dirty = False
+        resp = await client.get(self.url, headers=self.cursor.request_headers())
+        if resp.status_code == 304:
+            return []
+        resp.raise_for_status()
+        items = self.cursor.filter_new(parse_feed(resp.content, self.name, self.source))
+        self.cursor.update_validators(resp.headers.get("etag"), resp.headers.get("last-modified"))
+        self._dirty = True
+        return items
+
+def register_feeds(spec: str, state_dir: str, interval: float = 60.0) -> List[str]:
+    """Register ``name=url`` pairs from a comma-separated spec; returns the names."""
+    names = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, url = entry.partition("=")
+        if not url:
+            raise ValueError(f"RSS feed entry {entry!r} is not name=url")
+        name = name.strip()
+        register(name, interval=interval)(RSSFeed(name, url.strip(), state_dir=state_dir))
+        names.append(name)
+    return names
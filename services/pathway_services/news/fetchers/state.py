@@ -0,0 +1,81 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+import os
+import time
+
+import orjson
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.timeutil import to_epoch
+
+class SourceCursor:
+    """
+    Per-source fetch state: the validators from the last 200 response (ETag,
+    Last-Modified), the newest ``published_at`` seen and the URLs seen within
+    ``lookback`` seconds of it. Items older than that window are dropped outright;
+    newer ones are new unless their URL was seen. Persisted as JSON next to the
+    other fetchers' state (write-then-rename) so a restart resumes where it stopped.
+    """
+
+    def __init__(self, path: str, lookback: float = 86400.0, max_urls: int = 10_000) -> None:
+        self.path = path
+        self.lookback = lookback
+        self.max_urls = max_urls
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.newest: float = 0.0
+        self.seen: "OrderedDict[str, float]" = OrderedDict()  # url -> published epoch, oldest first
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                state = orjson.loads(f.read())
+            self.etag = state.get("etag")
+            self.last_modified = state.get("last_modified")
+            self.newest = state.get("newest", 0.0)
+            self.seen.update((url, ts) for url, ts in state.get("seen", []))
+
+    def request_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update_validators(self, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def filter_new(self, items: Iterable[NewsItem]) -> List[NewsItem]:
+        """Keep unseen items (in feed order) and remember them."""
+        cutoff = self.newest - self.lookback
+        fresh: List[NewsItem] = []
+        for item in items:
+            ts = to_epoch(item.published_at)
+            if ts < cutoff or item.url in self.seen:
+                continue
+            self.seen[item.url] = ts
+            self.newest = max(self.newest, ts)
+            fresh.append(item)
+        self._prune()
+        return fresh
+
+    def _prune(self) -> None:
+        cutoff = self.newest - self.lookback
+        while self.seen and len(self.seen) > self.max_urls:
+            self.seen.popitem(last=False)
+        for url in [u for u, ts in self.seen.items() if ts < cutoff]:
+            del self.seen[url]
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps({
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "newest": self.newest,
+                "seen": list(self.seen.items()),
+                "saved_at": time.time(),
+            }))
+        os.replace(tmp, self.path)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import fields as dataclass_fields
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import inspect
+import os
+import time
+
+import numpy as np
+from loguru import logger
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils import profiling
+from services.pathway_services.utils.metrics import DAG_BATCH_SECONDS, DAG_CRITICAL_PATH, STAGE_SECONDS, stage_name
+
+ITEM_FIELDS = frozenset(f.name for f in dataclass_fields(NewsItem))
+EXECUTORS = ("inline", "thread", "process")
+
+class _Stage:
+    """A transform plus what the DAG needs to know about it."""
+
+    def __init__(self, transform: Any) -> None:
+        # Timing wrappers (anything with ``inner``) are unwrapped: the DAG times stages itself.
+        self.fn = getattr(transform, "inner", transform)
+        self.name = stage_name(transform)
+        reads = getattr(self.fn, "reads", None)
+        writes = getattr(self.fn, "writes", None)
+        if reads is None or writes is None:
+            raise ValueError(f"Stage {self.name} must declare `reads` and `writes`")
+        unknown = (set(reads) | set(writes)) - ITEM_FIELDS
+        if unknown:
+            raise ValueError(f"Stage {self.name} declares unknown NewsItem fields {sorted(unknown)}")
+        self.reads: Tuple[str, ...] = tuple(reads)
+        self.writes: Tuple[str, ...] = tuple(writes)
+        self.stateful = bool(getattr(self.fn, "stateful", False))
+        self.lock = asyncio.Lock()  # concurrent batches (bulk and priority lanes) take stateful stages in turn
+        self.is_async = inspect.iscoroutinefunction(self.fn) or inspect.iscoroutinefunction(
+            getattr(type(self.fn), "__call__", None))
+        self.deps: List["_Stage"] = []
+        self.hist = STAGE_SECONDS.labels(stage=self.name)
+
+def plan(stages: Sequence[_Stage]) -> List[List[_Stage]]:
+    """
+    Derive dependencies (a stage depends on whichever stage writes a field it reads),
+    reject fields written by two stages and cycles, and group the stages into levels
+    that can run concurrently. Stages keep their list order within a level.
+    """
+    writer: Dict[str, _Stage] = {}
+    for stage in stages:
+        for f in stage.writes:
+            other = writer.get(f)
+            if other is not None:
+                raise ValueError(f"Field {f!r} is written by both {other.name} and {stage.name}")
+            writer[f] = stage
+    for stage in stages:
+        stage.deps = []
+        for f in stage.reads:
+            dep = writer.get(f)
+            if dep is not None and dep is not stage and dep not in stage.deps:
+                stage.deps.append(dep)
+
+    levels: List[List[_Stage]] = []
+    placed: Dict[int, int] = {}
+    remaining = list(stages)
+    while remaining:
+        ready = [s for s in remaining if all(id(d) in placed for d in s.deps)]
+        if not ready:
+            raise ValueError(f"Transform graph has a cycle through {[s.name for s in remaining]}")
+        for s in ready:
+            placed[id(s)] = len(levels)
+        levels.append(ready)
+        remaining = [s for s in remaining if id(s) not in placed]
+    return levels
+
+def _fresh_item(values: Dict[str, Any]) -> NewsItem:
+    item = NewsItem(id="", source="", title="", url="", published_at="", summary=None, content=None,
+                    categories=[], sentiment="neutral", sentiment_confidence=0.5, relevance=0,
+                    market_impact="low", entities={}, numbers={})
+    for f, v in values.items():
+        setattr(item, f, v)
+    return item
+
+def _run_chunk(fn: Any, items: List[NewsItem]) -> List[float]:
+    # Batch-capable stage: one call for the chunk, its cost spread evenly over the items.
+    t0 = time.perf_counter()
+    fn.transform_batch(items)
+    return [(time.perf_counter() - t0) / len(items)] * len(items) if items else []
+
+def _run_local(fn: Any, writes: Tuple[str, ...], items: List[NewsItem]) -> List[float]:
+    """Apply a stage in place (inline or in a pool thread); returns per-item seconds."""
+    if hasattr(fn, "transform_batch"):
+        return _run_chunk(fn, items)
+    durations = []
+    for item in items:
+        t0 = time.perf_counter()
+        out = fn(item)
+        durations.append(time.perf_counter() - t0)
+        if out is not item:
+            for f in writes:
+                setattr(item, f, getattr(out, f))
+    return durations
+
+def run_rows(fn: Any, reads: Tuple[str, ...], writes: Tuple[str, ...],
+             rows: List[tuple]) -> Tuple[List[tuple], List[float]]:
+    """
+    Rebuild items from the read fields and return only the written ones; the
+    process-pool side of a stage, and the body of its Pathway UDF (pathway_main.py).
+    """
+    if hasattr(fn, "transform_batch"):
+        items = [_fresh_item(dict(zip(reads, row))) for row in rows]
+        durations = _run_chunk(fn, items)
+        return [tuple(getattr(item, f) for f in writes) for item in items], durations
+    out, durations = [], []
+    for row in rows:
+        item = _fresh_item(dict(zip(reads, row)))
+        t0 = time.perf_counter()
+        item = fn(item)
+        durations.append(time.perf_counter() - t0)
+        out.append(tuple(getattr(item, f) for f in writes))
+    return out, durations
+
+class TransformDAG:
+    """
+    Runs transforms as a dependency graph instead of a fixed list. Each transform
+    declares the NewsItem fields it ``reads`` and ``writes``; the graph is validated
+    at construction and split into levels. ``run_batch`` runs every stage of a level
+    concurrently over the whole batch (through a stage's ``transform_batch`` when it
+    has one): synchronous stages inline or chunked across a thread/process pool
+    (processes receive only the read fields and send back only the written ones),
+    coroutine stages as one task per item, and ``stateful`` stages in order in the
+    driver process. Per-item critical-path latency (the slowest chain
+    of dependent stages) is exported as ``worker_dag_critical_path_seconds``.
+
+    The DAG is also a plain Transform: calling it on one item runs the stages in
+    topological order, which is how per-message inputs use it.
+    """
+
+    def __init__(self, transforms: Sequence[Any], executor: str = "inline", workers: Optional[int] = None,
+                 chunk_size: int = 64, name: str = "enrich") -> None:
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+        self.stages = [_Stage(t) for t in transforms]
+        self.levels = plan(self.stages)
+        self.order = [s for level in self.levels for s in level]
+        self.chunk_size = chunk_size
+        self.name = name
+        workers = workers or os.cpu_count() or 1
+        if executor == "process" and workers < 2:
+            logger.warning("DAG_EXECUTOR=process with one worker; running DAG stages inline instead")
+            executor = "inline"
+        self.executor = executor
+        self._pool: Optional[Executor] = None
+        if executor == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dag")
+        elif executor == "process":
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._critical = DAG_CRITICAL_PATH.labels(dag=name)
+        self._batch = DAG_BATCH_SECONDS.labels(dag=name)
+        logger.info("🧩 Transform DAG ({}): {}", executor, self.describe())
+
+    def describe(self) -> str:
+        return " -> ".join("[" + ", ".join(s.name for s in level) + "]" for level in self.levels)
+
+    def __call__(self, item: NewsItem) -> NewsItem:
+        finished: Dict[int, float] = {}
+        for stage in self.order:
+            if stage.is_async:
+                raise TypeError(f"Stage {stage.name} is a coroutine; use run_batch")
+            wall = _run_local(stage.fn, stage.writes, [item])[0]
+            stage.hist.observe(wall)
+            item.trace[stage.name] = time.time()
+            finished[id(stage)] = wall + max((finished[id(d)] for d in stage.deps), default=0.0)
+        self._critical.observe(max(finished.values(), default=0.0))
+        return item
+
+    async def run_batch(self, items: List[NewsItem]) -> List[NewsItem]:
+        if not items:
+            return items
+        t0 = time.perf_counter()
+        finished: Dict[int, np.ndarray] = {}
+        rec = profiling.recorder
+        for level in self.levels:
+            results = await asyncio.gather(*(self._run(stage, items) for stage in level))
+            now = time.time()
+            for stage, durations in zip(level, results):
+                for d in durations:
+                    stage.hist.observe(d)
+                if rec is not None:
+                    rec.add(stage.name, sum(durations))
+                for item in items:
+                    item.trace[stage.name] = now
+                own = np.asarray(durations)
+                if stage.deps:
+                    own = own + np.max([finished[id(d)] for d in stage.deps], axis=0)
+                finished[id(stage)] = own
+        critical = np.max(np.stack(list(finished.values())), axis=0)
+        for value in critical.tolist():
+            self._critical.observe(value)
+        self._batch.observe(time.perf_counter() - t0)
+        return items
+
+    async def _run(self, stage: _Stage, items: List[NewsItem]) -> List[float]:
+        if stage.is_async:
+            async def one(item: NewsItem) -> float:
+                t0 = time.perf_counter()
+                out = await stage.fn(item)
+                if out is not item:
+                    for f in stage.writes:
+                        setattr(item, f, getattr(out, f))
+                return time.perf_counter() - t0
+            return list(await asyncio.gather(*(one(item) for item in items)))
+
+        if self._pool is None:
+            return _run_local(stage.fn, stage.writes, items)
+        loop = asyncio.get_running_loop()
+        if stage.stateful:
+            # Cross-item state: one ordered pass in this process, off the event loop.
+            pool = self._pool if self.executor == "thread" else None
+            async with stage.lock:
+                return await loop.run_in_executor(pool, _run_local, stage.fn, stage.writes, items)
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        if self.executor == "thread":
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(self._pool, _run_local, stage.fn, stage.writes, chunk) for chunk in chunks
+            ))
+            return [d for part in parts for d in part]
+
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, run_rows, stage.fn, stage.reads, stage.writes,
+                                 [tuple(getattr(item, f) for f in stage.reads) for item in chunk])
+            for chunk in chunks
+        ))
+        durations: List[float] = []
+        for chunk, (values, part) in zip(chunks, parts):
+            for item, row in zip(chunk, values):
+                for f, v in zip(stage.writes, row):
+                    setattr(item, f, v)
+            durations += part
+        return durations
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+async def apply_batch(transforms: Sequence[Any], items: List[NewsItem]) -> List[NewsItem]:
+    """Run a batch through ``transforms``, using ``run_batch`` where a transform has one."""
+    for t in transforms:
+        run_batch = getattr(t, "run_batch", None)
+        if run_batch is not None:
+            items = await run_batch(items)
+        else:
+            items = [t(item) for item in items]
+    return items
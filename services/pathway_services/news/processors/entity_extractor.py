@@ -1,31 +1,95 @@
 from __future__ import annotations
 import re
-from typing import List
+from typing import Dict, List, Optional
 from services.pathway_services.schema import NewsItem
-from services.pathway_services.utils.keywords import COMPANIES_IN, INDICES_IN, REGULATORS_IN
+from services.pathway_services.utils.dictionaries import DictionaryStore
 
-PERCENT_RE = re.compile(r"\b-?\d+(?:\.\d+)?\s?%")
-AMOUNT_RE = re.compile(r"\b₹?\$?\s?\d{1,3}(?:,\d{3})*(?:\.\d+)?\b")
-POINTS_RE = re.compile(r"\b\d+(?:\.\d+)?\s?(?:pts?|points?)\b", re.IGNORECASE)
+_UNITS = r"crores?|cr|lakhs?|lacs?|trillion|tn|billion|bn|million|mn|thousand"
+
+# One pass over the lowercased text. Every match starts with a digit (or "-"), which
+# lets the regex engine skip ahead with its first-character scan; the suffix says
+# what the number is, and a currency written in front of it is read back from the
+# preceding characters. Digit grouping may be Western (1,234,567) or Indian (12,34,567).
+NUMBER_RE = re.compile(rf"""
+    (?P<num>-?\d+(?:,\d+)*(?:\.\d+)?)
+    (?:\s?(?:
+        (?P<pct>%|per\s?cent\b)
+      | (?P<bps>bps\b|basis\s+points?\b)
+      | (?P<pts>pts?\b|points?\b)
+      | (?P<unit>{_UNITS})\b
+    ))?
+""", re.VERBOSE)
+
+# Symbols may touch the previous word; word prefixes (rs, inr, usd) may not.
+CURRENCY_SYMBOLS = (("us$", "USD"), ("$", "USD"), ("₹", "INR"))
+CURRENCY_WORDS = (("rs.", "INR"), ("rs", "INR"), ("inr", "INR"), ("usd", "USD"))
+INDIAN_UNITS = {"crore", "crores", "cr", "lakh", "lakhs", "lac", "lacs"}
+UNIT_SCALE = {
+    "crore": 1e7, "crores": 1e7, "cr": 1e7, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5,
+    "trillion": 1e12, "tn": 1e12, "billion": 1e9, "bn": 1e9, "million": 1e6, "mn": 1e6, "thousand": 1e3,
+}
+
+def _currency(text: str, start: int) -> Optional[str]:
+    head = text[max(0, start - 5):start]
+    if head.endswith(" "):
+        head = head[:-1]
+    for prefix, code in CURRENCY_SYMBOLS:
+        if head.endswith(prefix):
+            return code
+    for prefix, code in CURRENCY_WORDS:
+        if head.endswith(prefix) and not head[:-len(prefix)][-1:].isalnum():
+            return code
+    return None
+
+def extract_numbers(text: str) -> Dict[str, list]:
+    """
+    Typed numbers from lowercased text: ``percentages``, ``points`` and ``bps`` as
+    floats; ``amounts`` in absolute currency units (crore/lakh/million... applied)
+    with the ISO code, or None, at the same index in ``currencies``. Only numbers
+    carrying a currency or a magnitude unit count as amounts.
+    """
+    percentages: List[float] = []
+    points: List[float] = []
+    bps: List[float] = []
+    amounts: List[float] = []
+    currencies: List[Optional[str]] = []
+    for m in NUMBER_RE.finditer(text):
+        number, start = m.group("num"), m.start()
+        if number[0] == "-" and start and text[start - 1].isalnum():
+            number, start = number[1:], start + 1  # a hyphen ("2023-24"), not a sign
+        elif start and (text[start - 1].isalnum() or text[start - 1] == "."):
+            continue  # part of a token such as "q3" or "v2.5"
+        kind = m.lastgroup
+        if kind == "pct":
+            percentages.append(float(number.replace(",", "")))
+            continue
+        value = float(number.lstrip("-").replace(",", ""))
+        if kind == "pts":
+            points.append(value)
+        elif kind == "bps":
+            bps.append(value)
+        else:
+            unit = m.group("unit")
+            code = _currency(text, start)
+            if code is not None:
+                amounts.append(value * UNIT_SCALE.get(unit, 1.0))
+                currencies.append(code)
+            elif unit is not None:
+                amounts.append(value * UNIT_SCALE[unit])
+                currencies.append("INR" if unit in INDIAN_UNITS else None)
+    return {"percentages": percentages, "amounts": amounts, "currencies": currencies, "points": points, "bps": bps}
 
 class EntityExtractor:
+    reads = ("title", "summary", "content")
+    writes = ("entities", "numbers", "dict_version")
+
+    def __init__(self, dictionaries: Optional[DictionaryStore] = None) -> None:
+        self.dictionaries = dictionaries or DictionaryStore()
+
     def __call__(self, item: NewsItem) -> NewsItem:
+        dicts = self.dictionaries.current
         text = " ".join(filter(None, [item.title, item.summary or "", item.content or ""])).lower()
-        companies = [c for c in COMPANIES_IN if c.lower() in text]
-        indices = [i for i in INDICES_IN if i.lower() in text]
-        regulators = [r for r in REGULATORS_IN if r.lower() in text]
-        percentages = PERCENT_RE.findall(text)
-        amounts = AMOUNT_RE.findall(text)
-        points = POINTS_RE.findall(text)
-
-        item.entities = {
-            "companies": sorted(set(companies)),
-            "indices": sorted(set(indices)),
-            "regulators": sorted(set(regulators)),
-        }
-        item.numbers = {
-            "percentages": percentages,
-            "amounts": amounts,
-            "points": points,
-        }
+        item.entities = dicts.entities.match(text)
+        item.numbers = extract_numbers(text)
+        item.dict_version = dicts.version
         return item
@@ -1,9 +1,12 @@
 from __future__ import annotations
+
 from services.pathway_services.schema import NewsItem
 
 class MarketImpactAssessor:
+    reads = ("relevance", "entities")
+    writes = ("market_impact",)
+
     def __call__(self, item: NewsItem) -> NewsItem:
-        s = item.sentiment
         r = item.relevance
         has_index = len(item.entities.get("indices", [])) > 0
         if r >= 70 or (has_index and r >= 50):
@@ -14,3 +17,4 @@ class MarketImpactAssessor:
             impact = "low"
         item.market_impact = impact
         return item
+
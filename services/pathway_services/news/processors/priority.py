@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Optional, Sequence
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.dictionaries import ENTITY_KINDS, DictionaryStore
+
+class PriorityClassifier:
+    """
+    Pre-enrichment check for the priority lane: does the title name a regulator or an
+    index? Runs on the raw item, before any transform, with the same whole-token
+    matcher EntityExtractor uses, over the title only (a few microseconds).
+    """
+
+    def __init__(self, dictionaries: Optional[DictionaryStore] = None,
+                 kinds: Sequence[str] = ("regulators", "indices")) -> None:
+        unknown = set(kinds) - set(ENTITY_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown entity kinds {sorted(unknown)}; expected some of {ENTITY_KINDS}")
+        self.dictionaries = dictionaries or DictionaryStore()
+        self.kinds = tuple(kinds)
+
+    def __call__(self, item: NewsItem) -> bool:
+        if not item.title:
+            return False
+        found = self.dictionaries.current.entities.match(item.title.lower())
+        return any(found[kind] for kind in self.kinds)
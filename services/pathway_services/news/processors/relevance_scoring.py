@@ -1,14 +1,34 @@
 from __future__ import annotations
+from typing import Dict, List, Optional
+
 from services.pathway_services.schema import NewsItem
-from services.pathway_services.utils.keywords import FIN_KEYWORDS_WEIGHTED
+from services.pathway_services.utils.dictionaries import DictionaryStore
 
 class RelevanceScorer:
-    def __call__(self, item: NewsItem) -> NewsItem:
-        text = " ".join(filter(None, [item.title, item.summary or "", item.content or ""])).lower()
+    reads = ("title", "summary", "content")
+    writes = ("relevance",)
+
+    def __init__(self, dictionaries: Optional[DictionaryStore] = None) -> None:
+        self.dictionaries = dictionaries or DictionaryStore()
+
+    def score(self, text: str, weights: Optional[Dict[str, int]] = None) -> int:
+        """Relevance of lowercased ``text``: matched keyword weights, clipped to 0..100."""
+        if weights is None:
+            weights = self.dictionaries.current.fin_keywords_weighted
         score = 0
-        for kw, weight in FIN_KEYWORDS_WEIGHTED.items():
+        for kw, weight in weights.items():
             if kw in text:
                 score += weight
-        score = max(0, min(100, score))
-        item.relevance = score
+        return max(0, min(100, score))
+
+    def __call__(self, item: NewsItem) -> NewsItem:
+        text = " ".join(filter(None, [item.title, item.summary or "", item.content or ""])).lower()
+        item.relevance = self.score(text)
         return item
+
+    def transform_batch(self, items: List[NewsItem]) -> None:
+        """Score a DAG chunk against one dictionary version, taken once for the chunk."""
+        weights = self.dictionaries.current.fin_keywords_weighted
+        for item in items:
+            text = " ".join(filter(None, [item.title, item.summary or "", item.content or ""])).lower()
+            item.relevance = self.score(text, weights)
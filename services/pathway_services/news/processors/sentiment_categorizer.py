@@ -1,13 +1,19 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Optional
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from services.pathway_services.schema import NewsItem
-from services.pathway_services.utils.keywords import CATEGORY_KEYWORDS
+from services.pathway_services.utils.dictionaries import DictionaryStore
 
 _analyzer = SentimentIntensityAnalyzer()
 
 class SentimentCategorizer:
+    reads = ("title", "summary", "content", "categories")
+    writes = ("sentiment", "sentiment_confidence", "categories")
+
+    def __init__(self, dictionaries: Optional[DictionaryStore] = None) -> None:
+        self.dictionaries = dictionaries or DictionaryStore()
+
     def __call__(self, item: NewsItem) -> NewsItem:
         text = " ".join(filter(None, [item.title, item.summary or "", item.content or ""]))[:5000]
         scores = _analyzer.polarity_scores(text or "")
@@ -24,7 +30,7 @@ class SentimentCategorizer:
         # Categorization via keyword sets (global + Indian context)
         cats: List[str] = []
         lower = text.lower()
-        for cat, kws in CATEGORY_KEYWORDS.items():
+        for cat, kws in self.dictionaries.current.category_keywords.items():
             if any(k in lower for k in kws):
                 cats.append(cat)
         item.categories = sorted(set(cats)) or item.categories
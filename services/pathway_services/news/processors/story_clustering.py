@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.news.analytics.stories import StoryIndex, story_id_for
+from services.pathway_services.news.analytics.vectors import HashedTfidf
+from services.pathway_services.utils.timeutil import to_epoch
+
+class StoryClusterer:
+    # Keeps a cross-item story index, so it must see items in order in one process.
+    stateful = True
+    reads = ("id", "title", "summary", "published_at")
+    writes = ("story_id",)
+
+    def __init__(self, index: Optional[StoryIndex] = None, vectorizer: Optional[HashedTfidf] = None) -> None:
+        self.index = index or StoryIndex()
+        self.vectorizer = vectorizer or HashedTfidf()
+
+    def __call__(self, item: NewsItem) -> NewsItem:
+        text = " ".join(filter(None, [item.title, item.summary or ""]))
+        vec = self.vectorizer.transform(text)
+        if vec:
+            item.story_id = self.index.assign(vec, to_epoch(item.published_at), story_id_for(item.id))
+        return item
+
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        index, index_meta = self.index.snapshot()
+        tfidf, tfidf_meta = self.vectorizer.snapshot()
+        arrays = {**{"index." + k: v for k, v in index.items()}, **{"tfidf." + k: v for k, v in tfidf.items()}}
+        return arrays, {"index": index_meta, "tfidf": tfidf_meta}
+
+    def restore(self, arrays: Mapping[str, np.ndarray], meta: dict) -> None:
+        # Document frequencies first: if they do not fit, the index stays empty too.
+        self.vectorizer.restore({k[6:]: v for k, v in arrays.items() if k.startswith("tfidf.")}, meta["tfidf"])
+        self.index.restore({k[6:]: v for k, v in arrays.items() if k.startswith("index.")}, meta["index"])
@@ -0,0 +1,188 @@
+"""
+Alternative worker entry point: the same enrichment pipeline as a Pathway dataflow.
+
+Kafka is read with ``pw.io.kafka.read``; every stage of ``main.build_transforms``
+becomes a batched UDF over the columns it declares (``reads``/``writes``), applied
+level by level in TransformDAG order; the enriched table is handed to the worker's
+own sinks (Postgres, Redis pub/sub and feeds, similar-news index) one Pathway commit
+at a time. Worker threads come from ``PATHWAY_THREADS``; with
+``PATHWAY_PERSISTENCE_DIR`` set, Pathway persists the input offsets and snapshot and
+replays it on restart, which also rebuilds the stateful stages:
+
+    PATHWAY_THREADS=4 PATHWAY_PERSISTENCE_DIR=data/pathway python -m services.pathway_services.pathway_main
+"""
+from __future__ import annotations
+from dataclasses import fields as dataclass_fields
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import os
+import threading
+
+import pathway as pw
+
+from services.pathway_services.connectors.batching import flush_sinks, lanes
+from services.pathway_services.connectors.kafka_input import to_news_item
+from services.pathway_services.news.processors.dag import TransformDAG, run_rows
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.config import settings
+from services.pathway_services.utils.logger import logger
+from services.pathway_services.utils.metrics import TimedSink, start_metrics_server
+
+FIELD_TYPES = {f.name: f.type for f in dataclass_fields(NewsItem)}
+# Pathway reserves ``id`` for row keys, so the item id lives in ``news_id``.
+COLUMNS = {"id": "news_id"}
+FIELDS = {column: field for field, column in COLUMNS.items()}
+# How a written field is read back out of a stage's Json result; other fields stay Json.
+JSON_ACCESSORS = {"str": "as_str", "Optional[str]": "as_str", "int": "as_int", "float": "as_float"}
+
+class RawNewsSchema(pw.Schema):
+    """Fields of a raw Kafka message; everything else is written by the stages."""
+    news_id: str
+    source: str = pw.column_definition(default_value="unknown")
+    title: str = pw.column_definition(default_value="")
+    url: str = pw.column_definition(default_value="")
+    published_at: str = pw.column_definition(default_value="")
+    summary: Optional[str] = pw.column_definition(default_value=None)
+    content: Optional[str] = pw.column_definition(default_value=None)
+    categories: Optional[pw.Json] = pw.column_definition(default_value=None)
+
+def _plain(value: Any, field: str = "") -> Any:
+    if isinstance(value, pw.Json):
+        value = value.value
+    # Messages without categories carry None; the stages expect a list.
+    return [] if value is None and field == "categories" else value
+
+class StageUDF(pw.UDF):
+    """
+    One TransformDAG stage as a batched UDF: called with up to ``max_batch_size`` rows
+    of the stage's read columns, it runs the transform over rebuilt items (through
+    ``transform_batch`` where the stage has one) and returns the written fields as
+    Json. Stateful stages are declared non-deterministic, so Pathway keeps their
+    results instead of recomputing them, and take a lock across worker threads.
+    """
+
+    def __init__(self, stage: Any, max_batch_size: int) -> None:
+        super().__init__(deterministic=not stage.stateful, max_batch_size=max_batch_size)
+        self.stage = stage
+        self._lock = threading.Lock() if stage.stateful else None
+
+    def __wrapped__(self, *columns: List[Any]) -> List[pw.Json]:
+        stage = self.stage
+        rows = [tuple(_plain(v, f) for f, v in zip(stage.reads, row)) for row in zip(*columns)]
+        if self._lock is not None:
+            with self._lock:
+                out, durations = run_rows(stage.fn, stage.reads, stage.writes, rows)
+        else:
+            out, durations = run_rows(stage.fn, stage.reads, stage.writes, rows)
+        for d in durations:
+            stage.hist.observe(d)
+        return [pw.Json(dict(zip(stage.writes, values))) for values in out]
+
+def _written(result: Any, field: str) -> Any:
+    value = result[field]
+    accessor = JSON_ACCESSORS.get(FIELD_TYPES[field])
+    return getattr(value, accessor)() if accessor else value
+
+def enrich(raw: pw.Table, transforms: Sequence[Any], max_batch_size: int = 256) -> pw.Table:
+    """Apply ``transforms`` to ``raw`` (a RawNewsSchema table) as batched UDFs, one select per DAG level."""
+    dag = TransformDAG(transforms, executor="inline", name="pathway")
+    table = raw
+    for level in dag.levels:
+        results = {f"_{stage.name}": StageUDF(stage, max_batch_size)(*(pw.this[COLUMNS.get(f, f)] for f in stage.reads))
+                   for stage in level}
+        table = table.with_columns(**results)
+        table = table.with_columns(**{
+            COLUMNS.get(f, f): _written(pw.this[f"_{stage.name}"], f) for stage in level for f in stage.writes
+        }).without(*results)
+    return table
+
+class SinkWriter:
+    """
+    ``pw.io.subscribe`` callbacks that pass each Pathway commit to the worker's sinks
+    as one batch. The sinks are coroutines, so they run on an event loop in a
+    background thread; a commit is not acknowledged until its batch has been
+    emitted, which is the backpressure on the dataflow.
+    """
+
+    def __init__(self, sinks: Sequence[Any]) -> None:
+        self._emit, _ = lanes([], sinks)
+        self._sinks = sinks
+        self._pending: List[NewsItem] = []
+        self._guard = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="sinks", daemon=True)
+        self._thread.start()
+
+    def on_change(self, key: Any, row: Dict[str, Any], time: int, is_addition: bool) -> None:
+        # Input rows are append-only and the UDF results are stable, so there is
+        # nothing to undo downstream for a retraction.
+        if not is_addition:
+            return
+        values = {FIELDS.get(c, c): _plain(v, FIELDS.get(c, c)) for c, v in row.items()}
+        item = to_news_item(values)
+        for f in FIELD_TYPES.keys() & values.keys():
+            setattr(item, f, values[f])
+        with self._guard:
+            self._pending.append(item)
+
+    def on_time_end(self, time: int) -> None:
+        with self._guard:
+            batch, self._pending = self._pending, []
+        if batch:
+            asyncio.run_coroutine_threadsafe(self._emit(batch), self.loop).result()
+
+    def on_end(self) -> None:
+        self.on_time_end(-1)
+        asyncio.run_coroutine_threadsafe(flush_sinks(self._sinks), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+    def subscribe(self, table: pw.Table) -> None:
+        pw.io.subscribe(table, on_change=self.on_change, on_time_end=self.on_time_end, on_end=self.on_end)
+
+def read_kafka() -> pw.Table:
+    return pw.io.kafka.read(
+        {
+            "bootstrap.servers": settings.KAFKA_BROKERS,
+            "group.id": settings.PATHWAY_KAFKA_GROUP,
+            "auto.offset.reset": "latest",
+            "session.timeout.ms": "6000",
+        },
+        topic=settings.KAFKA_TOPIC_NEWS,
+        format="json",
+        schema=RawNewsSchema,
+        json_field_paths={column: "/" + field for field, column in COLUMNS.items()},
+        autocommit_duration_ms=settings.PATHWAY_AUTOCOMMIT_MS,
+        name="news_raw",  # persistence identifies the source by name
+    )
+
+def persistence_config() -> Optional[pw.persistence.Config]:
+    if not settings.PATHWAY_PERSISTENCE_DIR:
+        return None
+    return pw.persistence.Config(
+        pw.persistence.Backend.filesystem(settings.PATHWAY_PERSISTENCE_DIR),
+        snapshot_interval_ms=settings.PATHWAY_SNAPSHOT_INTERVAL_MS,
+    )
+
+def main() -> None:
+    from services.pathway_services.main import build_dictionaries, build_sinks, build_transforms
+
+    if not settings.KAFKA_BROKERS:
+        raise SystemExit("pathway_main reads Kafka; set KAFKA_BROKERS (main.py covers the other inputs)")
+    logger.info("🚀 Starting HexaPulse FinPocket Pathway worker (env={}, threads={})",
+                settings.ENV, settings.PATHWAY_THREADS)
+    start_metrics_server(settings.WORKER_METRICS_PORT)
+    # Read by the engine when pw.run starts; `pathway spawn --threads N` sets it too.
+    os.environ.setdefault("PATHWAY_THREADS", str(settings.PATHWAY_THREADS))
+
+    dictionaries = build_dictionaries()
+    dictionaries.start()
+    enriched = enrich(read_kafka(), build_transforms(dictionaries), settings.PATHWAY_MAX_BATCH_SIZE)
+    SinkWriter([TimedSink(s) for s in build_sinks()]).subscribe(enriched)
+    try:
+        pw.run(monitoring_level=pw.MonitoringLevel.NONE, persistence_config=persistence_config())
+    finally:
+        dictionaries.stop()
+
+if __name__ == "__main__":
+    main()
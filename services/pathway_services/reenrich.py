@@ -0,0 +1,262 @@
+"""
+Re-run the current enrichment transforms over rows already stored in ``news``.
+
+Rows are read in id order with keyset pages (``WHERE id > $last ORDER BY id LIMIT n``),
+so each page is a short query, no transaction stays open for the whole run and the
+checkpoint is simply the last id written. Stateless transforms run in a process pool;
+only rows whose enrichment changed are written back, via COPY into a staging table and
+one UPDATE that touches just the changed columns, and their ids are published for the
+API hot windows (see ``backfill.notify_hot_windows``). Between pages the job backs off
+whenever its page reads get slower than ``--target-ms`` (a proxy for load on the
+database the API is using) and never exceeds ``--max-rows-per-s``.
+
+    python -m services.pathway_services.reenrich --checkpoint data/reenrich.json --workers 4
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import datetime as dt
+import json
+import math
+import os
+import time
+
+import asyncpg
+import orjson
+
+from services.pathway_services.backfill import Progress, apply_stateless, init_worker, notify_hot_windows
+from services.pathway_services.connectors.postgres_sink import NEWS_COLUMNS
+from services.pathway_services.database.postgres import init_json_codecs, migrate
+from services.pathway_services.database.redis import get_redis
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.config import settings
+from services.pathway_services.utils.logger import logger
+
+# Columns the enrichment transforms own; bit i of a row's mask marks ENRICHED_FIELDS[i] as changed.
+ENRICHED_FIELDS = (
+    "categories", "sentiment", "sentiment_confidence", "relevance", "market_impact", "entities", "numbers",
+)
+
+STAGE_TABLE = "news_reenrich"
+CREATE_STAGE_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} ON COMMIT DELETE ROWS AS
+  SELECT id, {', '.join(ENRICHED_FIELDS)}, 0 AS changed_mask FROM news WITH NO DATA
+"""
+UPDATE_SQL = (
+    "UPDATE news AS n SET "
+    + ", ".join(f"{f} = CASE WHEN s.changed_mask & {1 << i} <> 0 THEN s.{f} ELSE n.{f} END"
+                for i, f in enumerate(ENRICHED_FIELDS))
+    + f" FROM {STAGE_TABLE} AS s WHERE n.id = s.id"
+)
+PAGE_SQL = f"SELECT {', '.join(NEWS_COLUMNS)} FROM news WHERE id > $1 ORDER BY id LIMIT $2"
+PAGE_SINCE_SQL = (f"SELECT {', '.join(NEWS_COLUMNS)} FROM news WHERE id > $1 AND published_at >= $3"
+                  " ORDER BY id LIMIT $2")
+COUNT_SQL = "SELECT count(*) FROM news WHERE id > $1"
+
+def _same(a: Any, b: Any) -> bool:
+    # sentiment_confidence round-trips through a float column.
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=1e-6, abs_tol=1e-6)
+    return a == b
+
+def changed_mask(before: NewsItem, after: NewsItem) -> int:
+    mask = 0
+    for i, f in enumerate(ENRICHED_FIELDS):
+        if not _same(getattr(before, f), getattr(after, f)):
+            mask |= 1 << i
+    return mask
+
+def row_to_item(row: Dict[str, Any]) -> NewsItem:
+    published = row.get("published_at")
+    if isinstance(published, dt.datetime):
+        published = published.isoformat()
+    return NewsItem(**{**row, "published_at": published or "", "categories": list(row.get("categories") or []),
+                       "entities": row.get("entities") or {}, "numbers": row.get("numbers") or {}})
+
+class PostgresStore:
+    def __init__(self, dsn: str) -> None:
+        self.dsn = dsn
+        self._pool: Optional[asyncpg.Pool] = None
+
+    async def _pool_ready(self) -> asyncpg.Pool:
+        if not self._pool:
+            pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=2, init=init_json_codecs)
+            await migrate(pool)
+            self._pool = pool
+        return self._pool
+
+    async def count_after(self, last_id: str) -> int:
+        pool = await self._pool_ready()
+        return await pool.fetchval(COUNT_SQL, last_id)
+
+    async def page(self, last_id: str, limit: int, published_since: Optional[str] = None) -> List[Dict[str, Any]]:
+        pool = await self._pool_ready()
+        if published_since is None:
+            return [dict(r) for r in await pool.fetch(PAGE_SQL, last_id, limit)]
+        return [dict(r) for r in await pool.fetch(PAGE_SINCE_SQL, last_id, limit, published_since)]
+
+    async def apply(self, changes: List[Tuple[NewsItem, int]]) -> None:
+        pool = await self._pool_ready()
+        records = [(item.id, *(getattr(item, f) for f in ENRICHED_FIELDS), mask) for item, mask in changes]
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(CREATE_STAGE_SQL)
+                await conn.copy_records_to_table(STAGE_TABLE, records=records,
+                                                 columns=("id", *ENRICHED_FIELDS, "changed_mask"))
+                await conn.execute(UPDATE_SQL)
+
+    async def close(self) -> None:
+        if self._pool:
+            await self._pool.close()
+
+class MemoryStore:
+    """``news`` table stand-in for PIPELINE_BACKEND=memory, seeded with unenriched generator items."""
+
+    def __init__(self, items: List[NewsItem]) -> None:
+        self.rows = {item.id: {c: getattr(item, c) for c in NEWS_COLUMNS} for item in items}
+        self._ids = sorted(self.rows)
+
+    async def count_after(self, last_id: str) -> int:
+        return sum(1 for i in self._ids if i > last_id)
+
+    async def page(self, last_id: str, limit: int, published_since: Optional[str] = None) -> List[Dict[str, Any]]:
+        rows = (self.rows[i] for i in self._ids if i > last_id)
+        return [dict(r) for r in rows if published_since is None or r["published_at"] >= published_since][:limit]
+
+    async def apply(self, changes: List[Tuple[NewsItem, int]]) -> None:
+        for item, mask in changes:
+            row = self.rows[item.id]
+            for i, f in enumerate(ENRICHED_FIELDS):
+                if mask & (1 << i):
+                    row[f] = getattr(item, f)
+
+class Checkpoint:
+    """
+    Resume state persisted after every committed page: written to a temporary file,
+    fsynced, renamed over the previous one and the directory fsynced, so a crash leaves
+    either the old or the new checkpoint on disk, never an empty or torn one.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.state: Dict[str, Any] = {"last_id": "", "scanned": 0, "updated": 0}
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self.state.update(orjson.loads(f.read()))
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps({**self.state, "saved_at": time.time()}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+class Throttle:
+    """AIMD pause between pages driven by query latency, plus a hard rows/s ceiling."""
+
+    def __init__(self, target_s: float, max_rows_per_s: float, min_pause: float = 0.0, max_pause: float = 10.0) -> None:
+        self.target_s = target_s
+        self.max_rows_per_s = max_rows_per_s
+        self.min_pause = min_pause
+        self.max_pause = max_pause
+        self.pause = min_pause
+
+    def observe(self, latency_s: float) -> None:
+        if latency_s > self.target_s:
+            self.pause = min(self.max_pause, max(0.05, self.pause * 2))
+        else:
+            self.pause = max(self.min_pause, self.pause * 0.8 if self.pause > 0.01 else 0.0)
+
+    async def wait(self, rows: int, busy_s: float) -> None:
+        floor = rows / self.max_rows_per_s - busy_s if self.max_rows_per_s > 0 else 0.0
+        delay = max(self.pause, floor)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+async def run_reenrich(args: argparse.Namespace) -> dict:
+    from services.pathway_services.main import build_dictionaries
+
+    if settings.PIPELINE_BACKEND == "memory":
+        from services.pathway_services.benchmarks.generator import GeneratorConfig, NewsGenerator
+        store: Any = MemoryStore(NewsGenerator(GeneratorConfig(seed=settings.MEMORY_SEED)).items(settings.MEMORY_ITEMS))
+        redis = None
+    else:
+        store = PostgresStore(settings.POSTGRES_URL)
+        redis = await get_redis(settings.REDIS_URL)
+    checkpoint = Checkpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.state.update(last_id="", scanned=0, updated=0)
+    state = checkpoint.state
+    if state["last_id"]:
+        logger.info("↪️ Resuming re-enrichment after id {} ({} rows done)", state["last_id"], state["scanned"])
+
+    throttle = Throttle(args.target_ms / 1000.0, args.max_rows_per_s)
+    progress = Progress(await store.count_after(state["last_id"]), label="Re-enrichment")
+    loop = asyncio.get_running_loop()
+    pending: deque = deque()
+    cursor = state["last_id"]
+
+    async def drain_one() -> None:
+        future, before, last_id = pending.popleft()
+        after = await future
+        changes = [(a, m) for b, a in zip(before, after) if (m := changed_mask(b, a))]
+        if changes:
+            await store.apply(changes)
+            await notify_hot_windows(redis, [item for item, _ in changes])
+        state.update(last_id=last_id, scanned=state["scanned"] + len(before), updated=state["updated"] + len(changes))
+        checkpoint.save()
+        progress.advance(len(before))
+
+    dictionaries = build_dictionaries()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(dictionaries,)) as pool:
+        while True:
+            t0 = time.perf_counter()
+            rows = await store.page(cursor, args.page_size)
+            read_s = time.perf_counter() - t0
+            throttle.observe(read_s)
+            if not rows:
+                break
+            before = [row_to_item(r) for r in rows]
+            cursor = before[-1].id
+            # Results come back unpickled as new objects, so ``before`` keeps the stored values.
+            pending.append((loop.run_in_executor(pool, apply_stateless, before), before, cursor))
+            if len(pending) >= args.workers * 2:
+                await drain_one()
+            await throttle.wait(len(rows), read_s)
+        while pending:
+            await drain_one()
+    close = getattr(store, "close", None)
+    if close is not None:
+        await close()
+
+    elapsed = time.perf_counter() - progress.started
+    return {"scanned": progress.done, "updated": state["updated"], "last_id": state["last_id"],
+            "elapsed_s": round(elapsed, 2), "rows_per_s": round(progress.done / elapsed, 1) if elapsed else None}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkpoint", default="data/reenrich.checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--target-ms", type=float, default=50.0,
+                        help="Back off while page reads take longer than this")
+    parser.add_argument("--max-rows-per-s", type=float, default=5000.0, help="0 disables the ceiling")
+    args = parser.parse_args()
+
+    logger.info("🚀 Starting re-enrichment (backend={})", settings.PIPELINE_BACKEND)
+    print(json.dumps(asyncio.run(run_reenrich(args))))
+
+if __name__ == "__main__":
+    main()
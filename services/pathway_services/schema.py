@@ -1,5 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict
 
 @dataclass
@@ -17,4 +17,7 @@ class NewsItem:
     relevance: int
     market_impact: str
     entities: Dict[str, list]  # {"companies": [], "indices": [], "regulators": []}
-    numbers: Dict[str, list]   # {"percentages": [], "amounts": [], "points": []}
+    numbers: Dict[str, list]   # floats {"percentages", "amounts", "points", "bps"}; "currencies" per amount
+    story_id: Optional[str] = None
+    dict_version: Optional[str] = None  # keyword/entity dictionary version used, see utils/dictionaries.py
+    trace: Dict[str, float] = field(default_factory=dict)  # stage -> epoch seconds, see utils/tracing.py
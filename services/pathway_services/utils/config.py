@@ -15,9 +15,99 @@ class Settings(BaseModel):
 
     KAFKA_BROKERS: str = os.getenv("KAFKA_BROKERS", "")
     KAFKA_TOPIC_NEWS: str = os.getenv("KAFKA_TOPIC_NEWS", "hexapulse.news.raw")
+    KAFKA_GROUP: str = os.getenv("KAFKA_GROUP", "hexapulse-worker")
+
+    # "live" talks to Kafka/Postgres/Redis; "memory" runs main() against in-process stand-ins
+    # fed by the seeded benchmark generator.
+    PIPELINE_BACKEND: str = os.getenv("PIPELINE_BACKEND", "live")
+    MEMORY_PARTITIONS: int = int(os.getenv("MEMORY_PARTITIONS", "4"))
+    MEMORY_ITEMS: int = int(os.getenv("MEMORY_ITEMS", "10000"))
+    MEMORY_SEED: int = int(os.getenv("MEMORY_SEED", "42"))
+    MEMORY_FAIL_RATE: float = float(os.getenv("MEMORY_FAIL_RATE", "0"))
+
+    FETCH_SOURCES: str = os.getenv("FETCH_SOURCES", "bloomberg,cnbc")
+    FETCH_MAX_CONCURRENCY: int = int(os.getenv("FETCH_MAX_CONCURRENCY", "8"))
+    FETCH_OFF_HOURS_MULTIPLIER: float = float(os.getenv("FETCH_OFF_HOURS_MULTIPLIER", "4.0"))
+    FETCH_WEEKEND_MULTIPLIER: float = float(os.getenv("FETCH_WEEKEND_MULTIPLIER", "8.0"))
+    FETCH_STATE_DIR: str = os.getenv("FETCH_STATE_DIR", "data/fetch-state")
+    RSS_FEEDS: str = os.getenv("RSS_FEEDS", "")
+    RSS_INTERVAL_SECONDS: float = float(os.getenv("RSS_INTERVAL_SECONDS", "60"))
+
+    # Micro-batches are sized for this enqueue-to-sink p99; items whose title and summary
+    # alone score BATCH_URGENT_RELEVANCE take the priority lane (0 disables this check).
+    BATCH_TARGET_P99_SECONDS: float = float(os.getenv("BATCH_TARGET_P99_SECONDS", "0.5"))
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "1000"))
+    BATCH_URGENT_RELEVANCE: int = int(os.getenv("BATCH_URGENT_RELEVANCE", "70"))
+    # Titles naming an entity of these kinds take the priority lane (empty disables it).
+    PRIORITY_KINDS: str = os.getenv("PRIORITY_KINDS", "regulators,indices")
+
+    # JSON keyword/entity dictionaries, watched and hot-swapped; empty = the literals in utils/keywords.py.
+    DICTIONARY_PATH: str = os.getenv("DICTIONARY_PATH", "")
+    DICTIONARY_POLL_SECONDS: float = float(os.getenv("DICTIONARY_POLL_SECONDS", "5"))
+
+    # Transform DAG: "inline", "thread" or "process" (process needs 2+ workers, else it runs inline).
+    DAG_EXECUTOR: str = os.getenv("DAG_EXECUTOR", "inline")
+    DAG_WORKERS: int = int(os.getenv("DAG_WORKERS", "0"))  # 0 = os.cpu_count()
+    DAG_CHUNK_SIZE: int = int(os.getenv("DAG_CHUNK_SIZE", "64"))
 
     WS_REDIS_CHANNEL: str = os.getenv("WS_REDIS_CHANNEL", "hexapulse.news.stream")
+    BURST_REDIS_CHANNEL: str = os.getenv("BURST_REDIS_CHANNEL", "hexapulse.news.bursts")
+    FEED_REDIS_PREFIX: str = os.getenv("FEED_REDIS_PREFIX", "hexapulse.news.feed")
+
+    BURST_BUCKET_SECONDS: float = float(os.getenv("BURST_BUCKET_SECONDS", "300"))
+    BURST_ALPHA: float = float(os.getenv("BURST_ALPHA", "0.1"))
+    BURST_Z_THRESHOLD: float = float(os.getenv("BURST_Z_THRESHOLD", "4.0"))
+    BURST_P_THRESHOLD: float = float(os.getenv("BURST_P_THRESHOLD", "0.000001"))
+    BURST_MIN_COUNT: int = int(os.getenv("BURST_MIN_COUNT", "3"))
+
+    FEED_TOP_K: int = int(os.getenv("FEED_TOP_K", "100"))
+    FEED_HALF_LIFE_SECONDS: float = float(os.getenv("FEED_HALF_LIFE_SECONDS", "10800"))
+
+    STORY_SIMILARITY_THRESHOLD: float = float(os.getenv("STORY_SIMILARITY_THRESHOLD", "0.2"))
+    STORY_TTL_SECONDS: float = float(os.getenv("STORY_TTL_SECONDS", "21600"))
+
+    SIMILAR_INDEX_DIR: str = os.getenv("SIMILAR_INDEX_DIR", "data/similar_index")
+    SIMILAR_VECTOR_DIM: int = int(os.getenv("SIMILAR_VECTOR_DIM", "128"))
+    SIMILAR_SAVE_INTERVAL_SECONDS: float = float(os.getenv("SIMILAR_SAVE_INTERVAL_SECONDS", "60"))
+    SIMILAR_EF_SEARCH: int = int(os.getenv("SIMILAR_EF_SEARCH", "64"))
+
+    # pathway_main.py: Pathway dataflow entry point.
+    PATHWAY_THREADS: int = int(os.getenv("PATHWAY_THREADS", "1"))
+    PATHWAY_MAX_BATCH_SIZE: int = int(os.getenv("PATHWAY_MAX_BATCH_SIZE", "256"))
+    PATHWAY_AUTOCOMMIT_MS: int = int(os.getenv("PATHWAY_AUTOCOMMIT_MS", "100"))
+    PATHWAY_KAFKA_GROUP: str = os.getenv("PATHWAY_KAFKA_GROUP", "hexapulse-pathway")
+    PATHWAY_PERSISTENCE_DIR: str = os.getenv("PATHWAY_PERSISTENCE_DIR", "")  # empty: no persistence
+    PATHWAY_SNAPSHOT_INTERVAL_MS: int = int(os.getenv("PATHWAY_SNAPSHOT_INTERVAL_MS", "10000"))
+
+    # Stage state (story index, burst baselines, feeds) saved with the input offsets it matches.
+    SNAPSHOT_ENABLED: bool = os.getenv("SNAPSHOT_ENABLED", "false").lower() == "true"
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+    SNAPSHOT_INTERVAL_SECONDS: float = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "60"))
+
+    SPOOL_ENABLED: bool = os.getenv("SPOOL_ENABLED", "false").lower() == "true"
+    SPOOL_DIR: str = os.getenv("SPOOL_DIR", "data/spool")
+    SPOOL_TIMEOUT_SECONDS: float = float(os.getenv("SPOOL_TIMEOUT_SECONDS", "2.0"))
+    SPOOL_FSYNC_INTERVAL_SECONDS: float = float(os.getenv("SPOOL_FSYNC_INTERVAL_SECONDS", "0.1"))
+
+    ARCHIVE_ENABLED: bool = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "data/archive")
+    ARCHIVE_FLUSH_ROWS: int = int(os.getenv("ARCHIVE_FLUSH_ROWS", "50000"))
+    ARCHIVE_FLUSH_SECONDS: float = float(os.getenv("ARCHIVE_FLUSH_SECONDS", "600"))
 
     API_KEY: str = os.getenv("API_KEY", "")
 
+    WORKER_METRICS_PORT: int = int(os.getenv("WORKER_METRICS_PORT", "9100"))
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "/tmp/hexapulse-profiles")
+    PROFILE_SECONDS: float = float(os.getenv("PROFILE_SECONDS", "30"))
+    PROFILE_INTERVAL_SECONDS: float = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.01"))
+    PROFILE_TRACEMALLOC: bool = os.getenv("PROFILE_TRACEMALLOC", "false").lower() == "true"
+
+    HOT_STORE_ENABLED: bool = os.getenv("HOT_STORE_ENABLED", "true").lower() == "true"
+    HOT_STORE_WINDOW_SECONDS: float = float(os.getenv("HOT_STORE_WINDOW_SECONDS", "86400"))
+    HOT_STORE_CAPACITY: int = int(os.getenv("HOT_STORE_CAPACITY", "200000"))
+    # Backfill and re-enrichment publish the ids they rewrite here so hot windows reload them.
+    HOT_STORE_CHANGED_CHANNEL: str = os.getenv("HOT_STORE_CHANGED_CHANNEL", "hexapulse.news.changed")
+
 settings = Settings()
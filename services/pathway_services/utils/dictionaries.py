@@ -0,0 +1,225 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Set, Tuple
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import orjson
+from loguru import logger
+
+from services.pathway_services.utils import keywords
+from services.pathway_services.utils.metrics import DICT_LOADED_AT, DICT_RELOAD_SECONDS, DICT_RELOADS
+
+BUILTIN = "builtin"
+ENTITY_KINDS = ("companies", "indices", "regulators")
+
+# Words, numbers and "&" ("Larsen & Toubro"); other punctuation only separates tokens.
+# Aliases and texts are tokenised the same way, so n-grams compare as joined strings.
+TOKEN_RE = re.compile(r"\w+|&")
+
+def normalise(alias: str) -> str:
+    return " ".join(TOKEN_RE.findall(alias.lower()))
+
+def builtin_source() -> Dict[str, Any]:
+    """The literals in ``utils/keywords.py``, in the file format ``load_source`` reads."""
+    return {
+        "version": BUILTIN,
+        "category_keywords": keywords.CATEGORY_KEYWORDS,
+        "fin_keywords_weighted": keywords.FIN_KEYWORDS_WEIGHTED,
+        "companies": keywords.COMPANIES_IN,
+        "indices": keywords.INDICES_IN,
+        "regulators": keywords.REGULATORS_IN,
+    }
+
+def load_source(path: str) -> Dict[str, Any]:
+    """
+    Read a dictionary file. Sections missing from the file keep their built-in values;
+    entity sections are either a list of names or ``{"canonical name": ["alias", ...]}``.
+    Without a ``version`` key the version is a hash of the file's contents.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    source = builtin_source()
+    unknown = set(data) - set(source)
+    if unknown:
+        raise ValueError(f"{path}: unknown sections {sorted(unknown)}")
+    source.update(data)
+    source["version"] = str(data.get("version") or hashlib.sha1(raw).hexdigest()[:12])
+    return source
+
+class EntityMatcher:
+    """
+    Whole-token alias lookup: each text token that starts some alias is extended to
+    the alias lengths recorded for it and the joined n-gram looked up in a dict.
+    Compiling is one dict insert per alias (50k aliases in about 0.2 s), and matching
+    costs the same whatever the dictionary size.
+    """
+
+    def __init__(self, entities: Dict[str, Any]) -> None:
+        self._aliases: Dict[str, List[Tuple[str, str]]] = {}
+        starts: Dict[str, Set[int]] = {}
+        for kind in ENTITY_KINDS:
+            section = entities.get(kind) or []
+            pairs = section.items() if isinstance(section, dict) else ((name, []) for name in section)
+            for name, aliases in pairs:
+                for alias in {name, *aliases}:
+                    key = normalise(alias)
+                    if not key:
+                        continue
+                    self._aliases.setdefault(key, []).append((kind, name))
+                    tokens = key.split(" ")
+                    starts.setdefault(tokens[0], set()).add(len(tokens))
+        self._starts = {tok: sorted(lengths) for tok, lengths in starts.items()}
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Canonical names per kind found in lowercased ``text``, sorted."""
+        found: Dict[str, Set[str]] = {kind: set() for kind in ENTITY_KINDS}
+        tokens = TOKEN_RE.findall(text)
+        aliases, starts = self._aliases, self._starts
+        for i, tok in enumerate(tokens):
+            lengths = starts.get(tok)
+            if lengths is None:
+                continue
+            for n in lengths:
+                hits = aliases.get(tok if n == 1 else " ".join(tokens[i:i + n]))
+                if hits:
+                    for kind, name in hits:
+                        found[kind].add(name)
+        return {kind: sorted(names) for kind, names in found.items()}
+
+class CompiledDictionaries:
+    """
+    One immutable dictionary version with its matchers built. Stages take a reference
+    once per item or batch, so a reload never changes the dictionaries under an item
+    that is already being enriched.
+
+    Pickles as the exact source it was compiled from (serialised once, as JSON bytes)
+    and is rebuilt at most once per distinct source in the receiving process, so
+    process-pool workers score with the same version the driver recorded on the item
+    and never re-read the live file.
+    """
+
+    def __init__(self, source: Dict[str, Any], path: Optional[str] = None) -> None:
+        self.path = path
+        self.version: str = source["version"]
+        self.category_keywords: Dict[str, List[str]] = {
+            cat: [k.lower() for k in kws] for cat, kws in source["category_keywords"].items()
+        }
+        self.fin_keywords_weighted: Dict[str, int] = {
+            k.lower(): int(w) for k, w in source["fin_keywords_weighted"].items()
+        }
+        self.entities = EntityMatcher(source)
+        self.loaded_at = time.time()
+        self._payload = orjson.dumps(source)
+        self._digest = hashlib.sha1(self._payload).hexdigest()
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path, "digest": self._digest, "source": self._payload}
+
+    def __setstate__(self, state: dict) -> None:
+        compiled = _received.get(state["digest"])
+        if compiled is None:
+            compiled = CompiledDictionaries(orjson.loads(state["source"]), state["path"])
+            _received.clear()
+            _received[state["digest"]] = compiled
+        self.__dict__.update(compiled.__dict__)
+
+# Per-process cache of unpickled versions by source digest (holds the latest one).
+_received: Dict[str, CompiledDictionaries] = {}
+
+class DictionaryStore:
+    """
+    Holds the current ``CompiledDictionaries`` and, once started, watches ``path`` for
+    changes from a daemon thread: a new mtime/size is loaded and compiled off the
+    event loop, then published with a single reference assignment, so the stream
+    never pauses and in-flight items finish on the version they started with. A file
+    that fails to load or compile is logged and the current version kept.
+
+    Without ``path`` the store serves the built-in dictionaries and never reloads.
+    """
+
+    def __init__(self, path: Optional[str] = None, poll_interval: float = 5.0) -> None:
+        self.path = path or None
+        self.poll_interval = poll_interval
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.current = CompiledDictionaries(builtin_source())
+        if self.path is not None:
+            if not self.reload():
+                raise ValueError(f"Could not load dictionaries from {self.path}")
+
+    @property
+    def version(self) -> str:
+        return self.current.version
+
+    def reload(self) -> bool:
+        """Load and swap in ``path`` if it changed since the last load; True when swapped."""
+        if self.path is None:
+            return False
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return False
+        t0 = time.perf_counter()
+        try:
+            compiled = CompiledDictionaries(load_source(self.path), self.path)
+        except Exception as e:
+            # Remember the stamp so a broken file is reported once, not every poll.
+            self._stamp = stamp
+            DICT_RELOADS.labels(result="error").inc()
+            logger.error("❌ Dictionary reload from {} failed, keeping {}: {}", self.path, self.version, e)
+            return False
+        elapsed = time.perf_counter() - t0
+        previous, self.current, self._stamp = self.current.version, compiled, stamp
+        DICT_RELOAD_SECONDS.observe(elapsed)
+        DICT_RELOADS.labels(result="ok").inc()
+        DICT_LOADED_AT.set(compiled.loaded_at)
+        logger.info("📚 Dictionaries {} -> {} ({} entity aliases, {} weighted keywords) compiled in {:.1f} ms",
+                    previous, compiled.version, len(compiled.entities), len(compiled.fin_keywords_weighted),
+                    elapsed * 1e3)
+        return True
+
+    def start(self) -> None:
+        if self.path is None or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="dictionaries", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Dictionary watcher failed")
+
+    def __getstate__(self) -> dict:
+        # Process-pool workers get the current version only; they do not watch the file.
+        return {"path": self.path, "poll_interval": self.poll_interval, "current": self.current}
+
+    def __setstate__(self, state: dict) -> None:
+        self.path = state["path"]
+        self.poll_interval = state["poll_interval"]
+        self.current = state["current"]
+        self._stamp = None
+        self._stop = threading.Event()
+        self._thread = None
@@ -4,7 +4,9 @@ import sys
 from services.pathway_services.utils.config import settings
 
 logger.remove()
-logger.add(sys.stdout, colorize=True, backtrace=False, diagnose=False,
+# Modules that import loguru directly share the sink, so give "app" a default.
+logger.configure(extra={"app": settings.APP_NAME})
+logger.add(sys.stdout, colorize=True, backtrace=False, diagnose=False, level=settings.LOG_LEVEL.upper(),
            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
                   "<level>{level: <8}</level> | "
                   "✨ <cyan>{extra[app]}</cyan> | "
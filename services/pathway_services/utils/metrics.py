@@ -0,0 +1,205 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import time
+
+import asyncpg
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from prometheus_client.core import REGISTRY, CounterMetricFamily, HistogramMetricFamily
+from loguru import logger
+
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils import profiling
+from services.pathway_services.utils.timeutil import to_epoch
+from services.pathway_services.utils.tracing import INGEST
+
+# Sub-millisecond resolution for in-process stages, seconds for I/O.
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+IO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0, 3600.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Input lag parses published_at, so it is sampled rather than measured on every item.
+LAG_SAMPLE_EVERY = 16
+
+class FastHistogram:
+    """
+    Lock-free histogram for the hot loop: one C-level bisect and two increments per
+    observation. Buckets are made cumulative only when Prometheus scrapes.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class FastCounter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+class _Family:
+    def __init__(self, name: str, doc: str, labels: Sequence[str], bounds: Optional[Sequence[float]] = None) -> None:
+        self.name = name
+        self.doc = doc
+        self.label_names = list(labels)
+        self.bounds = bounds
+        self.children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, **labels: str) -> Any:
+        key = tuple(str(labels[n]) for n in self.label_names)
+        child = self.children.get(key)
+        if child is None:
+            child = self.children[key] = FastHistogram(self.bounds) if self.bounds else FastCounter()
+        return child
+
+class _FastCollector:
+    def __init__(self) -> None:
+        self.families: List[_Family] = []
+
+    def collect(self) -> Iterator[Any]:
+        for fam in self.families:
+            if fam.bounds:
+                metric = HistogramMetricFamily(fam.name, fam.doc, labels=fam.label_names)
+                for key, h in list(fam.children.items()):
+                    counts = list(h.counts)
+                    cumulative, buckets = 0, []
+                    for bound, c in zip(list(h.bounds) + [float("inf")], counts):
+                        cumulative += c
+                        buckets.append((str(bound) if bound != float("inf") else "+Inf", cumulative))
+                    metric.add_metric(list(key), buckets, h.sum)
+            else:
+                metric = CounterMetricFamily(fam.name, fam.doc, labels=fam.label_names)
+                for key, c in list(fam.children.items()):
+                    metric.add_metric(list(key), c.value)
+            yield metric
+
+_collector = _FastCollector()
+REGISTRY.register(_collector)
+
+def fast_histogram(name: str, doc: str, labels: Sequence[str], buckets: Sequence[float]) -> _Family:
+    fam = _Family(name, doc, labels, buckets)
+    _collector.families.append(fam)
+    return fam
+
+def fast_counter(name: str, doc: str, labels: Sequence[str]) -> _Family:
+    fam = _Family(name, doc, labels)
+    _collector.families.append(fam)
+    return fam
+
+STAGE_SECONDS = fast_histogram("worker_stage_seconds", "Transform latency (sampled)", ["stage"], STAGE_BUCKETS)
+SINK_SECONDS = fast_histogram("worker_sink_seconds", "Sink emit latency", ["sink"], IO_BUCKETS)
+SINK_ERRORS = fast_counter("worker_sink_errors_total", "Sink emits that raised", ["sink"])
+ITEMS_IN = fast_counter("worker_items_total", "Items read from an input", ["input"])
+INPUT_LAG = fast_histogram("worker_input_lag_seconds", "Ingest time minus published_at (sampled)", ["input"],
+                           LAG_BUCKETS)
+BATCH_SIZE = fast_histogram("worker_batch_size", "Items per input batch", ["input"], SIZE_BUCKETS)
+FRESHNESS = fast_histogram("worker_freshness_seconds", "Item age at pipeline checkpoints", ["segment"],
+                           LAG_BUCKETS)
+PUBLISH_LATENCY = fast_histogram("worker_publish_latency_seconds", "Ingest to WebSocket publish, per lane", ["lane"],
+                                 IO_BUCKETS)
+DAG_CRITICAL_PATH = fast_histogram("worker_dag_critical_path_seconds",
+                                   "Per-item longest dependent chain of stage latencies", ["dag"], STAGE_BUCKETS)
+DAG_BATCH_SECONDS = fast_histogram("worker_dag_batch_seconds", "Wall time to run one batch through the DAG",
+                                   ["dag"], IO_BUCKETS)
+
+FETCH_SECONDS = Histogram("worker_fetch_seconds", "Source fetch latency", ["source"], buckets=IO_BUCKETS)
+FETCH_ERRORS = Counter("worker_fetch_errors_total", "Fetches that failed or timed out", ["source"])
+FETCH_INTERVAL = Gauge("worker_fetch_interval_seconds", "Current adaptive poll interval", ["source"])
+SINK_RETRIES = Counter("worker_sink_retries_total", "Sink retry attempts", ["sink"])
+KAFKA_LAG = Gauge("worker_kafka_consumer_lag", "High watermark minus consumed offset", ["topic", "partition"])
+QUEUE_DEPTH = Gauge("worker_queue_depth", "Items waiting in an in-process queue", ["queue"])
+PG_POOL_SIZE = Gauge("worker_pg_pool_size", "asyncpg pool connections", ["pool"])
+PG_POOL_IDLE = Gauge("worker_pg_pool_idle", "asyncpg idle pool connections", ["pool"])
+SPOOL_DEPTH = Gauge("worker_spool_items", "Items waiting in a sink's disk spool", ["sink"])
+SPOOL_BYTES = Gauge("worker_spool_bytes", "Bytes waiting in a sink's disk spool", ["sink"])
+SINK_HEALTHY = Gauge("worker_sink_healthy", "1 while a spooled sink writes straight through", ["sink"])
+DEAD_LETTERS = Counter("worker_dead_letters_total", "Items written to a dead-letter file", ["sink"])
+BATCH_TARGET_SIZE = Gauge("worker_batch_target_size", "Batch size the micro-batch controller is aiming for",
+                          ["input"])
+BATCH_MAX_WAIT = Gauge("worker_batch_max_wait_seconds", "Longest the controller lets the oldest item wait",
+                       ["input"])
+BATCH_ARRIVAL_RATE = Gauge("worker_batch_arrival_rate", "Decayed items/s arriving at the batcher", ["input"])
+BATCH_COST = Gauge("worker_batch_cost_seconds", "Fitted batch cost model: fixed + per_item * size",
+                   ["input", "term"])
+BATCH_LATENCY_P99 = Gauge("worker_batch_latency_p99_seconds", "Enqueue-to-sink p99 over recent items", ["input"])
+BATCH_HEADROOM = Gauge("worker_batch_headroom", "Multiple of the arrival rate the controller sizes batches for",
+                       ["input"])
+BATCH_BYPASSED = Counter("worker_batch_bypassed_total", "Urgent items dispatched without waiting", ["input"])
+DICT_RELOAD_SECONDS = Histogram("worker_dictionary_reload_seconds", "Time to load and compile a dictionary version",
+                                buckets=IO_BUCKETS)
+DICT_RELOADS = Counter("worker_dictionary_reloads_total", "Dictionary reload attempts", ["result"])
+DICT_LOADED_AT = Gauge("worker_dictionary_loaded_timestamp_seconds", "When the current dictionaries were swapped in")
+SNAPSHOT_SECONDS = Histogram("worker_snapshot_seconds", "State snapshot phases (pause = pipeline stalled, write, restore)",
+                             ["phase"], buckets=IO_BUCKETS)
+SNAPSHOT_BYTES = Gauge("worker_snapshot_bytes", "Array bytes in the latest state snapshot")
+SNAPSHOT_SAVED_AT = Gauge("worker_snapshot_saved_timestamp_seconds", "When the latest state snapshot was taken")
+
+def start_metrics_server(port: int) -> None:
+    if port > 0:
+        start_http_server(port)
+        logger.info("📈 Metrics server listening on :{}", port)
+
+class IngestObserver:
+    """Stamps ingest time on each item, counts items per input and samples published_at lag."""
+
+    def __init__(self, input_name: str) -> None:
+        self._items = ITEMS_IN.labels(input=input_name)
+        self._lag = INPUT_LAG.labels(input=input_name)
+
+    def __call__(self, item: NewsItem) -> None:
+        now = time.time()
+        item.trace[INGEST] = now
+        self._items.value += 1
+        if self._items.value % LAG_SAMPLE_EVERY == 1:
+            self._lag.observe(max(0.0, now - to_epoch(item.published_at)))
+
+def track_pool(name: str, pool: asyncpg.Pool) -> None:
+    """Expose pool size/idle as callback gauges, evaluated only at scrape time."""
+    PG_POOL_SIZE.labels(pool=name).set_function(pool.get_size)
+    PG_POOL_IDLE.labels(pool=name).set_function(pool.get_idle_size)
+
+def count_retry(sink: str):
+    """tenacity ``before_sleep`` hook counting retries for ``sink``."""
+    counter = SINK_RETRIES.labels(sink=sink)
+    return lambda retry_state: counter.inc()
+
+def stage_name(obj: Any) -> str:
+    return getattr(obj, "name", None) or type(obj).__name__
+
+class TimedSink:
+    def __init__(self, sink: Any, name: Optional[str] = None) -> None:
+        self.inner = sink
+        self.name = name or stage_name(sink)
+        self._hist = SINK_SECONDS.labels(sink=self.name)
+        self._errors = SINK_ERRORS.labels(sink=self.name)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr == "inner":
+            raise AttributeError(attr)
+        return getattr(self.inner, attr)
+
+    async def emit(self, item: NewsItem) -> None:
+        t0 = time.perf_counter()
+        try:
+            await self.inner.emit(item)
+            item.trace["sink." + self.name] = time.time()
+        except Exception:
+            self._errors.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._hist.observe(elapsed)
+            rec = profiling.recorder
+            if rec is not None:
+                rec.add("sink." + self.name, elapsed)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Optional
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+
+from loguru import logger
+
+class StageRecorder:
+    """
+    Per-stage wall and CPU totals, collected only while a profile is running. CPU time
+    comes from ``time.thread_time`` and is left at zero for stages that await, where
+    it would include whatever else ran on the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, list] = {}
+
+    def add(self, stage: str, wall: float, cpu: float = 0.0) -> None:
+        entry = self.stats.get(stage)
+        if entry is None:
+            entry = self.stats[stage] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += wall
+        entry[2] += cpu
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            stage: {"calls": n, "wall_s": round(wall, 6), "cpu_s": round(cpu, 6),
+                    "wall_us_per_call": round(wall / n * 1e6, 2) if n else 0.0}
+            for stage, (n, wall, cpu) in sorted(self.stats.items(), key=lambda kv: -kv[1][1])
+        }
+
+# Hot paths check this module attribute; it is None unless a profile is running.
+recorder: Optional[StageRecorder] = None
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler built on ``sys._current_frames``. A background thread
+    samples every thread's stack at ``interval`` and aggregates collapsed stacks
+    (``frame;frame;frame count``), the input format of flamegraph.pl and speedscope.
+    Nothing runs and nothing is hooked while no profile is active.
+    """
+
+    def __init__(self, out_dir: str, name: str, interval: float = 0.01) -> None:
+        self.out_dir = out_dir
+        self.name = name
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, trace_allocations: bool = False) -> Optional[str]:
+        """Start a profile in the background; returns the output path prefix, or None if one is running."""
+        with self._lock:
+            if self.running:
+                return None
+            prefix = os.path.join(self.out_dir, "%s-%d-%s" % (self.name, os.getpid(), time.strftime("%Y%m%dT%H%M%S")))
+            self._thread = threading.Thread(
+                target=self._run, args=(seconds, trace_allocations, prefix), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        logger.info("🔬 Profiling {} for {}s -> {}.*", self.name, seconds, prefix)
+        return prefix
+
+    def _run(self, seconds: float, trace_allocations: bool, prefix: str) -> None:
+        global recorder
+        stacks: Counter = Counter()
+        own = threading.get_ident()
+        started_tracing = trace_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(25)
+        before = tracemalloc.take_snapshot() if trace_allocations else None
+        recorder = stages = StageRecorder()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        deadline = wall0 + seconds
+        samples = 0
+        try:
+            while time.perf_counter() < deadline:
+                for tid, frame in sys._current_frames().items():
+                    if tid == own:
+                        continue
+                    stacks[_collapse(frame)] += 1
+                samples += 1
+                time.sleep(self.interval)
+        finally:
+            recorder = None
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(prefix + ".collapsed", "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(prefix + ".stages.json", "w") as f:
+            json.dump({"wall_s": round(wall, 3), "process_cpu_s": round(cpu, 3), "samples": samples,
+                       "interval_s": self.interval, "stages": stages.summary()}, f, indent=2)
+        if before is not None:
+            growth = tracemalloc.take_snapshot().compare_to(before, "lineno")
+            with open(prefix + ".tracemalloc.txt", "w") as f:
+                for stat in growth[:50]:
+                    f.write(f"{stat}\n")
+            if started_tracing:
+                tracemalloc.stop()
+        logger.info("🔬 Profile written to {}.* ({} samples, cpu {:.1f}s / wall {:.1f}s)", prefix, samples, cpu, wall)
+
+def start_on_signal(profiler: SamplingProfiler, signum: int, seconds: float, trace_allocations: bool = False) -> None:
+    """
+    Start ``profiler`` for ``seconds`` whenever the process receives ``signum``. The
+    handler only writes a byte to a pipe; a daemon thread reads it and starts the
+    profile, so nothing takes a lock or logs inside the signal handler.
+    """
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+
+    def handler(signum: int, frame: object) -> None:
+        try:
+            os.write(write_fd, b"\0")
+        except BlockingIOError:
+            pass  # plenty of requests already pending
+
+    def watch() -> None:
+        while os.read(read_fd, 1):
+            profiler.start(seconds, trace_allocations=trace_allocations)
+
+    threading.Thread(target=watch, name="profile-signal", daemon=True).start()
+    signal.signal(signum, handler)
+
+def _collapse(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
@@ -0,0 +1,226 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Protocol, Sequence, Tuple
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+from loguru import logger
+
+from services.pathway_services.news.analytics.hnsw import current_version, write_version
+from services.pathway_services.schema import NewsItem
+from services.pathway_services.utils.metrics import SNAPSHOT_BYTES, SNAPSHOT_SAVED_AT, SNAPSHOT_SECONDS, stage_name
+
+# topic -> partition -> next offset to consume
+Offsets = Dict[str, Dict[int, int]]
+
+class Snapshottable(Protocol):
+    def snapshot(self) -> Tuple[Dict[str, np.ndarray], dict]: ...
+    def restore(self, arrays: Mapping[str, np.ndarray], meta: dict) -> None: ...
+
+def pack_bytes(values: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Variable-length byte strings as one uint8 blob plus the int64 end offset of each."""
+    ends = np.cumsum([len(v) for v in values], dtype=np.int64) if values else np.zeros(0, dtype=np.int64)
+    return np.frombuffer(b"".join(values), dtype=np.uint8), ends
+
+def unpack_bytes(blob: np.ndarray, ends: np.ndarray) -> List[bytes]:
+    raw = bytes(blob)
+    ends = ends.tolist()
+    return [raw[start:end] for start, end in zip([0, *ends[:-1]], ends)]
+
+def pack_strings(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    return pack_bytes([v.encode("utf-8") for v in values])
+
+def unpack_strings(blob: np.ndarray, ends: np.ndarray) -> List[str]:
+    return [v.decode("utf-8") for v in unpack_bytes(blob, ends)]
+
+class OffsetTracker:
+    """
+    Per partition, the lowest offset whose item has not been fully processed (or the
+    next offset to fetch when none is pending). Items complete out of order across
+    the bulk and priority lanes, so this, not the highest offset seen, is where a
+    restart may resume without losing anything; items past it that had already
+    completed are processed again.
+    """
+
+    def __init__(self) -> None:
+        self._items: Dict[int, Tuple[str, int, int]] = {}
+        # Offsets are added in increasing order, so each dict's first key is its minimum.
+        self._pending: Dict[Tuple[str, int], Dict[int, None]] = {}
+        self._next: Dict[Tuple[str, int], int] = {}
+
+    def seek(self, topic: str, partition: int, offset: int) -> None:
+        """Start position of a partition, reported until its first item is added."""
+        self._next.setdefault((topic, partition), offset)
+
+    def add(self, item: NewsItem, topic: str, partition: int, offset: int) -> None:
+        self._items[id(item)] = (topic, partition, offset)
+        self._pending.setdefault((topic, partition), {})[offset] = None
+        self._next[(topic, partition)] = offset + 1
+
+    def done(self, items: Iterable[NewsItem], ok: bool = True) -> None:
+        """Forget ``items``; unless ``ok`` is False their offsets stop being pending."""
+        for item in items:
+            entry = self._items.pop(id(item), None)
+            if entry is not None and ok:
+                self._pending[entry[:2]].pop(entry[2], None)
+
+    def positions(self) -> Offsets:
+        out: Offsets = {}
+        for (topic, partition), following in self._next.items():
+            pending = self._pending.get((topic, partition))
+            out.setdefault(topic, {})[partition] = next(iter(pending)) if pending else following
+        return out
+
+class StateRegistry:
+    """
+    Saves the registered state of stateful stages (story index, burst baselines, ranked
+    feeds, ...) as one snapshot version under ``path``, every ``interval_seconds`` and
+    at shutdown, tagged with the input offsets it reflects, and restores it on startup
+    so the worker resumes with warm state instead of rebuilding it from hours of
+    traffic.
+
+    Each state returns numpy arrays plus JSON metadata; arrays are written as ``.npy``
+    files (``write_version``, as the similarity index) and loaded memory-mapped. Batch
+    processors wrapped by ``guard`` are paused while the state is copied, so a
+    snapshot never sees half a batch; the copy is then written off the event loop.
+    Resuming from the saved offsets is at-least-once: items processed out of order
+    ahead of a pending one are applied again.
+    """
+
+    def __init__(self, path: str, interval_seconds: float = 60.0) -> None:
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.offsets = OffsetTracker()
+        self._states: Dict[str, Snapshottable] = {}
+        self._active = 0
+        self._paused = False
+        self._idle = asyncio.Condition()
+        self._saving = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def register(self, name: str, state: Snapshottable) -> None:
+        if "." in name or name in self._states:
+            raise ValueError(f"State name {name!r} is already registered or contains '.'")
+        self._states[name] = state
+
+    def register_all(self, components: Iterable[Any]) -> List[str]:
+        """Register every transform or sink (wrappers unwrapped) that has ``snapshot`` and ``restore``."""
+        names = []
+        for component in components:
+            while getattr(component, "inner", None) is not None:
+                component = component.inner
+            if callable(getattr(component, "snapshot", None)) and callable(getattr(component, "restore", None)):
+                name = stage_name(component)
+                self.register(name, component)
+                names.append(name)
+        return names
+
+    def guard(self, process: Any) -> Any:
+        """Wrap a batch processor so checkpoints wait for it and its items count as done."""
+        async def guarded(items: List[NewsItem]) -> None:
+            async with self._idle:
+                await self._idle.wait_for(lambda: not self._paused)
+                self._active += 1
+            ok = False
+            try:
+                await process(items)
+                ok = True
+            finally:
+                self.offsets.done(items, ok)
+                async with self._idle:
+                    self._active -= 1
+                    self._idle.notify_all()
+        return guarded
+
+    def collect(self) -> Tuple[Dict[str, np.ndarray], dict]:
+        arrays: Dict[str, np.ndarray] = {}
+        stages: Dict[str, dict] = {}
+        for name, state in self._states.items():
+            part, meta = state.snapshot()
+            for key, arr in part.items():
+                arrays[f"{name}.{key}"] = arr
+            stages[name] = meta
+        positions = self.offsets.positions()
+        meta = {
+            "saved_at": time.time(),
+            "offsets": {topic: {str(p): o for p, o in parts.items()} for topic, parts in positions.items()},
+            "stages": stages,
+        }
+        return arrays, meta
+
+    async def checkpoint(self) -> Optional[str]:
+        """Pause guarded processors, copy every state, resume them and write the copy."""
+        if not self._states:
+            return None
+        async with self._saving:
+            t0 = time.perf_counter()
+            async with self._idle:
+                self._paused = True
+                await self._idle.wait_for(lambda: self._active == 0)
+            try:
+                arrays, meta = self.collect()
+            finally:
+                async with self._idle:
+                    self._paused = False
+                    self._idle.notify_all()
+            paused = time.perf_counter() - t0
+            version = await asyncio.to_thread(write_version, self.path, arrays, meta)
+            written = time.perf_counter() - t0 - paused
+        size = sum(arr.nbytes for arr in arrays.values())
+        SNAPSHOT_SECONDS.labels(phase="pause").observe(paused)
+        SNAPSHOT_SECONDS.labels(phase="write").observe(written)
+        SNAPSHOT_BYTES.set(size)
+        SNAPSHOT_SAVED_AT.set(meta["saved_at"])
+        logger.info("📸 State snapshot {} ({} states, {:.1f} MB): paused {:.0f} ms, written in {:.0f} ms",
+                    version, len(self._states), size / 1e6, paused * 1e3, written * 1e3)
+        return version
+
+    async def run(self) -> None:
+        """Checkpoint every ``interval_seconds`` until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                # Shielded: a cancelled run() lets an in-progress write finish before the final one.
+                await asyncio.shield(self.checkpoint())
+            except Exception:
+                logger.exception("State snapshot failed")
+
+    def restore(self) -> Offsets:
+        """
+        Load the current version into every registered state and return the offsets it
+        was taken at (empty without a snapshot). A state that fails to restore is logged
+        and starts empty, as it would without a snapshot.
+        """
+        version = current_version(self.path)
+        if version is None:
+            logger.info("📸 No state snapshot under {}; starting cold", self.path)
+            return {}
+        t0 = time.perf_counter()
+        base = os.path.join(self.path, version)
+        with open(os.path.join(base, "meta.json")) as f:
+            meta = json.load(f)
+        files = os.listdir(base)
+        for name, state in self._states.items():
+            stage_meta = meta["stages"].get(name)
+            if stage_meta is None:
+                logger.warning("📸 Snapshot {} has no state for {}; it starts empty", version, name)
+                continue
+            prefix = name + "."
+            arrays = {
+                f[len(prefix):-len(".npy")]: np.load(os.path.join(base, f), mmap_mode="r")
+                for f in files if f.startswith(prefix) and f.endswith(".npy")
+            }
+            try:
+                state.restore(arrays, stage_meta)
+            except Exception as e:
+                logger.error("❌ Could not restore {} from snapshot {}, it starts empty: {}", name, version, e)
+        elapsed = time.perf_counter() - t0
+        SNAPSHOT_SECONDS.labels(phase="restore").observe(elapsed)
+        age = time.time() - meta["saved_at"]
+        logger.info("📸 Restored {} states from snapshot {} ({:.0f} s old) in {:.0f} ms",
+                    len(self._states), version, age, elapsed * 1e3)
+        return {topic: {int(p): o for p, o in parts.items()} for topic, parts in meta["offsets"].items()}
@@ -0,0 +1,39 @@
+from __future__ import annotations
+from typing import Optional, Union
+import datetime as dt
+import time
+
+def to_epoch(value: Union[str, dt.datetime, None], default: Optional[float] = None) -> float:
+    """
+    Parse an ISO8601 timestamp (``Z`` suffix allowed) into epoch seconds.
+    Falls back to ``default`` (or the current time) when the value is empty or malformed.
+    """
+    if isinstance(value, dt.datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=dt.timezone.utc)).timestamp()
+    if value:
+        try:
+            parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=dt.timezone.utc)
+            return parsed.timestamp()
+        except ValueError:
+            pass
+    return time.time() if default is None else default
+
+IST = dt.timezone(dt.timedelta(hours=5, minutes=30), "IST")
+# NSE/BSE cash session (IST); exchange holidays are not modelled.
+PRE_OPEN = dt.time(9, 0)
+MARKET_OPEN = dt.time(9, 15)
+MARKET_CLOSE = dt.time(15, 30)
+
+def market_phase(now: Optional[dt.datetime] = None) -> str:
+    """``"open"``, ``"pre_open"``, ``"closed"`` or ``"weekend"`` for Indian equity markets."""
+    local = (now or dt.datetime.now(dt.timezone.utc)).astimezone(IST)
+    if local.weekday() >= 5:
+        return "weekend"
+    t = local.time()
+    if MARKET_OPEN <= t < MARKET_CLOSE:
+        return "open"
+    if PRE_OPEN <= t < MARKET_OPEN:
+        return "pre_open"
+    return "closed"
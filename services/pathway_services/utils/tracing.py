@@ -0,0 +1,17 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import time
+
+# Stamp names carried in NewsItem.trace (epoch seconds). Transforms and sinks add
+# their own "<Stage>" / "sink.<Sink>" stamps between these.
+INGEST = "ingest"
+PRIORITY = "priority"  # set when an item is routed to the priority lane
+PUBLISH = "publish"
+
+def stamp(item: Any, stage: str, ts: Optional[float] = None) -> None:
+    item.trace[stage] = time.time() if ts is None else ts
+
+def stage_deltas(trace: Dict[str, float]) -> Dict[str, float]:
+    """Milliseconds spent before each stamp, relative to the previous one, in stamp order."""
+    ordered = sorted(trace.items(), key=lambda kv: kv[1])
+    return {name: round((ts - prev) * 1e3, 3) for (_, prev), (name, ts) in zip(ordered, ordered[1:])}